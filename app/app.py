@@ -1,13 +1,27 @@
-import os
+import sys
 from pathlib import Path
 
 import streamlit as st
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
-import pyodbc
 from dotenv import load_dotenv
 
+# streamlit run app/app.py 는 app/ 만 sys.path에 넣으므로 프로젝트 루트 (common/)
+# + azure_func/ (Function 과 같은 shared_code) 추가
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "azure_func"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from common import fallback_store, forecast, matrix_store, metrics, rollup, serving
+from common.db import station_dim
+from common.db.pool import get_pool
+from common.enrich import coerce_and_enrich
+from common.latest import latest_per_station
+from common.relocation import Thresholds, flag as flag_relocation, pair as pair_relocation
+from common.recent_window import RecentWindow
+from common.spatial import StationIndex
+
 # -----------------------------
 # Matplotlib 한글 깨짐 방지 (Windows)
 # -----------------------------
@@ -22,16 +36,6 @@ st.set_page_config(page_title="따릉이 모니터링", layout="wide")
 # 반드시 프로젝트 루트에서 실행: streamlit run app/app.py
 load_dotenv()
 
-SQL_SERVER = os.getenv("SQL_SERVER")
-SQL_DB     = os.getenv("SQL_DB")
-SQL_UID    = os.getenv("SQL_UID")
-SQL_PWD    = os.getenv("SQL_PWD")
-
-ODBC_DRIVER_CANDIDATES = [
-    "ODBC Driver 18 for SQL Server",
-    "ODBC Driver 17 for SQL Server",
-]
-
 # -----------------------------
 # 1) “표시용” 한글 컬럼 매핑
 # -----------------------------
@@ -58,6 +62,18 @@ KOR_COLS_EXTRA = {
     "avg_slots_available": "평균 빈 거치대 수",
     "avg_rack_capacity": "평균 거치대 수",
     "need_relocation": "재배치 필요",
+    "distance_m": "거리(m)",
+    "move_need": "목표 대비 필요(+)/여유(-) 대수",
+    "from_station_id": "출발 대여소 ID",
+    "from_station_name": "출발 대여소명",
+    "to_station_id": "도착 대여소 ID",
+    "to_station_name": "도착 대여소명",
+    "move_bikes": "이동 대수",
+    "bikes_now": "현재 자전거 수",
+    "trend_per_hour": "추세(대/시간)",
+    "pred_30m": "30분 후 예측",
+    "pred_60m": "60분 후 예측",
+    "dry_risk": "고갈 위험",
 }
 
 DISPLAY_COLS = {**KOR_COLS, **KOR_COLS_EXTRA}
@@ -71,122 +87,154 @@ def display_df(df: pd.DataFrame) -> pd.DataFrame:
 
 
 # -----------------------------
-# 2) ODBC 연결 문자열
+# 2) DB 커넥션
+#   - common/db/pool.py 프로세스 공용 풀 (모든 세션이 공유, 동시 커넥션 수 제한)
+#   - 드라이버/연결 문자열은 최초 1회만 결정, 오래되거나 끊긴 커넥션은 자동 교체
 # -----------------------------
-def _pick_driver():
-    drivers = [d.strip() for d in pyodbc.drivers()]
-    for name in ODBC_DRIVER_CANDIDATES:
-        if name in drivers:
-            return name
-    raise RuntimeError(f"SQL Server ODBC driver not found. installed={drivers}")
-
-
-def make_conn_str() -> str:
-    missing = [k for k, v in {
-        "SQL_SERVER": SQL_SERVER,
-        "SQL_DB": SQL_DB,
-        "SQL_UID": SQL_UID,
-        "SQL_PWD": SQL_PWD,
-    }.items() if not v]
-    if missing:
-        raise RuntimeError(f".env missing keys: {missing}")
-
-    driver = _pick_driver()
-    return (
-        f"Driver={{{driver}}};"
-        f"Server={SQL_SERVER};"
-        f"Database={SQL_DB};"
-        f"Uid={SQL_UID};"
-        f"Pwd={SQL_PWD};"
-        "Encrypt=yes;TrustServerCertificate=no;Connection Timeout=30;"
-    )
+def db_conn():
+    """with db_conn() as cn: ... (블록이 끝나면 풀에 반납)"""
+    return get_pool().connection()
 
 
 # -----------------------------
-# 3) 공통 전처리
+# 3) 공통 전처리 (common/enrich.py: coerce_and_enrich)
+#   - 아래 로더(st.cache_data) 안에서 한 번만 실행
+#   - 위젯 조작으로 인한 rerun에서는 캐시된 결과를 그대로 사용
 # -----------------------------
-def coerce_and_enrich(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty:
-        return df
-
-    # 숫자형 강제
-    for col in ["rack_tot_cnt", "parking_bike_tot_cnt", "slots_available", "lat", "lon"]:
-        if col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-    # bike_count 통일
-    if "parking_bike_tot_cnt" in df.columns:
-        df["bike_count"] = pd.to_numeric(df["parking_bike_tot_cnt"], errors="coerce")
-    elif "bikes_available" in df.columns:
-        df["bike_count"] = pd.to_numeric(df["bikes_available"], errors="coerce")
-
-    # ratio 계산
-    if "rack_tot_cnt" in df.columns:
-        cap = pd.to_numeric(df["rack_tot_cnt"], errors="coerce")
-        if "slots_available" in df.columns:
-            df["avail_ratio"] = (pd.to_numeric(df["slots_available"], errors="coerce") / cap).replace([np.inf, -np.inf], np.nan)
-        elif "bike_count" in df.columns:
-            df["avail_ratio"] = ((cap - df["bike_count"]) / cap).replace([np.inf, -np.inf], np.nan)
-
-        if "bike_count" in df.columns:
-            df["occ_ratio"] = (df["bike_count"] / cap).replace([np.inf, -np.inf], np.nan)
-
-    # UTC → KST 표시용 문자열 (+09:00 제거)
-    if "ts_utc" in df.columns:
-        ts = pd.to_datetime(df["ts_utc"], utc=True, errors="coerce")
-        df["ts_kst"] = ts.dt.tz_convert("Asia/Seoul")
-        df["ts_kst_str"] = df["ts_kst"].dt.strftime("%Y-%m-%d %H:%M:%S")
-
-    return df
 
 
 # -----------------------------
 # 4) DB 조회 (운영형)
-#   - 커넥션은 매번 새로 열고 닫음 (끊김 방지)
-#   - 최근 N분만 조회해서 부하/끊김 감소
+#   - 커넥션은 공용 풀에서 빌려 쓰고 반납
+#   - 최근 N분 구간은 세션 공용 메모리에 유지, 갱신 시 신규 스냅샷만 조회
+#   - 기본은 dbo.bike_status (ADF 적재), BIKE_READ_FACT=1 이면 bike_status_fact(수량만)를 읽고
+#     대여소명/좌표/거치대 수는 메모리에 캐시한 station_dim 을 붙임
 # -----------------------------
 DEFAULT_LOOKBACK_MINUTES = 60  # 최근 60분 데이터만 읽기(필요시 조정)
 
+@st.cache_resource
+def recent_window(table: str) -> RecentWindow:
+    return RecentWindow(table)
+
+@st.cache_resource(max_entries=1)
+def forecaster(mtime: float) -> forecast.Forecaster:
+    """
+    data/forecast/ 모델 (funcs/update_forecast.py 가 갱신), 파일이 바뀔 때만 다시 읽음 (이전 모델은 캐시에서 제거)
+    모든 세션이 공유 → 새 데이터가 있을 때만 update (has_newer), update/predict 는 Forecaster 내부 lock 으로 직렬화
+    """
+    return forecast.Forecaster.load()
+
+@st.cache_resource(ttl=60)
+def matrix() -> "matrix_store.MatrixStore | None":
+    """data/matrix/ 대여소×5분 격자 (funcs/update_matrix.py 가 갱신), 읽기 전용 memmap"""
+    return matrix_store.MatrixStore(mode="r") if matrix_store.available() else None
+
+@st.cache_resource(max_entries=2)
+def serving_snapshot(file: str) -> serving.ServingSnapshot:
+    """
+    data/serving/ 서빙 스냅샷 (funcs/publish_serving.py 가 발행), 버전 파일마다 한 번만 읽어 모든 세션이 공유
+    현재 + 직전 버전만 캐시에 유지 (교체 중인 세션용)
+    """
+    metrics.inc("cache_lookup", cache="serving_snapshot", result="miss")
+    return serving.ServingSnapshot.load(file)
+
+def current_serving():
+    """최근 MAX_AGE_MIN 분 안에 발행된 서빙 스냅샷, 없거나 오래됐으면 None"""
+    ptr = serving.current()
+    if not ptr or not ptr.get("as_of_utc"):
+        return None
+    age = pd.Timestamp.now(tz="UTC") - pd.Timestamp(ptr["as_of_utc"])
+    if age > pd.Timedelta(minutes=serving.MAX_AGE_MIN):
+        return None
+    try:
+        return serving_snapshot(ptr["file"])
+    except Exception as e:
+        st.warning(f"서빙 스냅샷을 읽지 못해 DB에서 조회합니다. 사유: {e}")
+        return None
+
+def load_peak_rollup():
+    """data/rollup/ 시간대(KST) 누적 집계 (funcs/update_rollup.py 가 갱신), 없으면 None"""
+    if not rollup.available():
+        return None
+    return rollup.HourlyRollup.load().hour_frame()
+
+@st.cache_data(ttl=300)
+def load_peak_view() -> pd.DataFrame:
+    """서빙 스냅샷에 시간대 집계가 없을 때: 누적 집계 파일 → 없으면 vw_station_peak_hours (실패 시 빈 DataFrame)"""
+    peak = load_peak_rollup()
+    if peak is not None:
+        return peak
+    metrics.inc("cache_lookup", cache="load_peak_view", result="miss")
+    try:
+        with db_conn() as cn:
+            return coerce_and_enrich(pd.read_sql("SELECT * FROM dbo.vw_station_peak_hours;", cn))
+    except Exception:
+        return pd.DataFrame()
+
 @st.cache_data(ttl=60)
 def load_from_sql(lookback_minutes: int = DEFAULT_LOOKBACK_MINUTES):
-    conn_str = make_conn_str()
+    metrics.inc("cache_lookup", cache="load_from_sql", result="miss")
     try:
-        with pyodbc.connect(conn_str) as cn:
-            # 최근 N분만
-            q_recent = f"""
-            SELECT *
-            FROM dbo.bike_status
-            WHERE ts_utc >= DATEADD(minute, -{int(lookback_minutes)}, SYSUTCDATETIME());
-            """
-            recent = pd.read_sql(q_recent, cn)
-
-            # 분석 뷰 (있으면)
-            try:
-                peak = pd.read_sql("SELECT * FROM dbo.vw_station_peak_hours;", cn)
-            except Exception:
-                peak = pd.DataFrame()
+        with db_conn() as cn:
+            fact = station_dim.fact_table(cn)
+            window = recent_window(fact or "dbo.bike_status")
+            # 최근 N분 (watermark 이후 신규 행만 DB에서 읽음)
+            recent = window.refresh(cn, int(lookback_minutes))
+            # 대여소별 최신 행 (신규 행으로만 갱신된 상태에서 바로 꺼냄)
+            latest = window.latest(int(lookback_minutes))
+            if fact:
+                dim = station_dim.load_dim(cn)
+                recent, latest = station_dim.join(recent, dim), station_dim.join(latest, dim)
+
+            # 분석 뷰 (있으면) - 시간대 집계 파일이 있으면 뷰 스캔 생략
+            peak = load_peak_rollup()
+            if peak is None:
+                try:
+                    peak = pd.read_sql("SELECT * FROM dbo.vw_station_peak_hours;", cn)
+                except Exception:
+                    peak = pd.DataFrame()
 
             try:
                 reloc = pd.read_sql("SELECT * FROM dbo.vw_relocation_candidate;", cn)
             except Exception:
                 reloc = pd.DataFrame()
 
-        return recent, peak, reloc
+        with metrics.timer("enrich_seconds", source="sql"):
+            return (
+                coerce_and_enrich(recent),
+                coerce_and_enrich(latest),
+                coerce_and_enrich(peak),
+                coerce_and_enrich(reloc),
+            )
 
     except Exception as e:
         st.warning(f"DB 조회 실패 → CSV 모드로 전환합니다. 사유: {e}")
-        return None, None, None
+        return None, None, None, None
 
 
 # -----------------------------
-# 5) CSV 백업 읽기 (fallback)
+# 5) 백업 읽기 (fallback)
+#   - data/fallback/ 시간 파티션 Parquet: 최근 N분 + 화면에 쓰는 컬럼만 읽음
+#   - 없으면 예전 단일 CSV (필요한 컬럼만)
 # -----------------------------
+FALLBACK_COLS = [
+    "station_id", "station_name", "rack_tot_cnt", "parking_bike_tot_cnt",
+    "bikes_available", "slots_available", "lat", "lon", "ts_utc",
+]
+
 @st.cache_data(ttl=60)
-def load_from_csv():
+def load_from_csv(lookback_minutes: int = DEFAULT_LOOKBACK_MINUTES):
+    metrics.inc("cache_lookup", cache="load_from_csv", result="miss")
+    if fallback_store.available():
+        with metrics.timer("fallback_read_seconds"):
+            df = fallback_store.FallbackStore().read_window(lookback_minutes, FALLBACK_COLS)
+        return coerce_and_enrich(df), "Parquet (백업)"
+
     csv_path = Path("data") / "bike_status_all.csv"
     if not csv_path.exists():
         raise FileNotFoundError(f"CSV가 없습니다: {csv_path}")
-    return pd.read_csv(csv_path, encoding="utf-8-sig")
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", usecols=lambda c: c in FALLBACK_COLS)
+    return coerce_and_enrich(df), "CSV (백업)"
 
 
 # -----------------------------
@@ -202,55 +250,52 @@ with mid:
 
 # 사이드바에서 lookback 조절 가능(연결 끊김/부하 줄이기)
 st.sidebar.header("데이터 로딩 범위")
-lookback = st.sidebar.slider("최근 조회 범위(분)", min_value=10, max_value=360, value=DEFAULT_LOOKBACK_MINUTES, step=10)
-
-recent_df, peak_df, reloc_df = load_from_sql(lookback)
+use_serving = st.sidebar.checkbox("서빙 스냅샷 사용 (미리 계산된 최신 결과)", value=True)
+
+# 서빙 스냅샷이 최신이면 DB 조회/전처리 없이 그대로 사용 (화면에서는 필터링만)
+snap = current_serving() if use_serving else None
+# 서빙 스냅샷은 대여소별 최신 1행만 담고 있어 조회 범위가 적용되지 않음
+lookback = st.sidebar.slider("최근 조회 범위(분)", min_value=10, max_value=360, value=DEFAULT_LOOKBACK_MINUTES, step=10,
+                             disabled=snap is not None)
+if snap is not None:
+    st.sidebar.caption("서빙 스냅샷 사용 중: 최근 조회 범위는 적용되지 않습니다 (대여소별 최신 값). 끄면 DB에서 조회합니다.")
+    latest_df, reloc_df = snap.latest, pd.DataFrame()
+    # 발행 시점에 시간대 집계가 없었으면 누적 집계 / 뷰로 대체
+    peak_df = snap.peak if not snap.peak.empty else load_peak_view()
+    recent_df = latest_df
+    source_label = f"서빙 스냅샷 ({snap.as_of.tz_convert('Asia/Seoul'):%H:%M} KST)"
+else:
+    recent_df, latest_df, peak_df, reloc_df = load_from_sql(lookback)
+    source_label = "SQL (DB 직연결)"
 
-source_label = "SQL (DB 직연결)"
 if recent_df is None:
     # CSV로 전환
     try:
-        all_df = load_from_csv()
-        all_df = coerce_and_enrich(all_df)
-
-        # CSV는 전체에서 최신 스냅샷만 만들기
-        latest_df = (
-            all_df.sort_values("ts_utc", ascending=False)
-            .groupby("station_id", as_index=False)
-            .first()
-        )
+        all_df, source_label = load_from_csv(lookback)
+
+        # 백업 데이터에서 최신 스냅샷만 만들기 (대여소별 최대 ts_utc 행, 정렬 없음)
+        latest_df = latest_per_station(all_df)
 
-        peak_df = pd.DataFrame()
+        peak_df = load_peak_rollup()
+        peak_df = pd.DataFrame() if peak_df is None else peak_df
         reloc_df = pd.DataFrame()
-        source_label = "CSV (백업)"
+        recent_df = all_df
     except Exception as e:
         st.error(f"데이터를 불러올 수 없습니다: {e}")
         st.stop()
-else:
-    # DB에서 온 recent_df를 "스테이션별 최신 스냅샷"으로 축약
-    recent_df = coerce_and_enrich(recent_df)
-    latest_df = (
-        recent_df.sort_values("ts_utc", ascending=False)
-        .groupby("station_id", as_index=False)
-        .first()
-    )
-    peak_df = coerce_and_enrich(peak_df)
-    reloc_df = coerce_and_enrich(reloc_df)
 
 
 # -----------------------------
 # 7) KPI
 # -----------------------------
+kpi = snap.kpi if snap is not None else serving.kpis(latest_df)
 k1, k2, k3, k4 = st.columns(4)
 with k1:
-    st.metric("스테이션 수", f"{latest_df['station_id'].nunique():,}" if "station_id" in latest_df.columns else "N/A")
+    st.metric("스테이션 수", f"{kpi['stations']:,}" if kpi["stations"] is not None else "N/A")
 with k2:
-    st.metric("평균 가용률", f"{np.nanmean(latest_df['avail_ratio']):.2f}" if "avail_ratio" in latest_df.columns else "N/A")
+    st.metric("평균 가용률", f"{kpi['avail_mean']:.2f}" if kpi["avail_mean"] is not None else "N/A")
 with k3:
-    if "ts_kst_str" in latest_df.columns and latest_df["ts_kst_str"].notna().any():
-        st.metric("최신 시각(KST)", latest_df["ts_kst_str"].max())
-    else:
-        st.metric("최신 시각(KST)", "N/A")
+    st.metric("최신 시각(KST)", kpi["latest_kst"] or "N/A")
 with k4:
     st.metric("데이터 소스", source_label)
 
@@ -263,13 +308,36 @@ st.divider()
 st.sidebar.header("필터")
 name_query = st.sidebar.text_input("대여소명 검색", value="")
 
-avail_max = float(latest_df["avail_ratio"].quantile(0.95)) if "avail_ratio" in latest_df.columns else 1.0
+avail_max = kpi["avail_q95"]
 thresh = st.sidebar.slider("가용률 임계치(이하만 보기)", 0.0, 1.0, min(0.2, avail_max), 0.05)
 
 ids = sorted(latest_df["station_id"].dropna().unique().tolist()) if "station_id" in latest_df.columns else []
 sel_ids = st.sidebar.multiselect("대여소 선택", options=ids, default=[])
 
+# 주변 검색 (공간 인덱스, 대여소 위치가 바뀔 때만 다시 구성)
+@st.cache_resource
+def station_index(_df: pd.DataFrame, key: str) -> StationIndex:
+    return StationIndex.from_frame(_df)
+
+sindex = None
+if {"station_id", "lat", "lon"}.issubset(latest_df.columns):
+    if snap is not None:
+        key = snap.version
+    else:
+        key = f"{len(latest_df)}:{pd.util.hash_pandas_object(latest_df[['station_id', 'lat', 'lon']], index=False).sum()}"
+    sindex = station_index(latest_df, key)
+
+st.sidebar.header("주변 검색")
+near_id = st.sidebar.selectbox("기준 대여소", options=["(없음)"] + ids, index=0)
+near_radius = st.sidebar.slider("반경(m)", min_value=100, max_value=3000, value=500, step=100)
+near_ids = None
+if sindex is not None and near_id != "(없음)" and sindex.coords(near_id) is not None:
+    idx, _ = sindex.within(*sindex.coords(near_id), near_radius)
+    near_ids = sindex.ids[idx]
+
 f = latest_df.copy()
+if near_ids is not None:
+    f = f[f["station_id"].isin(near_ids)]
 if name_query.strip() and "station_name" in f.columns:
     q = name_query.strip().lower()
     f = f[f["station_name"].astype(str).str.lower().str.contains(q)]
@@ -284,7 +352,7 @@ if "ts_kst" in f.columns:
 # -----------------------------
 # 9) 탭 UI
 # -----------------------------
-tab1, tab2, tab3, tab4 = st.tabs(["📋 표", "🗺️ 지도", "📈 시간대 혼잡도", "📦 재배치 후보"])
+tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["📋 표", "🗺️ 지도", "📈 시간대 혼잡도", "📦 재배치 후보", "📍 주변 가용", "⏱️ 고갈 예측"])
 
 # 📋 표
 with tab1:
@@ -299,14 +367,8 @@ with tab2:
         import pydeck as pdk
 
         m = f.dropna(subset=["lat", "lon"]).copy()
-        if "avail_ratio" in m.columns:
-            norm = m["avail_ratio"].clip(0, 1).fillna(0.5)
-            m["r"] = (255 * (1 - norm)).astype(int)
-            m["g"] = (80 * (1 - abs(norm - 0.5) * 2)).astype(int)
-            m["b"] = (255 * norm).astype(int)
-            m["size"] = (300 * (1 - norm) + 50).astype(int)
-        else:
-            m["r"], m["g"], m["b"], m["size"] = 100, 100, 200, 80
+        if not {"r", "g", "b", "size"}.issubset(m.columns):
+            m = serving.map_style(m)  # 서빙 스냅샷에는 이미 계산돼 있음
 
         view_state = pdk.ViewState(
             latitude=float(m["lat"].median()) if len(m) else 37.5665,
@@ -339,14 +401,8 @@ with tab2:
 with tab3:
     st.markdown("### 시간대별 평균 가용률/점유율 (KST 기준)")
     if not peak_df.empty:
-        peak_work = peak_df.copy()
-        if "hour_utc" in peak_work.columns:
-            h = pd.to_numeric(peak_work["hour_utc"], errors="coerce")
-            peak_work["hour_kst"] = (h + 9) % 24
-        else:
-            peak_work["hour_kst"] = np.nan
-
-        peak_work = peak_work.sort_values("hour_kst")
+        # 누적 집계 / 서빙 스냅샷은 이미 KST 시간대, 뷰(hour_utc)는 +9
+        peak_work = serving.peak_by_kst(peak_df)
         st.dataframe(display_df(peak_work), use_container_width=True, height=320)
 
         if "availability_pct" in peak_work.columns:
@@ -358,15 +414,96 @@ with tab3:
             plt.xticks(range(0, 24, 2))
             st.pyplot(fig)
     else:
-        st.info("vw_station_peak_hours 뷰가 없어 차트를 표시할 수 없습니다.")
+        st.info("시간대 집계(data/rollup) / vw_station_peak_hours 뷰가 없어 차트를 표시할 수 없습니다.")
 
 # 📦 재배치 후보
 with tab4:
-    st.markdown("### 재배치 후보")
+    st.markdown("### 재배치 후보 (최신 스냅샷 기준)")
+    c1, c2, c3 = st.columns(3)
+    low_th = c1.slider("부족: 점유율 이하", 0.0, 0.5, 0.1, 0.05)
+    high_th = c2.slider("과잉: 점유율 이상", 0.5, 1.0, 0.9, 0.05)
+    max_dist = c3.slider("이동 최대 거리(m)", 200, 5000, 2000, 100)
+    th = Thresholds(low=low_th, high=high_th, target=(low_th + high_th) / 2, max_dist_m=float(max_dist))
+
+    flagged = flag_relocation(latest_df, th)
+    if not flagged.empty:
+        moves = pair_relocation(flagged, th)
+        st.markdown(f"**부족 {int((flagged['need_relocation'] == '부족').sum()):,}곳 / 과잉 {int((flagged['need_relocation'] == '과잉').sum()):,}곳, 이동 제안 {len(moves):,}건**")
+        st.dataframe(display_df(moves), use_container_width=True, height=300)
+        reloc_cols = [c for c in ["station_id","station_name","need_relocation","occ_ratio","bike_count","rack_tot_cnt","move_need","ts_kst_str"] if c in flagged.columns]
+        st.dataframe(display_df(flagged[reloc_cols]), use_container_width=True, height=300)
+    else:
+        st.info("조건에 맞는 재배치 후보가 없습니다.")
+
     if not reloc_df.empty:
-        st.dataframe(display_df(reloc_df), use_container_width=True)
+        with st.expander("vw_relocation_candidate 뷰 결과"):
+            st.dataframe(display_df(reloc_df), use_container_width=True)
+
+# 📍 주변 가용
+with tab5:
+    st.markdown("### 주변 대여소 가용 현황 (기준 대여소: 사이드바 '주변 검색')")
+    if sindex is None or not len(sindex):
+        st.info("위치(lat/lon) 정보가 없어 주변 검색을 할 수 없습니다.")
+    elif near_id == "(없음)" or sindex.coords(near_id) is None:
+        st.info("사이드바에서 기준 대여소를 선택하세요.")
     else:
-        st.info("vw_relocation_candidate 뷰가 비어 있습니다.")
+        lat0, lon0 = sindex.coords(near_id)
+        near_cols = ["station_id","distance_m","station_name","bike_count","slots_available","avail_ratio","ts_kst_str"]
+        base = latest_df.drop_duplicates("station_id").set_index("station_id").reindex(sindex.ids)
+        k = st.slider("최근접 개수", min_value=1, max_value=20, value=5)
+
+        mx = matrix()
+        if mx is not None and near_id in mx.index:
+            series = mx.series(near_id, hours=24)
+            if series.notna().any():
+                st.markdown(f"**{near_id} 최근 24시간 자전거 수 (5분 격자)**")
+                st.line_chart(series.tz_convert("Asia/Seoul").rename("자전거 수"))
+
+        idx, dist = sindex.within(lat0, lon0, near_radius)
+        st.markdown(f"**반경 {near_radius:,}m 이내: {len(idx):,}곳**")
+        near = sindex.frame(idx, dist, latest_df)
+        st.dataframe(display_df(near[[c for c in near_cols if c in near.columns]]), use_container_width=True, height=260)
+
+        c1, c2 = st.columns(2)
+        if "slots_available" in base.columns:
+            idx, dist = sindex.nearest(lat0, lon0, k, mask=(base["slots_available"].fillna(0) > 0).to_numpy())
+            near = sindex.frame(idx, dist, latest_df)
+            c1.markdown("**빈 거치대가 있는 가까운 대여소 (반납)**")
+            c1.dataframe(display_df(near[[c for c in near_cols if c in near.columns]]), use_container_width=True)
+        if "bike_count" in base.columns:
+            idx, dist = sindex.nearest(lat0, lon0, k, mask=(base["bike_count"].fillna(0) > 0).to_numpy())
+            near = sindex.frame(idx, dist, latest_df)
+            c2.markdown("**자전거가 있는 가까운 대여소 (대여)**")
+            c2.dataframe(display_df(near[[c for c in near_cols if c in near.columns]]), use_container_width=True)
+
+# ⏱️ 고갈 예측
+with tab6:
+    st.markdown("### 30~60분 후 자전거 수 예측 (요일·시간대 평균 + 최근 추세)")
+    fc = forecaster(forecast.PATH.stat().st_mtime if forecast.available() else 0.0)
+    # 저장된 모델 이후 새 데이터가 있을 때만 반영 (세션/rerun 마다 공유 모델을 갱신하지 않음, 보통은 predict 만)
+    mx = matrix()
+    if mx is not None:
+        if fc.has_newer(mx.last_ts):
+            fc.update_frame(mx.frame(hours=forecast.RECENT_SLOTS * forecast.SLOT_MIN / 60))
+    elif "ts_utc" in recent_df.columns and fc.has_newer(pd.to_datetime(recent_df["ts_utc"], utc=True, errors="coerce").max()):
+        fc.update_frame(recent_df)
+    pred = fc.predict()
+    if pred.empty:
+        st.info("예측에 쓸 이력이 없습니다. python -m funcs.update_forecast --since ... 로 모델을 만드세요.")
+    else:
+        if not forecast.available():
+            st.caption("저장된 모델 없음: 조회 구간만으로 추세 예측 (시간대 평균은 이력이 쌓여야 반영)")
+        pred = pred.merge(latest_df[[c for c in ["station_id", "station_name"] if c in latest_df.columns]].drop_duplicates("station_id"), on="station_id", how="left")
+        if sel_ids:
+            pred = pred[pred["station_id"].isin(sel_ids)]
+        if near_ids is not None:
+            pred = pred[pred["station_id"].isin(near_ids)]
+        only_dry = st.checkbox("고갈 위험만 보기", value=True)
+        if only_dry:
+            pred = pred[pred["dry_risk"]]
+        st.markdown(f"**기준 시각(UTC): {fc.as_of} / {len(pred):,}곳**")
+        pred_cols = [c for c in ["station_id","station_name","bikes_now","trend_per_hour","pred_30m","pred_60m","rack_tot_cnt","dry_risk"] if c in pred.columns]
+        st.dataframe(display_df(pred[pred_cols]), use_container_width=True, height=420)
 
 # CSV 다운로드
 st.download_button(
@@ -376,3 +513,22 @@ st.download_button(
 )
 
 st.caption("데이터 소스: Azure SQL (최근 N분 조회 → 최신 스냅샷), 표시: UTC→KST / 실패 시 CSV")
+
+# -----------------------------
+# 디버그 패널 (?debug=1): 최근 실행 계측값
+#   - 계측 레지스트리는 프로세스 공용 (모든 세션 합계)
+#   - 기록은 rerun 마다가 아니라 METRICS_FLUSH_SEC 마다 1줄
+# -----------------------------
+METRICS_FLUSH_SEC = 300
+
+metrics.inc("dashboard_render")
+if st.query_params.get("debug") == "1":
+    with st.expander("🛠 계측 (최근 실행)"):
+        st.caption(f"대시보드 프로세스 누적 (모든 세션 합계, 최대 {METRICS_FLUSH_SEC}초마다 기록 후 초기화)")
+        st.code(metrics.registry.to_prometheus(), language="text")
+        runs = metrics.read_runs(30)
+        if runs:
+            st.dataframe(pd.json_normalize(runs), use_container_width=True)
+        else:
+            st.info(f"기록된 실행이 없습니다: {metrics.METRICS_PATH}")
+metrics.flush_every("dashboard", METRICS_FLUSH_SEC)
@@ -1,26 +1,45 @@
 import os
+import gzip
 import json
+import time
 import logging
 from datetime import datetime, timezone
 
 import azure.functions as func
-import requests
-from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from azure.storage.blob import BlobServiceClient, ContentSettings
+
+from shared_code import bike_fetch, blob_writer, columnar, delta, metrics, pagination, quality
 
 app = func.FunctionApp()
 
 # =========================================================
 # 설정값
 # =========================================================
-LAST = 2725
-SIZE = 999
+# 1이면 전체 스냅샷 대신 delta 레코드 저장 (매 시간 첫 tick은 keyframe)
+# 상태는 저장하지 않고, 콜드 스타트 때 현재 시간 폴더의 keyframe + delta 로 복원
+DELTA_MODE = os.getenv("BIKE_DELTA_MODE", "0") == "1"
+
+# 1이면 JSON과 같은 경로에 Parquet 사본도 저장 (pyarrow 필요)
+PARQUET_MODE = os.getenv("BIKE_PARQUET", "0") == "1"
+
+# 1이면 JSON blob을 gzip 압축해서 저장 (*.json.gz)
+GZIP_MODE = os.getenv("BIKE_GZIP", "0") == "1"
+
+# 업로드 전 품질 검사 (0이면 생략), fail 판정 스냅샷은 _quarantine/ 에 격리
+QUALITY_MODE = os.getenv("BIKE_QUALITY", "1") == "1"
+QUALITY_STATE_BLOB = "_state/quality_state.json"
 
-RANGES = []
-s = 1
-while s <= LAST:
-    e = min(s + SIZE - 1, LAST)
-    RANGES.append((s, e))
-    s = e + 1
+# 계측은 기본적으로 logging (Application Insights) 으로, BIKE_METRICS_PATH 를 주면 그 파일에 기록
+# (Function 작업 폴더는 읽기 전용/임시라 data/metrics/ 에 쓰지 않음)
+METRICS_TO_LOG = not os.getenv("BIKE_METRICS_PATH")
+
+# 업로드 실패 시 로컬에 보관했다가 다음 tick에 재시도
+SPILL = blob_writer.Spill()
+
+_container = None    # 웜 인스턴스 동안 Blob 클라이언트 재사용
+_delta_state = None  # 웜 인스턴스에서는 직전 상태를 메모리에서 재사용
+_quality_state = None
 
 
 # =========================================================
@@ -32,29 +51,32 @@ def fetch_all():
         raise RuntimeError("SEOUL_BIKE_API_KEY missing")
 
     base = f"http://openapi.seoul.go.kr:8088/{api_key}/json/bikeList"
-    rows = []
-
-    for start, end in RANGES:
-        url = f"{base}/{start}/{end}/"
-        logging.info(f"[CALL] {url}")
+    logging.info(f"[CALL] bikeList (workers={bike_fetch.MAX_WORKERS})")
 
-        r = requests.get(url, timeout=15)
-        r.raise_for_status()
+    # list_total_count 기반 페이지 계획 + 동시 호출 (결과는 페이지 순서 유지)
+    rows, pages, total = pagination.fetch_planned(base)
 
-        data = r.json().get("rentBikeStatus", {})
-        page = data.get("row", []) or []
+    for p in pages:
+        logging.info(
+            f"[PAGE {p.start}-{p.end}] rows={len(p.rows)} "
+            f"latency={p.latency_ms:.0f}ms attempts={p.attempts}"
+        )
+        metrics.observe("http_page_seconds", p.latency_ms / 1000)
+        metrics.inc("http_page_retries", p.attempts - 1)
+    metrics.inc("rows_fetched", len(rows))
 
-        logging.info(f"[PAGE {start}-{end}] rows={len(page)}")
-        rows.extend(page)
-
-    logging.info(f"[TOTAL] rows={len(rows)}")
-    return rows
+    logging.info(f"[TOTAL] rows={len(rows)} list_total_count={total}")
+    return rows, total
 
 
 # =========================================================
 # 2. Blob Storage 업로드 (raw/YYYY/MM/DD/HH/)
 # =========================================================
-def upload_to_blob(rows):
+def _raw_container():
+    global _container
+    if _container is not None:
+        return _container
+
     conn_str = os.getenv("AzureWebJobsStorage")
     if not conn_str:
         raise RuntimeError("AzureWebJobsStorage missing")
@@ -62,17 +84,60 @@ def upload_to_blob(rows):
     bsc = BlobServiceClient.from_connection_string(conn_str)
     container = bsc.get_container_client("raw")
 
+    # 컨테이너 확인은 인스턴스당 1회
+    if not container.exists():
+        try:
+            container.create_container()
+            logging.info("[BLOB] created container: raw")
+        except ResourceExistsError:
+            pass
+
+    _container = container
+    return _container
+
+
+def _upload(name, data, content_type="application/json"):
+    """업로드 실패 시 spill에 보관 (스냅샷 유실 방지), 반환: 성공 여부"""
+    t0 = time.perf_counter()
     try:
-        container.create_container()
-        logging.info("[BLOB] created container: raw")
-    except Exception:
-        pass  # 이미 존재
+        _raw_container().upload_blob(
+            name=name,
+            data=data,
+            overwrite=True,
+            content_settings=ContentSettings(content_type=content_type),
+        )
+        metrics.observe("blob_upload_seconds", time.perf_counter() - t0, kind=content_type.rsplit("/", 1)[-1])
+        return True
+    except Exception as e:
+        logging.error(f"[BLOB] upload failed {name}: {e}")
+        metrics.inc("blob_upload_failed")
+        SPILL.save(name, data)
+        return False
 
-    ts = datetime.now(timezone.utc)
 
-    blob_path = (
-        f"{ts:%Y/%m/%d/%H}/"
-        f"bike_snapshot_{ts:%Y%m%d_%H%M%S}.json"
+def _upload_json(blob_stem, obj):
+    """JSON 스트리밍 직렬화 (+gzip) 후 업로드, 반환: (blob 경로, 바이트 수, 성공 여부)"""
+    name = blob_stem + (".json.gz" if GZIP_MODE else ".json")
+    with metrics.timer("payload_encode_seconds"):
+        data, size = blob_writer.encode_json(obj, compress=GZIP_MODE)
+    metrics.observe("payload_bytes", size)
+    with data:
+        ok = _upload(name, data, "application/gzip" if GZIP_MODE else "application/json")
+    return name, size, ok
+
+
+def retry_spilled():
+    n = SPILL.retry(lambda name, fh: _raw_container().upload_blob(name=name, data=fh, overwrite=True))
+    if n:
+        logging.info(f"[SPILL] re-uploaded {n} blob(s)")
+
+
+def upload_to_blob(rows, ts=None, prefix=""):
+    ts = ts or datetime.now(timezone.utc)
+
+    blob_stem = (
+        f"{prefix}{ts:%Y/%m/%d/%H}/"
+        f"bike_snapshot_{ts:%Y%m%d_%H%M%S}"
     )
 
     payload = {
@@ -85,13 +150,128 @@ def upload_to_blob(rows):
         }
     }
 
-    container.upload_blob(
-        name=blob_path,
-        data=json.dumps(payload, ensure_ascii=False).encode("utf-8"),
-        overwrite=True
+    blob_path, size, ok = _upload_json(blob_stem, payload)
+    if ok:
+        logging.info(f"[UPLOADED] raw/{blob_path} bytes={size}")
+
+
+# =========================================================
+# 2-1. Delta 모드 업로드 (바뀐 대여소만 기록)
+# =========================================================
+def _delta_records(container, ts):
+    """현재 시간 폴더의 delta 레코드 (업로드된 것 + 아직 spill 에 남은 것), 수집 시각 순"""
+    prefix = f"{ts:%Y/%m/%d/%H}/bike_delta_"
+    found = SPILL.find(prefix)
+    for b in container.list_blobs(name_starts_with=prefix):
+        found.setdefault(b.name, None)
+
+    records = []
+    for name in sorted(found):
+        path = found[name]
+        raw = path.read_bytes() if path else container.download_blob(name).readall()
+        records.append(json.loads(gzip.decompress(raw) if name.endswith(".gz") else raw))
+    return records
+
+
+def _load_delta_state(container, ts):
+    global _delta_state
+    if _delta_state is None:
+        records = _delta_records(container, ts)
+        _delta_state = delta.state_from_records(records)
+        logging.info(f"[DELTA] state rebuilt from {len(records)} record(s) of this hour")
+    return _delta_state
+
+
+def upload_delta(rows, ts=None):
+    global _delta_state
+    container = _raw_container()
+    ts = ts or datetime.now(timezone.utc)
+
+    record, new_state = delta.encode(rows, _load_delta_state(container, ts), ts)
+
+    blob_stem = (
+        f"{ts:%Y/%m/%d/%H}/"
+        f"bike_delta_{ts:%Y%m%d_%H%M%S}"
+    )
+    # 실패해도 spill에 남아 다음 tick에 순서대로 재업로드되므로 상태는 계속 진행
+    blob_path, size, ok = _upload_json(blob_stem, record)
+    _delta_state = new_state
+
+    n = len(record["row"]) if record["type"] == "keyframe" else len(record["changed"])
+    if ok:
+        logging.info(f"[UPLOADED] raw/{blob_path} type={record['type']} rows={n} bytes={size}")
+
+
+# =========================================================
+# 2-2. Parquet 사본 업로드 (컬럼형, 타입/압축 적용)
+# =========================================================
+def upload_parquet(rows, ts=None):
+    if not columnar.available():
+        logging.warning("[PARQUET] pyarrow not installed, skipped")
+        return
+
+    ts = ts or datetime.now(timezone.utc)
+
+    blob_path = (
+        f"{ts:%Y/%m/%d/%H}/"
+        f"bike_snapshot_{ts:%Y%m%d_%H%M%S}.parquet"
     )
+    data = columnar.to_parquet_bytes(rows, ts)
+    if _upload(blob_path, data, "application/vnd.apache.parquet"):
+        logging.info(f"[UPLOADED] raw/{blob_path} bytes={len(data)}")
 
-    logging.info(f"[UPLOADED] raw/{blob_path}")
+
+# =========================================================
+# 2-3. 품질 검사 (업로드 전) → 요약은 _quality/, fail 이면 _quarantine/
+# =========================================================
+def _load_quality_state(container):
+    global _quality_state
+    if _quality_state is None:
+        try:
+            raw = container.get_blob_client(QUALITY_STATE_BLOB).download_blob().readall()
+            _quality_state = json.loads(raw)
+        except ResourceNotFoundError:
+            _quality_state = {}
+    return _quality_state
+
+
+def check_quality(rows, total, ts):
+    """반환: 정상 경로(raw/YYYY/...)로 올려도 되는지"""
+    global _quality_state
+    container = _raw_container()
+    try:
+        summary, new_state = quality.check(rows, total, _load_quality_state(container), ts)
+    except Exception as e:
+        # 검사 자체의 오류로 수집을 멈추지 않음
+        logging.warning(f"[QUALITY] check skipped: {e}")
+        return True
+
+    metrics.observe("quality_check_seconds", summary["elapsed_ms"] / 1000)
+    metrics.inc("quality_status", status=summary["status"])
+    for name, c in summary["checks"].items():
+        if c.get("count"):
+            metrics.inc("quality_flagged", c["count"], check=name)
+
+    name = f"_quality/{ts:%Y/%m/%d/%H}/quality_{ts:%Y%m%d_%H%M%S}.json"
+    _upload(name, json.dumps(summary, ensure_ascii=False).encode("utf-8"))
+
+    if summary["status"] == "fail":
+        # 불량 스냅샷은 상태에 반영하지 않음 (다음 tick도 마지막 정상 스냅샷과 비교)
+        logging.error(f"[QUALITY] fail {summary['reasons']}")
+        return False
+
+    if summary["status"] == "warn":
+        flagged = {k: c["count"] for k, c in summary["checks"].items() if c.get("count")}
+        logging.warning(f"[QUALITY] warn {flagged}")
+
+    state, _ = blob_writer.encode_json(new_state)
+    with state:
+        try:
+            container.upload_blob(name=QUALITY_STATE_BLOB, data=state, overwrite=True)
+        except Exception as e:
+            logging.warning(f"[QUALITY] state upload failed (kept in memory): {e}")
+    _quality_state = new_state
+    return True
 
 
 # =========================================================
@@ -109,8 +289,24 @@ def bike_api_ingest(myTimer: func.TimerRequest) -> None:
     if myTimer.past_due:
         logging.warning("⚠️ Timer is past due")
 
-    rows = fetch_all()
-    if rows:
-        upload_to_blob(rows)
+    # 지난 tick에 실패한 업로드 먼저 재시도
+    retry_spilled()
+
+    with metrics.timer("fetch_all_seconds"):
+        rows, total = fetch_all()
+    ts = datetime.now(timezone.utc)
+
+    # 행이 없어도 검사 (JSON 경로가 바뀐 경우 요약에 fail 로 남음)
+    if QUALITY_MODE and not check_quality(rows, total, ts):
+        if rows:
+            upload_to_blob(rows, ts, prefix="_quarantine/")
+    elif rows:
+        if DELTA_MODE:
+            upload_delta(rows, ts)
+        else:
+            upload_to_blob(rows, ts)
+        if PARQUET_MODE:
+            upload_parquet(rows, ts)
 
+    metrics.flush("ingest", log=METRICS_TO_LOG)
     logging.info("=== BIKE API INGEST END ===")
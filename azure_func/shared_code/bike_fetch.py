@@ -0,0 +1,88 @@
+# shared_code/bike_fetch.py
+"""
+따릉이 API 페이지 병렬 수집 엔진
+
+- requests.Session 하나를 모듈 단위로 재사용 (keep-alive 커넥션 풀)
+- ThreadPoolExecutor로 페이지를 동시에 호출 (동시성 = 풀 크기로 제한)
+- 페이지별 재시도/backoff, 결과는 항상 페이지 순서대로 반환
+"""
+import time
+import logging
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# =========================================================
+# 설정값
+# =========================================================
+MAX_WORKERS = 4      # 동시 호출 수 = 커넥션 풀 크기
+RETRIES = 3          # 페이지당 최대 시도 횟수
+BACKOFF = 0.5        # 재시도 대기(초), 시도마다 2배
+TIMEOUT = 15
+
+_session = None
+
+
+@dataclass
+class PageResult:
+    start: int
+    end: int
+    rows: list = field(default_factory=list)
+    latency_ms: float = 0.0
+    attempts: int = 1
+    total: int = 0       # 응답의 list_total_count (범위 밖 페이지면 0)
+
+
+def get_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    """호출 간 재사용되는 Session (Function 인스턴스가 살아있는 동안 유지)"""
+    global _session
+    if _session is None:
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        _session = s
+    return _session
+
+
+def fetch_page(session, base: str, start: int, end: int,
+               retries: int = RETRIES, backoff: float = BACKOFF,
+               timeout: float = TIMEOUT) -> PageResult:
+    url = f"{base}/{start}/{end}/"
+    last_err = None
+
+    for attempt in range(1, retries + 1):
+        t0 = time.perf_counter()
+        try:
+            r = session.get(url, timeout=timeout)
+            r.raise_for_status()
+            data = r.json().get("rentBikeStatus", {})
+            page = data.get("row", []) or []
+            total = int(data.get("list_total_count", 0) or 0)
+            latency_ms = (time.perf_counter() - t0) * 1000
+            return PageResult(start, end, page, latency_ms, attempt, total)
+        except (requests.RequestException, ValueError) as e:
+            last_err = e
+            logging.warning(f"[RETRY {start}-{end}] attempt={attempt}/{retries} err={e}")
+            if attempt < retries:
+                time.sleep(backoff * (2 ** (attempt - 1)))
+
+    raise RuntimeError(f"page {start}-{end} failed after {retries} attempts") from last_err
+
+
+def fetch_pages(base: str, ranges, max_workers: int = MAX_WORKERS, **kwargs) -> list:
+    """
+    ranges: [(start, end), ...]
+    반환: PageResult 리스트 (ranges 순서 유지)
+    """
+    if not ranges:
+        return []
+
+    session = get_session(max_workers)
+    workers = max(1, min(max_workers, len(ranges)))
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(fetch_page, session, base, s, e, **kwargs) for s, e in ranges]
+        return [f.result() for f in futures]
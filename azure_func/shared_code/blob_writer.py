@@ -0,0 +1,96 @@
+# shared_code/blob_writer.py
+"""
+Blob 업로드 보조
+
+- encode_json(): json iterencode → (선택) gzip → SpooledTemporaryFile 로 직렬화
+  직렬화는 청크 단위지만 결과는 버퍼에 전부 담긴 뒤 업로드됨 (스트리밍 업로드 아님)
+  SPOOL_MAX 이하는 메모리, 넘으면 임시 파일 → 큰 bytes 객체를 한 번에 만들지는 않음
+  버퍼로 두는 이유: 업로드 실패 시 Spill 에 같은 내용을 남기고, SDK 재시도/청크 업로드가 되감아 읽을 수 있어야 함
+- Spill: 업로드 실패한 blob을 로컬에 보관했다가 다음 tick에 재시도
+"""
+import io
+import os
+import gzip
+import json
+import shutil
+import logging
+import tempfile
+from pathlib import Path
+from urllib.parse import quote, unquote
+
+SPOOL_MAX = int(os.getenv("BIKE_SPOOL_MAX", str(8 * 1024 * 1024)))   # 이보다 크면 임시 파일로 넘어감
+SPILL_DIR = Path(os.getenv("BIKE_SPILL_DIR", str(Path(tempfile.gettempdir()) / "bike_spill")))
+
+
+def encode_json(obj, compress: bool = False):
+    """반환: (읽기 위치 0으로 되감은 파일 객체, 바이트 수) - 전체 내용이 버퍼(메모리/임시 파일)에 있음"""
+    buf = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX)
+    sink = gzip.GzipFile(fileobj=buf, mode="wb", compresslevel=6, mtime=0) if compress else buf
+
+    w = io.TextIOWrapper(sink, encoding="utf-8", write_through=False)
+    for chunk in json.JSONEncoder(ensure_ascii=False).iterencode(obj):
+        w.write(chunk)
+    w.flush()
+    w.detach()
+    if compress:
+        sink.close()  # gzip trailer 기록 (buf는 닫지 않음)
+
+    size = buf.tell()
+    buf.seek(0)
+    return buf, size
+
+
+class Spill:
+    """업로드 실패분 로컬 보관 (파일명 = blob 경로를 percent-encoding, '/' → '%2F')"""
+
+    def __init__(self, root: Path = SPILL_DIR):
+        self.root = Path(root)
+
+    @staticmethod
+    def _file_name(blob_name: str) -> str:
+        return quote(blob_name, safe="")
+
+    @staticmethod
+    def _blob_name(file_name: str) -> str:
+        return unquote(file_name)
+
+    def save(self, blob_name: str, data) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / self._file_name(blob_name)
+        if hasattr(data, "read"):
+            data.seek(0)
+            with open(path, "wb") as fh:
+                shutil.copyfileobj(data, fh)
+        else:
+            path.write_bytes(data)
+        logging.warning(f"[SPILL] saved {blob_name} -> {path}")
+
+    def pending(self) -> list:
+        if not self.root.exists():
+            return []
+        return sorted(p for p in self.root.iterdir() if p.is_file())
+
+    def find(self, prefix: str) -> dict:
+        """보관 중인 것 중 blob 경로가 prefix 로 시작하는 것 {blob_name: 파일 경로}"""
+        found = {}
+        for path in self.pending():
+            name = self._blob_name(path.name)
+            if name.startswith(prefix):
+                found[name] = path
+        return found
+
+    def retry(self, upload) -> int:
+        """upload(blob_name, fileobj) 로 보관분 재업로드, 성공한 건 삭제. 반환: 성공 수"""
+        ok = 0
+        for path in self.pending():
+            name = self._blob_name(path.name)
+            try:
+                with open(path, "rb") as fh:
+                    upload(name, fh)
+            except Exception as e:
+                logging.warning(f"[SPILL] retry failed {name}: {e}")
+                break  # 아직 장애 중 → 다음 tick에 다시
+            path.unlink()
+            ok += 1
+            logging.info(f"[SPILL] re-uploaded {name}")
+        return ok
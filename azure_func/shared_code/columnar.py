@@ -0,0 +1,92 @@
+# shared_code/columnar.py
+"""
+Raw 스냅샷 → Parquet (컬럼형, 압축)
+
+- 문자열 숫자를 타입 변환: 거치대/자전거 수 int16, 위경도 float64
+- station_id / station_name 은 dictionary 인코딩
+- pyarrow는 선택 의존성: 없으면 available() == False
+"""
+import io
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 기능
+    pa = None
+    pq = None
+
+COMPRESSION = "zstd"
+
+# API 필드 → 컬럼명 (SQL bike_status 컬럼명과 동일)
+FIELDS = {
+    "stationId": "station_id",
+    "stationName": "station_name",
+    "rackTotCnt": "rack_tot_cnt",
+    "parkingBikeTotCnt": "parking_bike_tot_cnt",
+    "shared": "shared",
+    "stationLatitude": "lat",
+    "stationLongitude": "lon",
+}
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def schema():
+    return pa.schema([
+        ("station_id", pa.dictionary(pa.int32(), pa.string())),
+        ("station_name", pa.dictionary(pa.int32(), pa.string())),
+        ("rack_tot_cnt", pa.int16()),
+        ("parking_bike_tot_cnt", pa.int16()),
+        ("shared", pa.int16()),
+        ("lat", pa.float64()),
+        ("lon", pa.float64()),
+        ("ts_utc", pa.timestamp("s", tz="UTC")),
+    ])
+
+
+def _int(v):
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_table(rows, ts):
+    """rentBikeStatus.row 리스트 → pyarrow.Table (ts: tz-aware datetime)"""
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+
+    cols = {name: [] for name in FIELDS.values()}
+    for r in rows:
+        cols["station_id"].append(r.get("stationId"))
+        cols["station_name"].append(r.get("stationName"))
+        cols["rack_tot_cnt"].append(_int(r.get("rackTotCnt")))
+        cols["parking_bike_tot_cnt"].append(_int(r.get("parkingBikeTotCnt")))
+        cols["shared"].append(_int(r.get("shared")))
+        cols["lat"].append(_float(r.get("stationLatitude")))
+        cols["lon"].append(_float(r.get("stationLongitude")))
+    cols["ts_utc"] = [ts] * len(rows)
+
+    sch = schema()
+    arrays = []
+    for f in sch:
+        if pa.types.is_dictionary(f.type):
+            arrays.append(pa.array(cols[f.name], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(cols[f.name], type=f.type))
+    return pa.Table.from_arrays(arrays, schema=sch)
+
+
+def to_parquet_bytes(rows, ts, compression: str = COMPRESSION) -> bytes:
+    buf = io.BytesIO()
+    pq.write_table(to_table(rows, ts), buf, compression=compression)
+    return buf.getvalue()
@@ -0,0 +1,121 @@
+# shared_code/delta.py
+"""
+스냅샷 delta 인코딩
+
+- 이전 스냅샷 상태를 stationId 기준으로 보관하고, 바뀐 대여소/필드만 기록
+- 매 시간 첫 스냅샷은 전체 keyframe → raw/YYYY/MM/DD/HH/ 폴더 하나만 있으면 복원 가능
+- rebuild()로 keyframe + delta 레코드에서 임의 시점 스냅샷 복원
+- 인코딩 상태는 따로 저장하지 않음: 콜드 스타트 때 현재 시간 폴더의 레코드로 state_from_records()
+
+레코드 형식
+  {"type": "keyframe", "timestamp_utc": ..., "row": [전체 row]}
+  {"type": "delta", "timestamp_utc": ..., "changed": [{"stationId": .., 바뀐 필드만}], "removed": [stationId]}
+"""
+from datetime import datetime
+
+KEY = "stationId"
+
+
+def _hour(ts_iso: str) -> str:
+    return ts_iso[:13]  # "YYYY-MM-DDTHH"
+
+
+def index_rows(rows) -> dict:
+    return {r[KEY]: r for r in rows if r.get(KEY)}
+
+
+def is_keyframe_due(state: dict, ts: datetime) -> bool:
+    """상태가 없거나 시간(hour)이 바뀌면 keyframe"""
+    if not state or not state.get("stations"):
+        return True
+    return _hour(state["timestamp_utc"]) != _hour(ts.isoformat())
+
+
+def encode(rows, state: dict, ts: datetime):
+    """
+    rows: 이번 tick의 rentBikeStatus.row
+    state: 직전 상태 {"timestamp_utc": .., "stations": {stationId: row}} (없으면 None/{})
+    반환: (record, new_state)
+    """
+    cur = index_rows(rows)
+    ts_iso = ts.isoformat()
+    new_state = {"timestamp_utc": ts_iso, "stations": cur}
+
+    if is_keyframe_due(state, ts):
+        record = {"type": "keyframe", "timestamp_utc": ts_iso, "row": list(cur.values())}
+        return record, new_state
+
+    prev = state["stations"]
+    changed = []
+    for sid, row in cur.items():
+        old = prev.get(sid)
+        if old is None:
+            changed.append(row)
+            continue
+        diff = {k: v for k, v in row.items() if old.get(k) != v}
+        if diff:
+            diff[KEY] = sid
+            changed.append(diff)
+
+    removed = [sid for sid in prev if sid not in cur]
+
+    record = {
+        "type": "delta",
+        "timestamp_utc": ts_iso,
+        "changed": changed,
+        "removed": removed,
+    }
+    return record, new_state
+
+
+def apply(stations: dict, record: dict) -> dict:
+    """stations(dict) 를 record 기준으로 갱신 (in-place)"""
+    if record.get("type") == "keyframe":
+        stations.clear()
+        stations.update({r[KEY]: dict(r) for r in record.get("row", [])})
+        return stations
+
+    for sid in record.get("removed", []):
+        stations.pop(sid, None)
+    for diff in record.get("changed", []):
+        stations.setdefault(diff[KEY], {}).update(diff)
+    return stations
+
+
+def state_from_records(records) -> dict:
+    """현재 시간 폴더의 레코드(timestamp_utc 순) → encode() 상태, keyframe 이 없으면 {} (다음 tick 이 keyframe)"""
+    try:
+        payload = rebuild(records)
+    except ValueError:
+        return {}
+    return {"timestamp_utc": payload["meta"]["timestamp_utc"], "stations": index_rows(payload["rentBikeStatus"]["row"])}
+
+
+def rebuild(records, at: str = None) -> dict:
+    """
+    records: timestamp_utc 순으로 정렬된 레코드 (keyframe 포함)
+    at: timestamp_utc와 같은 형식의 ISO 시각 (이 시각 이하의 마지막 상태), None이면 마지막 레코드
+    반환: 원본과 같은 스냅샷 payload
+    """
+    stations = {}
+    last_ts = None
+    seen_keyframe = False
+
+    for rec in records:
+        if at is not None and rec["timestamp_utc"] > at:
+            break
+        if rec.get("type") == "keyframe":
+            seen_keyframe = True
+        elif not seen_keyframe:
+            continue  # keyframe 이전 delta는 복원 불가
+        apply(stations, rec)
+        last_ts = rec["timestamp_utc"]
+
+    if last_ts is None:
+        raise ValueError("no keyframe at or before requested time")
+
+    rows = list(stations.values())
+    return {
+        "meta": {"timestamp_utc": last_ts, "total_rows": len(rows)},
+        "rentBikeStatus": {"row": rows},
+    }
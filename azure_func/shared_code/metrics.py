@@ -0,0 +1,204 @@
+# shared_code/metrics.py
+"""
+가벼운 계측 (Function / 로컬 스크립트 / 대시보드 공용)
+
+- inc(): 카운터 (행 수, 바이트 수, 캐시 hit/miss ...)
+- observe() / timer(): 히스토그램 (count/sum/min/max + 최근 SAMPLE_MAX 개로 p50/p95)
+- 라벨은 키워드 인자 → "name{k=v,...}" 한 키로 저장
+- flush(run): 이번 실행 누적값을 JSON Lines 한 줄로 METRICS_PATH 에 추가하고 초기화
+  (쓰기 실패는 경고만, 본 작업에는 영향 없음 / MAX_BYTES 넘으면 runs.jsonl.1 ~ .ROTATE_KEEP 로 교체)
+  · log=True: 파일 대신 logging 으로 (Function 처럼 작업 폴더가 읽기 전용/임시인 곳)
+- flush_every(run, seconds): 마지막 기록 후 seconds 가 지났을 때만 flush
+  (대시보드처럼 rerun 마다 불리는 곳, 레코드 = 그 구간 동안 프로세스 전체(모든 세션) 합계)
+- to_prometheus(): 같은 값을 Prometheus text 형식으로
+"""
+import os
+import json
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+METRICS_PATH = Path(os.getenv("BIKE_METRICS_PATH", str(Path("data") / "metrics" / "runs.jsonl")))
+ENABLED = os.getenv("BIKE_METRICS", "1") == "1"
+SAMPLE_MAX = 1024
+MAX_BYTES = int(os.getenv("BIKE_METRICS_MAX_BYTES", str(5 << 20)))
+ROTATE_KEEP = 3
+
+
+def _key(name: str, labels: dict) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f"{k}={labels[k]}" for k in sorted(labels)) + "}"
+
+
+def _quantile(sorted_vals: list, q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    i = min(int(q * (len(sorted_vals) - 1) + 0.5), len(sorted_vals) - 1)
+    return sorted_vals[i]
+
+
+class _Hist:
+    __slots__ = ("count", "sum", "min", "max", "samples")
+
+    def __init__(self):
+        self.count, self.sum = 0, 0.0
+        self.min, self.max = float("inf"), float("-inf")
+        self.samples = []
+
+    def add(self, v: float) -> None:
+        self.count += 1
+        self.sum += v
+        self.min = min(self.min, v)
+        self.max = max(self.max, v)
+        if len(self.samples) < SAMPLE_MAX:
+            self.samples.append(v)
+        else:
+            self.samples[self.count % SAMPLE_MAX] = v
+
+    def summary(self) -> dict:
+        s = sorted(self.samples)
+        return {
+            "count": self.count, "sum": round(self.sum, 6),
+            "min": round(self.min, 6), "max": round(self.max, 6),
+            "p50": round(_quantile(s, 0.5), 6), "p95": round(_quantile(s, 0.95), 6),
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.hists = {}
+        self._flushed = {}   # run → 마지막 flush_every 시각 (monotonic)
+
+    def inc(self, name: str, n: float = 1, **labels) -> None:
+        if not ENABLED:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            self.counters[k] = self.counters.get(k, 0) + n
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        if not ENABLED:
+            return
+        k = _key(name, labels)
+        with self._lock:
+            h = self.hists.get(k)
+            if h is None:
+                h = self.hists[k] = _Hist()
+            h.add(float(value))
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """with timer("sql_query_seconds", query="recent"): ... → 초 단위 히스토그램"""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - t0, **labels)
+
+    def snapshot(self, reset: bool = False) -> dict:
+        with self._lock:
+            out = {
+                "counters": dict(self.counters),
+                "histograms": {k: h.summary() for k, h in self.hists.items()},
+            }
+            if reset:
+                self.counters, self.hists = {}, {}
+        return out
+
+    def flush(self, run: str, path: Path = None, log: bool = False, **extra) -> dict:
+        """이번 실행 누적값 → JSON Lines 1줄 추가(log=True 면 logging) 후 초기화, 반환: 기록한 레코드"""
+        rec = {"run": run, "ts_utc": datetime.now(timezone.utc).isoformat(), **extra, **self.snapshot(reset=True)}
+        if not ENABLED or (not rec["counters"] and not rec["histograms"]):
+            return rec
+        line = json.dumps(rec, ensure_ascii=False)
+        if log:
+            logging.info(f"[METRICS] {line}")
+            return rec
+        path = Path(path or METRICS_PATH)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _rotate(path)
+            with open(path, "a", encoding="utf-8") as fh:
+                fh.write(line + "\n")
+        except OSError as e:
+            logging.warning(f"[METRICS] write failed {path}: {e}")
+        return rec
+
+    def flush_every(self, run: str, seconds: float, path: Path = None, **extra):
+        """마지막 기록 후 seconds 가 지났을 때만 flush (첫 호출은 구간 시작), 반환: 레코드 또는 None"""
+        now = time.monotonic()
+        with self._lock:
+            last = self._flushed.get(run)
+            if last is not None and now - last < seconds:
+                return None
+            self._flushed[run] = now
+        if last is None:
+            return None
+        return self.flush(run, path, interval_s=round(now - last, 1), **extra)
+
+    def to_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines = []
+        for k, v in sorted(snap["counters"].items()):
+            base, lab = _prom_split(k)
+            lines.append(f"{base}_total{lab} {v}")
+        for k, h in sorted(snap["histograms"].items()):
+            base, lab = _prom_split(k)
+            lines.append(f"{base}_count{lab} {h['count']}")
+            lines.append(f"{base}_sum{lab} {h['sum']}")
+            for q in ("p50", "p95"):
+                ql = f'quantile="0.{q[1:]}"'
+                lines.append(f"{base}{{{ql}{',' + lab[1:-1] if lab else ''}}} {h[q]}")
+        return "\n".join(lines) + "\n"
+
+
+def _rotate(path: Path) -> None:
+    """path 가 MAX_BYTES 이상이면 path.1 ~ path.ROTATE_KEEP 로 밀어냄 (가장 오래된 것은 삭제)"""
+    if not path.exists() or path.stat().st_size < MAX_BYTES:
+        return
+    for i in range(ROTATE_KEEP - 1, 0, -1):
+        src = path.with_name(f"{path.name}.{i}")
+        if src.exists():
+            src.replace(path.with_name(f"{path.name}.{i + 1}"))
+    path.replace(path.with_name(f"{path.name}.1"))
+
+
+def _prom_split(key: str):
+    if "{" not in key:
+        return key, ""
+    base, rest = key.split("{", 1)
+    pairs = [p.split("=", 1) for p in rest.rstrip("}").split(",") if p]
+    return base, "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def read_runs(n: int = 50, path: Path = None, run: str = None) -> list:
+    """최근 n개 실행 레코드 (run 지정 시 해당 실행만), 오래된 → 최신 순"""
+    path = Path(path or METRICS_PATH)
+    if not path.exists():
+        return []
+    out = deque(maxlen=n)
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if run is None or rec.get("run") == run:
+                out.append(rec)
+    return list(out)
+
+
+# 프로세스 공용 레지스트리
+registry = Registry()
+inc = registry.inc
+observe = registry.observe
+timer = registry.timer
+flush = registry.flush
+flush_every = registry.flush_every
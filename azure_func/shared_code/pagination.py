@@ -0,0 +1,81 @@
+# shared_code/pagination.py
+"""
+list_total_count 기반 페이지 계획
+
+- 첫 응답의 list_total_count로 나머지 페이지 구간을 계산
+- 마지막으로 확인한 total을 캐시 파일에 저장 → 다음 실행은 모든 페이지를 한 번에 병렬 호출
+- 캐시보다 대여소가 늘었으면 부족한 구간만 추가 호출, 줄었으면 빈 페이지는 무시
+"""
+import os
+import json
+import logging
+import tempfile
+from pathlib import Path
+
+from shared_code import bike_fetch
+
+PAGE_SIZE = 999      # API 1회 최대 1000건, 기존 구간 크기 유지
+CACHE_PATH = Path(os.getenv(
+    "BIKE_TOTAL_CACHE",
+    str(Path(tempfile.gettempdir()) / "bike_list_total.json"),
+))
+
+_totals = {}         # 캐시 파일 경로 → total (웜 인스턴스에서는 파일을 다시 읽지 않음)
+
+
+def plan_ranges(total: int, size: int = PAGE_SIZE, first: int = 1) -> list:
+    """first ~ total 을 size 단위 (start, end) 구간으로 분할"""
+    ranges = []
+    s = first
+    while s <= total:
+        e = min(s + size - 1, total)
+        ranges.append((s, e))
+        s = e + 1
+    return ranges
+
+
+def load_total(path: Path = CACHE_PATH):
+    key = str(path)
+    if _totals.get(key) is None and path.exists():
+        try:
+            _totals[key] = int(json.loads(path.read_text(encoding="utf-8"))["total"])
+        except (ValueError, KeyError, OSError):
+            _totals[key] = None
+    return _totals.get(key)
+
+
+def save_total(total: int, path: Path = CACHE_PATH) -> None:
+    _totals[str(path)] = total
+    try:
+        path.write_text(json.dumps({"total": total}), encoding="utf-8")
+    except OSError as e:
+        logging.warning(f"[PLAN] total cache write failed: {e}")
+
+
+def fetch_planned(base: str, size: int = PAGE_SIZE, cache_path: Path = CACHE_PATH, **kwargs):
+    """
+    반환: (rows, pages, total)
+    - 캐시 total 있음: 전체 구간 병렬 호출 → 부족분만 추가 호출
+    - 캐시 없음: 첫 페이지로 total 확인 후 나머지 병렬 호출
+    """
+    cached = load_total(cache_path)
+
+    if cached:
+        pages = bike_fetch.fetch_pages(base, plan_ranges(cached, size), **kwargs)
+    else:
+        pages = bike_fetch.fetch_pages(base, [(1, size)], **kwargs)
+
+    total = max((p.total for p in pages), default=0)
+    covered = pages[-1].end if pages else 0
+
+    if total > covered:
+        logging.info(f"[PLAN] total={total} > planned={covered}, fetching rest")
+        pages += bike_fetch.fetch_pages(base, plan_ranges(total, size, covered + 1), **kwargs)
+
+    if total:
+        save_total(total, cache_path)
+
+    rows = []
+    for p in pages:
+        rows.extend(p.rows)
+    return rows, pages, total
@@ -0,0 +1,173 @@
+# shared_code/quality.py
+"""
+수집 스냅샷 품질 검사 (업로드 전, 전체 페이지를 한 번에 numpy 로)
+
+- 행 수 vs list_total_count
+- stationId 누락 / 중복
+- parkingBikeTotCnt / rackTotCnt 숫자 여부·범위
+- 거치대 대비 과다 (자전거 > 거치대 × OVER_RATIO): 거치대 밖 주차가 흔해 평소에도 몇십 곳은 걸리므로
+  전체 대여소의 OVER_WARN_RATIO 를 넘을 때만 warn (그 이하는 요약에 개수만)
+- 좌표 결측 / 서울 범위(SEOUL_BBOX) 밖
+- stuck: 직전 상태 대비 STUCK_TICKS tick 연속으로 자전거 수가 그대로인 대여소
+- stale: 직전 tick 과 거의 모든 대여소가 같음 → warn
+  (새벽처럼 조용한 시간대도 이렇게 보이므로, 응답 전체(hash)가 STALE_TICKS tick 연속 똑같을 때만 fail
+   = API 가 예전 응답을 돌려주는 경우)
+
+판정
+  fail : 행 없음 / 행 수 불일치 / 불량 행 비율 > BAD_RATIO / 같은 응답 STALE_TICKS 연속 → ingest 가 _quarantine/ 에 격리
+  warn : 그 밖에 걸린 항목이 있음 (정상 업로드, 요약에 기록)
+  ok   : 걸린 항목 없음
+
+상태 형식 (delta 상태처럼 blob + 웜 인스턴스 메모리에 보관)
+  {"timestamp_utc": .., "ids": [stationId], "bikes": [자전거 수], "same": [연속 무변화 tick 수],
+   "payload_hash": 응답 rows 해시, "identical_ticks": 직전과 같은 응답이 이어진 tick 수}
+"""
+import json
+import time
+import hashlib
+from datetime import datetime
+
+import numpy as np
+
+STUCK_TICKS = 12            # 5분 × 12 = 1시간
+COUNT_TOL = 0.01            # list_total_count 대비 허용 오차 비율
+BAD_RATIO = 0.05            # 불량 행 비율이 이보다 크면 fail
+STALE_RATIO = 0.995         # 직전 tick 과 같은 대여소 비율이 이 이상이면 warn
+STALE_TICKS = 3             # 응답 전체가 직전과 똑같은 tick 이 이만큼 이어지면 fail (5분 × 3)
+OVER_RATIO = 5.0            # 자전거 수 > 거치대 × OVER_RATIO 면 과다 (실제 스냅샷 2725곳 중 3배 초과 111곳, 5배 초과 17곳)
+OVER_WARN_RATIO = 0.05      # 과다 대여소 비율이 이보다 클 때만 warn
+RACK_MAX = 200
+SEOUL_BBOX = (37.40, 37.75, 126.70, 127.25)   # lat_min, lat_max, lon_min, lon_max
+SAMPLE = 10                 # 항목별로 요약에 남기는 stationId 수
+
+
+def _num(vals: list) -> np.ndarray:
+    """문자열/None 목록 → float (변환 실패는 NaN)"""
+    try:
+        return np.array(vals, dtype=np.float64)
+    except (TypeError, ValueError):
+        out = np.full(len(vals), np.nan)
+        for i, v in enumerate(vals):
+            try:
+                out[i] = float(v)
+            except (TypeError, ValueError):
+                pass
+        return out
+
+
+def _sample(ids: np.ndarray, mask: np.ndarray) -> list:
+    return [str(s) for s in ids[mask][:SAMPLE]]
+
+
+def payload_hash(rows, total=None) -> str:
+    """응답 rows 전체 (+ list_total_count) 해시"""
+    h = hashlib.sha1(json.dumps(rows, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    h.update(str(total).encode())
+    return h.hexdigest()
+
+
+def check(rows, total: int = None, state: dict = None, ts: datetime = None,
+          stuck_ticks: int = STUCK_TICKS):
+    """
+    rows: 이번 tick 의 rentBikeStatus.row
+    total: API 응답의 list_total_count (모르면 None → 행 수 검사 생략)
+    state: 직전 상태 (없으면 None/{} → stuck/stale 검사 생략)
+    반환: (summary, new_state)
+    """
+    t0 = time.perf_counter()
+    n = len(rows)
+    ids = np.array([r.get("stationId") or "" for r in rows], dtype=object)
+    bikes = _num([r.get("parkingBikeTotCnt") for r in rows])
+    racks = _num([r.get("rackTotCnt") for r in rows])
+    lat = _num([r.get("stationLatitude") for r in rows])
+    lon = _num([r.get("stationLongitude") for r in rows])
+
+    missing_id = ids == ""
+    uniq, counts = np.unique(ids[~missing_id].astype(str), return_counts=True)
+    dup_ids = uniq[counts > 1]
+
+    bad_bikes = np.isnan(bikes) | (bikes < 0)
+    bad_racks = np.isnan(racks) | (racks <= 0) | (racks > RACK_MAX)
+    over = ~bad_bikes & ~bad_racks & (bikes > racks * OVER_RATIO)
+    lat_min, lat_max, lon_min, lon_max = SEOUL_BBOX
+    with np.errstate(invalid="ignore"):
+        out_bbox = ~((lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max))
+    bad = missing_id | bad_bikes | bad_racks | out_bbox
+
+    # ----- 직전 상태 대비 (stationId 별 마지막 행 기준) -----
+    valid = ~missing_id
+    cur_ids, cur_bikes = ids[valid], bikes[valid]
+    same = np.zeros(len(cur_ids), dtype=np.int64)
+    unchanged = np.zeros(len(cur_ids), dtype=bool)
+    has_prev = bool(state and state.get("ids"))
+    if has_prev:
+        pos = {s: i for i, s in enumerate(state["ids"])}
+        idx = np.array([pos.get(s, -1) for s in cur_ids], dtype=np.int64)
+        seen = idx >= 0
+        prev_bikes = np.asarray(state["bikes"], dtype=np.float64)
+        prev_same = np.asarray(state["same"], dtype=np.int64)
+        unchanged[seen] = prev_bikes[idx[seen]] == cur_bikes[seen]
+        same[unchanged] = prev_same[idx[unchanged]] + 1
+    stuck = same >= stuck_ticks
+    unchanged_ratio = float(unchanged.mean()) if has_prev and len(unchanged) else 0.0
+
+    # 응답 전체가 직전과 똑같은 tick 연속 수 (대여소 대부분이 같은 것만으로는 세지 않음)
+    digest = payload_hash(rows, total)
+    identical = has_prev and n > 0 and digest == state.get("payload_hash")
+    identical_ticks = int(state.get("identical_ticks", 0)) + 1 if identical else 0
+    near_all_same = has_prev and unchanged_ratio >= STALE_RATIO
+
+    checks = {
+        "missing_id": {"count": int(missing_id.sum())},
+        "duplicate_id": {"count": int(len(dup_ids)), "sample": [str(s) for s in dup_ids[:SAMPLE]]},
+        "bad_bikes": {"count": int(bad_bikes.sum()), "sample": _sample(ids, bad_bikes)},
+        "bad_racks": {"count": int(bad_racks.sum()), "sample": _sample(ids, bad_racks)},
+        "over_capacity": {"count": int(over.sum()), "sample": _sample(ids, over),
+                          "warn": bool(n) and float(over.sum()) > OVER_WARN_RATIO * n},
+        "out_of_bbox": {"count": int(out_bbox.sum()), "sample": _sample(ids, out_bbox)},
+        "stuck": {"count": int(stuck.sum()), "sample": _sample(cur_ids, stuck), "ticks": stuck_ticks},
+        "stale": {"count": int(unchanged.sum()) if near_all_same else 0, "identical_ticks": identical_ticks},
+    }
+
+    reasons = []
+    if n == 0:
+        reasons.append("no rows")
+    if total:
+        diff = n - int(total)
+        checks["row_count"] = {"rows": n, "list_total_count": int(total), "diff": diff}
+        if abs(diff) > COUNT_TOL * int(total):
+            reasons.append(f"row count {n} != list_total_count {total}")
+    bad_ratio = float(bad.mean()) if n else 0.0
+    if bad_ratio > BAD_RATIO:
+        reasons.append(f"bad rows {bad_ratio:.1%} > {BAD_RATIO:.0%}")
+    if identical_ticks >= STALE_TICKS:
+        reasons.append(f"stale: identical response for {identical_ticks} ticks in a row")
+
+    # warn 여부를 따로 가진 항목(과다)은 그 값으로, 나머지는 걸린 개수가 있으면
+    flagged = any(c.get("warn", True) and c.get("count") for c in checks.values()) \
+        or checks.get("row_count", {}).get("diff")
+    status = "fail" if reasons else ("warn" if flagged else "ok")
+
+    summary = {
+        "timestamp_utc": ts.isoformat() if ts else None,
+        "status": status,
+        "reasons": reasons,
+        "rows": n,
+        "bad_ratio": round(bad_ratio, 4),
+        "unchanged_ratio": round(unchanged_ratio, 4),
+        "checks": checks,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+
+    # 같은 stationId 가 여러 번이면 마지막 행으로 상태 저장
+    last = {s: i for i, s in enumerate(cur_ids)}
+    keep = np.fromiter(last.values(), dtype=np.int64, count=len(last))
+    new_state = {
+        "timestamp_utc": ts.isoformat() if ts else None,
+        "ids": [str(s) for s in cur_ids[keep]],
+        "bikes": [None if np.isnan(b) else float(b) for b in cur_bikes[keep]],
+        "same": same[keep].tolist(),
+        "payload_hash": digest,
+        "identical_ticks": identical_ticks,
+    }
+    return summary, new_state
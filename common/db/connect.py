@@ -1,8 +1,11 @@
 # common/db/connect.py
 import os
+import logging
 import pyodbc
 from dotenv import load_dotenv
 
+from common import metrics
+
 load_dotenv()
 
 def _pick_driver():
@@ -12,17 +15,25 @@ def _pick_driver():
             return name
     raise RuntimeError(f"ODBC SQL Server driver not found. Installed: {drivers}")
 
-def get_conn():
+_settings = None  # (driver, server, database, uid, pwd) - 드라이버 탐색/.env 확인은 1회만
+
+def _make_conn_str(driver, server, database, uid, pwd, encrypt=True):
+    return (
+        f"Driver={{{driver}}};"
+        f"Server={server};"
+        f"Database={database};"
+        f"Uid={uid};"
+        f"Pwd={pwd};"
+        + ("Encrypt=yes;TrustServerCertificate=no;" if encrypt else "Encrypt=no;TrustServerCertificate=yes;")
+        + "Connection Timeout=30;"
+    )
+
+def _load_settings():
     server   = os.getenv("SQL_SERVER")
     database = os.getenv("SQL_DB")
     uid      = os.getenv("SQL_UID")
     pwd      = os.getenv("SQL_PWD")
 
-
-    print("[DEBUG] SQL_SERVER =", server)
-    print("[DEBUG] SQL_DB     =", database)
-    print("[DEBUG] SQL_UID    =", uid)
-
     missing = [k for k,v in {
         "SQL_SERVER": server,
         "SQL_DB": database,
@@ -32,38 +43,19 @@ def get_conn():
     if missing:
         raise RuntimeError(f".env missing keys: {missing}")
 
-    driver = _pick_driver()
-    print("[DEBUG] Using driver:", driver)
-
+    return _pick_driver(), server, database, uid, pwd
 
-    conn_str = (
-        f"Driver={{{driver}}};"
-        f"Server={server};"
-        f"Database={database};"
-        f"Uid={uid};"
-        f"Pwd={pwd};"
-        "Encrypt=yes;"
-        "TrustServerCertificate=no;"
-        "Connection Timeout=30;"
-    )
-    print("[DEBUG] Trying conn_str =", conn_str)
-
-    try:
-        conn = pyodbc.connect(conn_str)
-        return conn
-    except pyodbc.Error as e:
-        print("[DEBUG] First connect failed:", e)
-
-        fallback_conn_str = (
-            f"Driver={{{driver}}};"
-            f"Server={server};"
-            f"Database={database};"
-            f"Uid={uid};"
-            f"Pwd={pwd};"
-            "Encrypt=no;"
-            "TrustServerCertificate=yes;"
-            "Connection Timeout=30;"
-        )
-        print("[DEBUG] Trying fallback conn_str =", fallback_conn_str)
-        conn = pyodbc.connect(fallback_conn_str)
-        return conn
+def get_conn():
+    global _settings
+    if _settings is None:
+        _settings = _load_settings()
+
+    # 연결 문자열에는 비밀번호가 들어 있으므로 출력/로그에 남기지 않음
+    with metrics.timer("sql_connect_seconds"):
+        try:
+            return pyodbc.connect(_make_conn_str(*_settings, encrypt=True))
+        except pyodbc.Error as e:
+            # 암호화 연결 실패 시 이번 연결만 비암호화로 재시도 (다음 연결은 다시 암호화부터, 폴백은 캐시하지 않음)
+            logging.warning(f"[SQL] encrypted connect failed, retrying without encryption: {e}")
+            metrics.inc("sql_connect_fallback")
+            return pyodbc.connect(_make_conn_str(*_settings, encrypt=False))
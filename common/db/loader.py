@@ -0,0 +1,420 @@
+# common/db/loader.py
+"""
+Raw 스냅샷(Blob/로컬) → bike_status 대량 적재 (ADF Copy Activity 없이 재처리)
+
+- 시간 폴더 단위로 스냅샷을 순회하며 rentBikeStatus.row 평탄화 + 타입 변환 1회
+- SQL Server: #stage 임시 테이블에 fast_executemany → (station_id, ts_utc) MERGE
+- SQLite: INSERT OR IGNORE (로컬 검증용, 같은 인터페이스)
+- high-watermark 테이블: 마지막으로 적재한 ts_utc 이후 스냅샷만 적재
+  (시간 폴더 적재 + watermark 갱신을 한 트랜잭션으로 commit)
+- 적재 파일 목록(bike_load_files): watermark 아래 LATE_HOURS 시간도 다시 훑어 목록에 없는 파일만 적재
+  → spill 재시도 등으로 늦게 올라온 blob 도 빠지지 않음 (목록은 그 창 안의 것만 유지)
+  loaded_at_utc 는 export --incremental 이 지난 export 이후 늦게 적재된 시각을 찾는 데 사용
+- split=False (기본): ADF / 뷰와 같은 넓은 dbo.bike_status 한 테이블
+  split=True: 이름/좌표/거치대 수는 station_dim(변경 시에만 새 버전),
+  스냅샷마다는 bike_status_fact(station_id, ts_utc, 자전거 수)만 적재 → common/db/station_dim.py
+  (대시보드 / export 는 BIKE_READ_FACT=1 일 때만 fact 를 읽음)
+"""
+import os
+import time
+import sqlite3
+import datetime as dt
+
+from common import metrics
+from common.snapshots import hour_prefix, iter_hour, list_hour, ts_from_name
+from common.db import station_dim
+from common.db.station_dim import DIM_COLS, FACT_COLUMNS, StationDim, fact_row
+
+COLUMNS = ["station_id", "station_name", "rack_tot_cnt", "parking_bike_tot_cnt", "lat", "lon", "ts_utc"]
+BATCH_SIZE = 20000
+SOURCE = "raw"
+LATE_HOURS = int(os.getenv("BIKE_LOAD_LATE_HOURS", "24"))   # watermark 아래로 다시 확인하는 시간 (늦게 올라온 blob)
+
+
+def _int(v):
+    try:
+        return int(float(v))
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(v):
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+
+def flatten(rows, ts: dt.datetime) -> list:
+    """rentBikeStatus.row → COLUMNS 순서 튜플 (같은 스냅샷 내 station_id 중복 제거)"""
+    out = {}
+    ts_naive = ts.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    for r in rows:
+        sid = r.get("stationId")
+        if not sid:
+            continue
+        out[sid] = (
+            sid,
+            r.get("stationName"),
+            _int(r.get("rackTotCnt")),
+            _int(r.get("parkingBikeTotCnt")),
+            _float(r.get("stationLatitude")),
+            _float(r.get("stationLongitude")),
+            ts_naive,
+        )
+    return list(out.values())
+
+
+# =========================================================
+# DB별 SQL
+# =========================================================
+class SqlServerDialect:
+    wm_table = "dbo.bike_load_watermark"
+    files_table = "dbo.bike_load_files"
+    dim_table = "dbo.station_dim"
+
+    def __init__(self, split: bool = False):
+        self.split = split
+        self.table = "dbo.bike_status_fact" if split else "dbo.bike_status"
+        self.columns = FACT_COLUMNS if split else COLUMNS
+
+    def ensure_schema(self, cn):
+        if self.split:
+            cn.cursor().execute(f"""
+            IF OBJECT_ID('{self.dim_table}') IS NULL
+            CREATE TABLE {self.dim_table} (
+                station_id   NVARCHAR(20)  NOT NULL,
+                station_name NVARCHAR(200) NULL,
+                lat          FLOAT         NULL,
+                lon          FLOAT         NULL,
+                rack_tot_cnt INT           NULL,
+                valid_from   DATETIME2     NOT NULL,
+                valid_to     DATETIME2     NULL,
+                CONSTRAINT PK_station_dim PRIMARY KEY (station_id, valid_from)
+            );
+            IF OBJECT_ID('{self.table}') IS NULL
+            CREATE TABLE {self.table} (
+                station_id           NVARCHAR(20) NOT NULL,
+                ts_utc               DATETIME2    NOT NULL,
+                parking_bike_tot_cnt INT          NULL,
+                CONSTRAINT PK_bike_status_fact PRIMARY KEY (station_id, ts_utc)
+            );
+            """)
+        cn.cursor().execute(f"""
+        IF OBJECT_ID('{self.wm_table}') IS NULL
+        CREATE TABLE {self.wm_table} (
+            source       NVARCHAR(100) NOT NULL PRIMARY KEY,
+            last_ts_utc  DATETIME2     NOT NULL,
+            last_file    NVARCHAR(400) NULL,
+            updated_at   DATETIME2     NOT NULL DEFAULT SYSUTCDATETIME()
+        );
+        IF OBJECT_ID('{self.files_table}') IS NULL
+        CREATE TABLE {self.files_table} (
+            source  NVARCHAR(100) NOT NULL,
+            name    NVARCHAR(400) NOT NULL,
+            ts_utc  DATETIME2     NOT NULL,
+            loaded_at_utc DATETIME2 NOT NULL DEFAULT SYSUTCDATETIME(),
+            CONSTRAINT PK_bike_load_files PRIMARY KEY (source, name)
+        );
+        """)
+        cn.commit()
+
+    def upsert(self, cn, batch):
+        cols = ", ".join(self.columns)
+        stage = "#stage_fact" if self.split else "#stage"
+        cur = cn.cursor()
+        if self.split:
+            cur.execute(f"""
+            IF OBJECT_ID('tempdb..{stage}') IS NULL
+            CREATE TABLE {stage} (station_id NVARCHAR(20), ts_utc DATETIME2, parking_bike_tot_cnt INT);
+            TRUNCATE TABLE {stage};
+            """)
+        else:
+            cur.execute("""
+            IF OBJECT_ID('tempdb..#stage') IS NULL
+            CREATE TABLE #stage (
+                station_id NVARCHAR(20), station_name NVARCHAR(200),
+                rack_tot_cnt INT, parking_bike_tot_cnt INT,
+                lat FLOAT, lon FLOAT, ts_utc DATETIME2
+            );
+            TRUNCATE TABLE #stage;
+            """)
+        cur.fast_executemany = True
+        cur.executemany(f"INSERT INTO {stage} ({cols}) VALUES ({', '.join('?' * len(self.columns))})", batch)
+        cur.execute(f"""
+        MERGE {self.table} AS t
+        USING {stage} AS s
+           ON t.station_id = s.station_id AND t.ts_utc = s.ts_utc
+        WHEN NOT MATCHED THEN
+            INSERT ({cols}) VALUES ({", ".join("s." + c for c in self.columns)});
+        """)
+        return cur.rowcount
+
+    def upsert_dim(self, cn, changes):
+        """changes: [(station_id, name, lat, lon, rack, valid_from)] → 현재 버전 닫고 새 버전 추가"""
+        cur = cn.cursor()
+        cur.fast_executemany = True
+        cur.executemany(
+            f"UPDATE {self.dim_table} SET valid_to = ? WHERE station_id = ? AND valid_to IS NULL",
+            [(c[-1], c[0]) for c in changes],
+        )
+        cur.executemany(
+            f"INSERT INTO {self.dim_table} (station_id, {', '.join(DIM_COLS)}, valid_from) VALUES (?, ?, ?, ?, ?, ?)",
+            changes,
+        )
+
+    def get_watermark(self, cn, source):
+        row = cn.cursor().execute(
+            f"SELECT last_ts_utc FROM {self.wm_table} WHERE source = ?", source
+        ).fetchone()
+        return row[0].replace(tzinfo=dt.timezone.utc) if row else None
+
+    def set_watermark(self, cn, source, ts, last_file):
+        cur = cn.cursor()
+        ts_naive = ts.astimezone(dt.timezone.utc).replace(tzinfo=None)
+        cur.execute(
+            f"UPDATE {self.wm_table} SET last_ts_utc = ?, last_file = ?, updated_at = SYSUTCDATETIME() WHERE source = ?",
+            ts_naive, last_file, source,
+        )
+        if cur.rowcount == 0:
+            cur.execute(
+                f"INSERT INTO {self.wm_table} (source, last_ts_utc, last_file) VALUES (?, ?, ?)",
+                source, ts_naive, last_file,
+            )
+
+    def loaded_files(self, cn, source, since) -> set:
+        rows = cn.cursor().execute(
+            f"SELECT name FROM {self.files_table} WHERE source = ? AND ts_utc >= ?",
+            source, since.astimezone(dt.timezone.utc).replace(tzinfo=None),
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def mark_loaded(self, cn, source, files):
+        """files: [(name, ts)]"""
+        cur = cn.cursor()
+        cur.fast_executemany = True
+        # 이미 있는 파일은 건너뜀 (SQLite 의 INSERT OR IGNORE 와 같게)
+        cur.executemany(
+            f"INSERT INTO {self.files_table} (source, name, ts_utc) SELECT ?, ?, ? "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {self.files_table} WHERE source = ? AND name = ?)",
+            [(source, n, ts.astimezone(dt.timezone.utc).replace(tzinfo=None), source, n) for n, ts in files],
+        )
+
+    def prune_loaded(self, cn, source, before):
+        cn.cursor().execute(
+            f"DELETE FROM {self.files_table} WHERE source = ? AND ts_utc < ?",
+            source, before.astimezone(dt.timezone.utc).replace(tzinfo=None),
+        )
+
+
+class SqliteDialect:
+    wm_table = "bike_load_watermark"
+    files_table = "bike_load_files"
+    dim_table = "station_dim"
+
+    def __init__(self, split: bool = False):
+        self.split = split
+        self.table = "bike_status_fact" if split else "bike_status"
+        self.columns = FACT_COLUMNS if split else COLUMNS
+
+    def ensure_schema(self, cn):
+        if self.split:
+            cn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {self.dim_table} (
+                station_id TEXT NOT NULL, station_name TEXT, lat REAL, lon REAL, rack_tot_cnt INTEGER,
+                valid_from TEXT NOT NULL, valid_to TEXT,
+                PRIMARY KEY (station_id, valid_from)
+            );
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                station_id TEXT NOT NULL, ts_utc TEXT NOT NULL, parking_bike_tot_cnt INTEGER,
+                PRIMARY KEY (station_id, ts_utc)
+            );
+            """)
+        else:
+            cn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                station_id TEXT NOT NULL, station_name TEXT,
+                rack_tot_cnt INTEGER, parking_bike_tot_cnt INTEGER,
+                lat REAL, lon REAL, ts_utc TEXT NOT NULL,
+                PRIMARY KEY (station_id, ts_utc)
+            );
+            """)
+        cn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS {self.wm_table} (
+            source TEXT PRIMARY KEY, last_ts_utc TEXT NOT NULL,
+            last_file TEXT, updated_at TEXT
+        );
+        CREATE TABLE IF NOT EXISTS {self.files_table} (
+            source TEXT NOT NULL, name TEXT NOT NULL, ts_utc TEXT NOT NULL,
+            loaded_at_utc TEXT NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now')),
+            PRIMARY KEY (source, name)
+        );
+        """)
+        cn.commit()
+
+    def upsert(self, cn, batch):
+        cols = ", ".join(self.columns)
+        i_ts = self.columns.index("ts_utc")
+        before = cn.total_changes
+        cn.executemany(
+            f"INSERT OR IGNORE INTO {self.table} ({cols}) VALUES ({', '.join('?' * len(self.columns))})",
+            [r[:i_ts] + (r[i_ts].isoformat(sep=" "),) + r[i_ts + 1:] for r in batch],
+        )
+        return cn.total_changes - before
+
+    def upsert_dim(self, cn, changes):
+        rows = [c[:-1] + (c[-1].isoformat(sep=" "),) for c in changes]
+        cn.executemany(
+            f"UPDATE {self.dim_table} SET valid_to = ? WHERE station_id = ? AND valid_to IS NULL",
+            [(r[-1], r[0]) for r in rows],
+        )
+        cn.executemany(
+            f"INSERT INTO {self.dim_table} (station_id, {', '.join(DIM_COLS)}, valid_from) VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def get_watermark(self, cn, source):
+        row = cn.execute(f"SELECT last_ts_utc FROM {self.wm_table} WHERE source = ?", (source,)).fetchone()
+        return dt.datetime.fromisoformat(row[0]).replace(tzinfo=dt.timezone.utc) if row else None
+
+    def set_watermark(self, cn, source, ts, last_file):
+        cn.execute(
+            f"INSERT OR REPLACE INTO {self.wm_table} (source, last_ts_utc, last_file, updated_at) "
+            "VALUES (?, ?, ?, datetime('now'))",
+            (source, ts.astimezone(dt.timezone.utc).replace(tzinfo=None).isoformat(sep=" "), last_file),
+        )
+
+    @staticmethod
+    def _ts(ts) -> str:
+        return ts.astimezone(dt.timezone.utc).replace(tzinfo=None).isoformat(sep=" ")
+
+    def loaded_files(self, cn, source, since) -> set:
+        rows = cn.execute(
+            f"SELECT name FROM {self.files_table} WHERE source = ? AND ts_utc >= ?", (source, self._ts(since))
+        ).fetchall()
+        return {r[0] for r in rows}
+
+    def mark_loaded(self, cn, source, files):
+        cn.executemany(
+            f"INSERT OR IGNORE INTO {self.files_table} (source, name, ts_utc) VALUES (?, ?, ?)",
+            [(source, n, self._ts(ts)) for n, ts in files],
+        )
+
+    def prune_loaded(self, cn, source, before):
+        cn.execute(f"DELETE FROM {self.files_table} WHERE source = ? AND ts_utc < ?", (source, self._ts(before)))
+
+
+def ledger_source(split: bool = False, source: str = SOURCE) -> str:
+    """watermark / 적재 목록의 source 값 (split 은 넓은 테이블과 따로)"""
+    return f"{source}:fact" if split else source
+
+
+def dialect_for(cn, split: bool = False):
+    return SqliteDialect(split) if isinstance(cn, sqlite3.Connection) else SqlServerDialect(split)
+
+
+# =========================================================
+# 적재
+# =========================================================
+def _hours(since: dt.datetime, until: dt.datetime):
+    h = since.replace(minute=0, second=0, microsecond=0)
+    while h < until:
+        yield h
+        h += dt.timedelta(hours=1)
+
+
+def load(store, cn, since: dt.datetime = None, until: dt.datetime = None,
+         batch_size: int = BATCH_SIZE, source: str = SOURCE, rollup=None, split: bool = False,
+         late_hours: int = LATE_HOURS) -> dict:
+    """
+    store: common.storage 의 LocalStore / BlobStore (raw 컨테이너)
+    cn: get_conn() 또는 sqlite3 연결
+    since: watermark가 없을 때의 시작 시각 (watermark가 있으면 그 이후부터)
+    rollup: common.rollup.HourlyRollup (있으면 적재하는 스냅샷을 시간대 집계에도 반영)
+            시간 폴더마다 DB commit 직전에 rollup.save() → 중간에 죽어도 commit 된 시간은 집계에 남아 있고,
+            집계만 되고 commit 안 된 시간은 재실행 때 rollup watermark 이하라 중복 집계되지 않음
+            (watermark 아래로 늦게 온 파일도 같은 이유로 집계에는 반영되지 않음)
+    split: station_dim + bike_status_fact 로 적재 (기본 False: 넓은 dbo.bike_status)
+    late_hours: watermark 아래로 다시 훑는 시간, 그 안에서 적재 목록에 없는 파일(늦게 올라온 blob)도 적재
+    반환: {"files": .., "late": .., "rows": .., "inserted": .., "dim_changes": .., "watermark": ..}
+    """
+    d = dialect_for(cn, split)
+    d.ensure_schema(cn)
+    source = ledger_source(split, source)
+    if split:
+        dim = StationDim(station_dim.current_versions(station_dim.load_dim(cn, max_age=0)))
+
+    wm = d.get_watermark(cn, source)
+    if wm is None and since is None:
+        raise ValueError("no watermark yet: pass since= for the first load")
+    floor = wm - dt.timedelta(hours=late_hours) if wm is not None else None
+    start = floor or since
+    done = d.loaded_files(cn, source, floor) if floor is not None else set()
+    until = until or dt.datetime.now(dt.timezone.utc)
+
+    stats = {"files": 0, "late": 0, "rows": 0, "inserted": 0, "dim_changes": 0, "watermark": wm}
+
+    for hour in _hours(start, until):
+        t_hour = time.perf_counter()
+        all_names = list_hour(store, hour)
+        names = [n for n in all_names
+                 if n not in done and (floor is None or (ts_from_name(n) or hour) >= floor)]
+        if not names:
+            continue
+
+        # delta 레코드는 keyframe부터 복원해야 하므로 폴더 전체 순회, 적재는 신규분만
+        new = set(names)
+        has_delta = any("/bike_delta_" in n for n in all_names)
+        batch, loaded, last_ts, last_name = [], [], None, None
+        for ts, name, rows in iter_hour(store, hour, all_names if has_delta else names):
+            if name not in new or ts >= until:
+                continue
+            late = wm is not None and ts <= wm
+            flat = flatten(rows, ts)
+            metrics.inc("etl_rows_parsed", len(flat))
+            if split:
+                # 속성이 바뀐 대여소만 차원에 새 버전, fact 에는 수량만
+                # (늦게 온 파일은 현재 버전보다 과거라 차원은 건드리지 않음)
+                changes = [] if late else dim.observe(flat)
+                if changes:
+                    with metrics.timer("sql_upsert_seconds", table=d.dim_table):
+                        d.upsert_dim(cn, changes)
+                    stats["dim_changes"] += len(changes)
+                flat = [fact_row(r) for r in flat]
+            batch.extend(flat)
+            if rollup is not None:
+                rollup.update_snapshot(rows, ts)
+            stats["files"] += 1
+            loaded.append((name, ts))
+            if late:
+                stats["late"] += 1
+            elif last_ts is None or ts > last_ts:
+                last_ts, last_name = ts, name
+            if len(batch) >= batch_size:
+                with metrics.timer("sql_upsert_seconds", table=d.table):
+                    stats["inserted"] += max(d.upsert(cn, batch), 0)
+                stats["rows"] += len(batch)
+                batch = []
+
+        if batch:
+            with metrics.timer("sql_upsert_seconds", table=d.table):
+                stats["inserted"] += max(d.upsert(cn, batch), 0)
+            stats["rows"] += len(batch)
+        d.mark_loaded(cn, source, loaded)
+        if last_ts is not None:
+            d.set_watermark(cn, source, last_ts, last_name)
+            wm = stats["watermark"] = last_ts
+        if rollup is not None and loaded:
+            rollup.save()
+        cn.commit()
+        metrics.observe("etl_hour_seconds", time.perf_counter() - t_hour)
+        metrics.inc("etl_files_loaded", len(names))
+        print(f"[LOAD] {hour_prefix(hour)} files={len(names)} rows_total={stats['rows']} dim_changes={stats['dim_changes']}")
+
+    if stats["late"]:
+        metrics.inc("etl_late_files", stats["late"])
+        print(f"[LOAD] late files below watermark: {stats['late']}")
+    if wm is not None:
+        d.prune_loaded(cn, source, wm - dt.timedelta(hours=late_hours))
+        cn.commit()
+    return stats
@@ -0,0 +1,112 @@
+# common/db/pool.py
+"""
+Azure SQL 커넥션 풀 (프로세스 공용)
+
+- 연결 문자열/드라이버는 get_conn()이 한 번만 결정하고 재사용
+- 동시 사용 커넥션 수 상한 (BoundedSemaphore)
+- 꺼낼 때 일정 시간 이상 놀던 커넥션은 SELECT 1로 상태 확인, 오래된 커넥션은 재생성
+- 예외가 난 커넥션은 풀에 돌려놓지 않고 폐기
+
+사용:
+    from common.db.pool import get_pool
+    with get_pool().connection() as cn:
+        df = pd.read_sql(sql, cn)
+"""
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from common import metrics
+from common.db.connect import get_conn
+
+MAX_SIZE = int(os.getenv("SQL_POOL_SIZE", "4"))
+MAX_AGE = 30 * 60        # 이 시간(초)이 지난 커넥션은 닫고 새로 연결
+PING_AFTER = 60          # 이 시간(초) 이상 놀던 커넥션은 꺼낼 때 상태 확인
+ACQUIRE_TIMEOUT = 30
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, connect=get_conn, max_size: int = MAX_SIZE, max_age: float = MAX_AGE,
+                 ping_after: float = PING_AFTER, acquire_timeout: float = ACQUIRE_TIMEOUT):
+        self._connect = connect
+        self.max_age = max_age
+        self.ping_after = ping_after
+        self.acquire_timeout = acquire_timeout
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = []              # [(conn, created_at, last_used_at)] LIFO
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _close(cn):
+        try:
+            cn.close()
+        except Exception:
+            pass
+
+    def _healthy(self, cn) -> bool:
+        try:
+            cur = cn.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchone()
+            return True
+        except Exception:
+            return False
+
+    def _checkout(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                item = self._idle.pop() if self._idle else None
+            if item is None:
+                metrics.inc("sql_pool_checkout", result="new")
+                return self._connect(), now
+
+            cn, created, last_used = item
+            if now - created > self.max_age:
+                metrics.inc("sql_pool_checkout", result="expired")
+                self._close(cn)
+                continue
+            if now - last_used > self.ping_after and not self._healthy(cn):
+                metrics.inc("sql_pool_checkout", result="dead")
+                self._close(cn)
+                continue
+            metrics.inc("sql_pool_checkout", result="reuse")
+            return cn, created
+
+    @contextmanager
+    def connection(self):
+        with metrics.timer("sql_pool_wait_seconds"):
+            acquired = self._slots.acquire(timeout=self.acquire_timeout)
+        if not acquired:
+            raise RuntimeError("SQL connection pool exhausted")
+        try:
+            cn, created = self._checkout()
+            try:
+                yield cn
+                cn.commit()
+            except Exception:
+                # 상태를 알 수 없는 커넥션은 재사용하지 않음
+                self._close(cn)
+                raise
+            with self._lock:
+                self._idle.append((cn, created, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for cn, _, _ in idle:
+            self._close(cn)
+
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool()
+        return _pool
@@ -0,0 +1,143 @@
+# common/db/station_dim.py
+"""
+대여소 차원(station_dim) 분리 - 자주 안 바뀌는 속성은 변경될 때만 한 버전씩 저장
+
+- station_dim: (station_id, valid_from) → station_name, lat, lon, rack_tot_cnt, valid_to(현재 버전은 NULL)
+- bike_status_fact: station_id, ts_utc, parking_bike_tot_cnt 만 (스냅샷마다 쌓이는 부분)
+- 적재: StationDim.observe() 가 스냅샷마다 현재 버전과 비교 → 바뀐 대여소만 (이전 버전 닫기 + 새 버전)
+- 읽기: load_dim() 으로 차원을 프로세스 메모리에 캐시 (DIM_TTL 초), join() 으로 붙임
+  · 현재 버전만 있는 대여소는 station_id 매핑, 여러 버전이면 ts_utc 기준 as-of 조인
+  · 대시보드 / export 는 BIKE_READ_FACT=1 일 때만 fact 를 읽음 (기본은 ADF 가 채우는 dbo.bike_status)
+"""
+import os
+import time
+import sqlite3
+import threading
+
+import pandas as pd
+
+from common import metrics
+
+DIM_COLS = ["station_name", "lat", "lon", "rack_tot_cnt"]
+FACT_COLUMNS = ["station_id", "ts_utc", "parking_bike_tot_cnt"]
+DIM_TTL = 300
+READ_FACT = os.getenv("BIKE_READ_FACT", "0") == "1"   # fact 를 채우는 적재(load_raw_to_sql --split)가 운영 경로일 때만 켬
+COORD_DIGITS = 6   # 좌표 비교 자릿수 (API 문자열 → float 오차 무시)
+
+_cache = {}        # 테이블 → (읽은 시각, DataFrame)
+_cache_lock = threading.Lock()
+
+
+def _tables(cn):
+    if isinstance(cn, sqlite3.Connection):
+        return "station_dim", "bike_status_fact"
+    return "dbo.station_dim", "dbo.bike_status_fact"
+
+
+class StationDim:
+    """적재 중인 현재 버전 (station_id → (station_name, lat, lon, rack_tot_cnt))"""
+
+    def __init__(self, current: dict = None):
+        self.current = dict(current or {})
+
+    def observe(self, flat_rows) -> list:
+        """
+        loader.flatten() 결과 (station_id, station_name, rack, bikes, lat, lon, ts) 중
+        속성이 바뀐(또는 새) 대여소만 [(station_id, name, lat, lon, rack, valid_from)]
+        결측 속성은 이전 값 유지 (결측만으로는 새 버전을 만들지 않음)
+        """
+        changes = []
+        for sid, name, rack, _, lat, lon, ts in flat_rows:
+            new = (name, lat, lon, rack)
+            old = self.current.get(sid)
+            if old is not None:
+                new = tuple(o if n is None else n for n, o in zip(new, old))
+                if _same(new, old):
+                    continue
+            self.current[sid] = new
+            changes.append((sid,) + new + (ts,))
+        return changes
+
+
+def _same(a: tuple, b: tuple) -> bool:
+    """좌표는 COORD_DIGITS 자리까지만 비교"""
+    return (a[0] == b[0] and a[3] == b[3]
+            and all(x == y or (x is not None and y is not None and round(x, COORD_DIGITS) == round(y, COORD_DIGITS))
+                    for x, y in zip(a[1:3], b[1:3])))
+
+
+def fact_row(flat_row) -> tuple:
+    """loader.flatten() 튜플 → FACT_COLUMNS 순서"""
+    return flat_row[0], flat_row[6], flat_row[3]
+
+
+# =========================================================
+# 읽기 (대시보드 / export)
+# =========================================================
+def fact_table(cn, enabled: bool = None):
+    """
+    읽을 fact 테이블 이름, 설정(READ_FACT)이 꺼져 있으면 None (예전 dbo.bike_status)
+    테이블이 있다는 것만으로는 바꾸지 않음 (ADF 는 계속 dbo.bike_status 에 적재)
+    """
+    if not (READ_FACT if enabled is None else enabled):
+        return None
+    _, fact = _tables(cn)
+    return fact
+
+
+def load_dim(cn, max_age: float = DIM_TTL) -> pd.DataFrame:
+    """station_dim 전체 버전 (station_id, DIM_COLS, valid_from, valid_to), 프로세스 메모리 캐시"""
+    dim, _ = _tables(cn)
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(dim)
+        if hit is not None and now - hit[0] < max_age:
+            metrics.inc("cache_lookup", cache="station_dim", result="hit")
+            return hit[1]
+    metrics.inc("cache_lookup", cache="station_dim", result="miss")
+    with metrics.timer("sql_query_seconds", query="station_dim"):
+        df = pd.read_sql(f"SELECT station_id, {', '.join(DIM_COLS)}, valid_from, valid_to FROM {dim};", cn)
+    df["valid_from"] = pd.to_datetime(df["valid_from"])
+    df["valid_to"] = pd.to_datetime(df["valid_to"])
+    df["rack_tot_cnt"] = pd.to_numeric(df["rack_tot_cnt"], errors="coerce").astype("Int64")
+    with _cache_lock:
+        _cache[dim] = (now, df)
+    return df
+
+
+def current_versions(dim: pd.DataFrame) -> dict:
+    """현재 버전 → StationDim 초기값"""
+    cur = dim[dim["valid_to"].isna()]
+    return {
+        r[0]: tuple(None if pd.isna(v) else v for v in r[1:])
+        for r in cur[["station_id"] + DIM_COLS].itertuples(index=False, name=None)
+    }
+
+
+def join(df: pd.DataFrame, dim: pd.DataFrame) -> pd.DataFrame:
+    """fact 행(station_id, ts_utc, ...)에 DIM_COLS 붙이기 (ts_utc 시점에 유효한 버전)"""
+    if df is None or df.empty or dim is None or dim.empty:
+        return df
+    df = df.drop(columns=[c for c in DIM_COLS if c in df.columns]).reset_index(drop=True)
+    multi = dim["station_id"].duplicated(keep=False)
+
+    # 버전이 하나뿐인 대여소: 해시 매핑
+    single = dim[~multi].set_index("station_id")
+    out = df.join(single[DIM_COLS], on="station_id")
+    if not multi.any():
+        return out
+
+    # 버전이 여러 개인 대여소만 as-of 조인 (valid_from <= ts_utc 중 가장 최근)
+    hist = dim[multi].sort_values("valid_from")
+    sel = out["station_id"].isin(hist["station_id"])
+    part = out.loc[sel, ["station_id", "ts_utc"]].copy()
+    part["_row"] = part.index
+    part["_ts"] = pd.to_datetime(part["ts_utc"], utc=True).dt.tz_localize(None).astype(hist["valid_from"].dtype)
+    part = pd.merge_asof(part.sort_values("_ts"), hist[["station_id", "valid_from"] + DIM_COLS],
+                         left_on="_ts", right_on="valid_from", by="station_id", direction="backward")
+    # 첫 버전보다 이른 행은 가장 오래된 버전으로
+    first = hist.drop_duplicates("station_id").set_index("station_id")[DIM_COLS]
+    for c in DIM_COLS:
+        part[c] = part[c].fillna(part["station_id"].map(first[c]))
+        out.loc[part["_row"].to_numpy(), c] = part[c].to_numpy()
+    return out
@@ -0,0 +1,92 @@
+# common/enrich.py
+"""
+bike_status 공통 전처리 (대시보드 / 파이프라인 공용)
+
+- 컬럼마다 숫자 변환 1회, 작은 dtype 사용 (거치대/자전거 수 int16, 결측 있으면 float32)
+- 비율은 분모 0/결측을 마스킹한 나눗셈 (inf 치환 패스 없음)
+- KST 표시 문자열은 고유 시각별로 한 번만 포맷 (스냅샷 수 만큼만 strftime)
+"""
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype, is_datetime64_any_dtype
+
+COUNT_COLS = ["rack_tot_cnt", "parking_bike_tot_cnt", "slots_available", "bikes_available"]
+COORD_COLS = ["lat", "lon"]
+KST = "Asia/Seoul"
+KST_FMT = "%Y-%m-%d %H:%M:%S"
+
+
+def _numeric(s: pd.Series) -> pd.Series:
+    return s if is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce")
+
+
+def _compact_count(s: pd.Series) -> pd.Series:
+    """결측 없고 범위가 맞으면 int16, 아니면 float32"""
+    v = _numeric(s)
+    if v.notna().all() and (len(v) == 0 or (v.min() >= -32768 and v.max() <= 32767)):
+        if len(v) == 0 or (v == v.round()).all():
+            return v.astype(np.int16)
+    return v.astype(np.float32)
+
+
+def safe_ratio(num, den) -> np.ndarray:
+    """num / den (분모 0·결측이면 NaN), float32"""
+    num = np.asarray(num, dtype=np.float32)
+    den = np.asarray(den, dtype=np.float32)
+    out = np.full(den.shape, np.nan, dtype=np.float32)
+    np.divide(num, den, out=out, where=(den != 0) & ~np.isnan(den))
+    return out
+
+
+def format_once(ts: pd.Series, fmt: str = KST_FMT) -> pd.Series:
+    """고유 시각마다 한 번만 strftime 후 코드로 펼침"""
+    codes, uniques = pd.factorize(ts)
+    if len(uniques) == 0:
+        return pd.Series(np.nan, index=ts.index, dtype=object)
+    labels = np.asarray(pd.Index(uniques).strftime(fmt), dtype=object)
+    return pd.Series(np.where(codes >= 0, labels[codes], np.nan), index=ts.index, dtype=object)
+
+
+def coerce_and_enrich(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return df
+
+    # 숫자형 강제 (컬럼당 1회)
+    for col in COUNT_COLS:
+        if col in df.columns:
+            df[col] = _compact_count(df[col])
+    for col in COORD_COLS:
+        if col in df.columns:
+            df[col] = _numeric(df[col])
+
+    # bike_count 통일
+    if "parking_bike_tot_cnt" in df.columns:
+        df["bike_count"] = df["parking_bike_tot_cnt"]
+    elif "bikes_available" in df.columns:
+        df["bike_count"] = df["bikes_available"]
+
+    # ratio 계산
+    if "rack_tot_cnt" in df.columns:
+        cap = df["rack_tot_cnt"].to_numpy(dtype=np.float32, na_value=np.nan)
+        bikes = df["bike_count"].to_numpy(dtype=np.float32, na_value=np.nan) if "bike_count" in df.columns else None
+
+        if "slots_available" in df.columns:
+            df["avail_ratio"] = safe_ratio(df["slots_available"].to_numpy(dtype=np.float32, na_value=np.nan), cap)
+        elif bikes is not None:
+            df["avail_ratio"] = safe_ratio(cap - bikes, cap)
+
+        if bikes is not None:
+            df["occ_ratio"] = safe_ratio(bikes, cap)
+
+    if "station_name" in df.columns and not isinstance(df["station_name"].dtype, pd.CategoricalDtype):
+        df["station_name"] = df["station_name"].astype("category")
+
+    # UTC → KST 표시용 문자열 (+09:00 제거)
+    if "ts_utc" in df.columns:
+        ts = df["ts_utc"]
+        if not (is_datetime64_any_dtype(ts) and getattr(ts.dt, "tz", None) is not None):
+            ts = pd.to_datetime(ts, utc=True, errors="coerce")
+        df["ts_kst"] = ts.dt.tz_convert(KST)
+        df["ts_kst_str"] = format_once(df["ts_kst"])
+
+    return df
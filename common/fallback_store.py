@@ -0,0 +1,192 @@
+# common/fallback_store.py
+"""
+DB 장애 시 대시보드가 읽는 로컬 백업 저장소 (시간 파티션 Parquet + 인덱스)
+
+data/fallback/
+  YYYYMMDD/part-<min_ts>-<max_ts>-<seq>.parquet   ← UTC 날짜별 파티션, 쓰기 단위마다 part 1개
+  _index.json                                      ← part별 min/max ts_utc, 행 수
+
+- read_window(): 인덱스로 최근 N분과 겹치는 part만 골라 필요한 컬럼만 읽음
+  (기준 시각은 저장소의 최신 ts_utc → 백업이 오래돼도 마지막 N분은 표시)
+- maintain(): 최신 ts_utc 기준 KEEP_MINUTES 보다 오래된 행/part 삭제 + 날짜 파티션별 part 를
+  ts_utc 순 1개로 합침 (part 가 MAX_PARTS 를 넘으면 write() 가 자동 실행)
+"""
+import os
+import json
+import datetime as dt
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 기능
+    pa = None
+    pc = None
+    pq = None
+
+ROOT = Path("data") / "fallback"
+INDEX = "_index.json"
+INT_COLS = {"rack_tot_cnt", "parking_bike_tot_cnt", "slots_available", "bikes_available"}
+KEY = ["station_id", "ts_utc"]
+KEEP_MINUTES = int(os.getenv("BIKE_FALLBACK_KEEP_MIN", str(24 * 60)))   # 대시보드 최대 조회 범위(360분)보다 넉넉하게
+MAX_PARTS = 64
+
+
+def available(root: Path = ROOT) -> bool:
+    return pa is not None and (Path(root) / INDEX).exists()
+
+
+def _seq(name: str) -> int:
+    try:
+        return int(name.rsplit("-", 1)[1].split(".")[0])
+    except (IndexError, ValueError):
+        return -1
+
+
+def _to_arrow(df: pd.DataFrame):
+    """part마다 스키마가 같도록 컬럼 타입 고정"""
+    arrays = {}
+    for c in df.columns:
+        s = df[c]
+        if c == "ts_utc":
+            arrays[c] = pa.array(pd.to_datetime(s, utc=True, errors="coerce"), type=pa.timestamp("us", tz="UTC"))
+        elif c in INT_COLS:
+            arrays[c] = pa.array(pd.to_numeric(s, errors="coerce").astype("Int32"), type=pa.int32())
+        elif is_numeric_dtype(s):
+            arrays[c] = pa.array(s.astype("float64"), type=pa.float64(), from_pandas=True)
+        else:
+            arrays[c] = pa.array(s.astype("string"), type=pa.string(), from_pandas=True)
+    return pa.table(arrays)
+
+
+class FallbackStore:
+    def __init__(self, root: Path = ROOT):
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        self.root = Path(root)
+
+    # ----- 인덱스 -----
+    def _index_path(self) -> Path:
+        return self.root / INDEX
+
+    def load_index(self) -> list:
+        p = self._index_path()
+        return json.loads(p.read_text(encoding="utf-8")) if p.exists() else []
+
+    def _save_index(self, parts: list) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self._index_path().with_suffix(".tmp")
+        tmp.write_text(json.dumps(parts, ensure_ascii=False, indent=1), encoding="utf-8")
+        tmp.replace(self._index_path())
+
+    def reset(self) -> None:
+        """전체 재생성 전 기존 part/인덱스 삭제"""
+        for part in self.load_index():
+            (self.root / part["file"]).unlink(missing_ok=True)
+        self._index_path().unlink(missing_ok=True)
+
+    # ----- 쓰기 -----
+    def write(self, df: pd.DataFrame) -> int:
+        """df(bike_status 행)를 UTC 날짜별 part 파일로 추가, 반환: 기록 행 수"""
+        if df is None or df.empty:
+            return 0
+
+        table = _to_arrow(df)
+        day = pd.to_datetime(df["ts_utc"], utc=True, errors="coerce").dt.strftime("%Y%m%d").to_numpy()
+        parts = self.load_index()
+
+        for d in pd.unique(day):
+            if not isinstance(d, str):
+                continue  # ts_utc 결측 행
+            parts.append(self._write_part(d, table.filter(pa.array(day == d)), parts))
+
+        self._save_index(parts)
+        if len(parts) > MAX_PARTS:
+            self.maintain()
+        return table.num_rows
+
+    def _write_part(self, day: str, table, parts: list, kind: str = "part") -> dict:
+        ts = table["ts_utc"]
+        lo = pd.Timestamp(pc.min(ts).as_py())
+        hi = pd.Timestamp(pc.max(ts).as_py())
+        seq = max((_seq(p["file"]) for p in parts), default=-1) + 1   # 삭제 후에도 이름이 겹치지 않게
+        name = f"{day}/{kind}-{lo:%H%M%S}-{hi:%H%M%S}-{seq:05d}.parquet"
+        (self.root / day).mkdir(parents=True, exist_ok=True)
+        pq.write_table(table, self.root / name, compression="zstd")
+        return {"file": name, "min_ts": lo.isoformat(), "max_ts": hi.isoformat(), "rows": table.num_rows}
+
+    # ----- 정리 -----
+    def maintain(self, keep_minutes: int = KEEP_MINUTES) -> dict:
+        """
+        최신 ts_utc - keep_minutes 이전 데이터 삭제, 날짜 파티션별로 part 합치기
+        (같은 (station_id, ts_utc) 는 나중 part 값, ts_utc 순 정렬 → read_window 의 필터가 row group 단위로 걸러냄)
+        반환: {"pruned": 삭제한 part 수, "compacted": 합친 part 수, "parts": 남은 part 수}
+        """
+        parts = self.load_index()
+        stats = {"pruned": 0, "compacted": 0, "parts": len(parts)}
+        if not parts:
+            return stats
+        cutoff = max(pd.Timestamp(p["max_ts"]) for p in parts) - dt.timedelta(minutes=int(keep_minutes))
+
+        keep = [p for p in parts if pd.Timestamp(p["max_ts"]) >= cutoff]
+        stats["pruned"] = len(parts) - len(keep)
+
+        by_day = {}
+        for p in keep:
+            by_day.setdefault(p["file"].split("/", 1)[0], []).append(p)
+        out = []
+        for d, group in sorted(by_day.items()):
+            if len(group) == 1 and pd.Timestamp(group[0]["min_ts"]) >= cutoff:
+                out.extend(group)
+                continue
+            df = pq.read_table([str(self.root / p["file"]) for p in group]).to_pandas()
+            df = df[df["ts_utc"] >= cutoff]
+            if set(KEY).issubset(df.columns):
+                df = df.drop_duplicates(subset=KEY, keep="last")
+            df = df.sort_values("ts_utc", kind="stable")
+            if len(df):
+                out.append(self._write_part(d, _to_arrow(df), parts + out, kind="day"))
+            stats["compacted"] += len(group)
+
+        # 인덱스 교체 후 인덱스에 없는 파일 삭제 (열려 있어 못 지우는 파일은 다음 정리 때 다시 시도)
+        self._save_index(out)
+        listed = {p["file"] for p in out}
+        for f in self.root.glob("*/*.parquet"):
+            if f.relative_to(self.root).as_posix() not in listed:
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+        for d in self.root.iterdir():
+            if d.is_dir() and not any(d.iterdir()):
+                d.rmdir()
+        stats["parts"] = len(out)
+        return stats
+
+    # ----- 읽기 -----
+    def max_ts(self):
+        parts = self.load_index()
+        return max((pd.Timestamp(p["max_ts"]) for p in parts), default=None)
+
+    def read_window(self, lookback_minutes: int, columns=None) -> pd.DataFrame:
+        parts = self.load_index()
+        if not parts:
+            return pd.DataFrame(columns=columns or [])
+
+        end = max(pd.Timestamp(p["max_ts"]) for p in parts)
+        start = end - dt.timedelta(minutes=int(lookback_minutes))
+        files = [str(self.root / p["file"]) for p in parts if pd.Timestamp(p["max_ts"]) >= start]
+
+        schema = pq.read_schema(files[0])
+        cols = [c for c in columns if c in schema.names] if columns else None
+        if cols is not None and "ts_utc" not in cols:
+            cols.append("ts_utc")
+
+        table = pq.read_table(files, columns=cols, filters=[("ts_utc", ">=", start.to_pydatetime())])
+        df = table.to_pandas()
+        keys = [k for k in KEY if k in df.columns]
+        return df.drop_duplicates(subset=keys, keep="last") if len(keys) == len(KEY) else df
@@ -0,0 +1,274 @@
+# common/forecast.py
+"""
+단기(30~60분) 자전거 수 예측 - 전체 대여소를 한 번에 (대여소별 파이썬 루프 없음)
+
+모델 (대여소마다, 모두 [대여소, ...] 행렬 연산)
+- 요일·시간대(KST, 168칸) 평균 자전거 수: 누적 합/건수 → 스냅샷마다 bincount 로 증분 갱신
+- 최근 추세: 최근 RECENT_SLOTS 개 SLOT_MIN 분 칸의 대여소 × 시간 행렬을 유지,
+  (관측 - 시간대 평균) 잔차에 마스크 최소제곱 기울기를 행 단위로 계산
+- 예측 = 현재 값 + (목표 시각 시간대 평균 - 현재 시간대 평균) + 잔차 기울기 × 경과 × TREND_DAMP,
+  [0, 거치대 수] 로 자름
+
+- watermark 이하 스냅샷은 무시 → 같은 구간을 다시 넣어도 중복 반영 없음
+- data/forecast/forecaster.npz 한 파일로 저장 (funcs/update_forecast.py 가 매 틱 갱신)
+- 여러 Streamlit 세션이 공유 (st.cache_resource) → lock으로 갱신/예측 직렬화
+  대시보드는 has_newer() 가 참일 때만 update (새 데이터가 있을 때 한 번, rerun 마다 모델을 건드리지 않음)
+"""
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+PATH = Path("data") / "forecast" / "forecaster.npz"
+HOW = 168                 # 요일 × 시간 (KST, 월요일 0시 = 0)
+SLOT_MIN = 10             # 최근 행렬 칸 크기(분)
+RECENT_SLOTS = 12         # 최근 2시간
+TREND_SLOTS = 6           # 기울기 계산에 쓰는 최근 칸 수 (1시간)
+TREND_DAMP = 0.5          # 추세 외삽 감쇠
+HORIZONS = (30, 60)       # 예측 시점(분)
+DRY_BIKES = 1             # 이 이하로 예측되면 "고갈 위험"
+BIKE_COLS = ("bike_count", "parking_bike_tot_cnt", "bikes_available")   # update_frame 이 찾는 자전거 수 컬럼 (앞쪽 우선)
+KST_SEC = 9 * 3600
+
+
+def available(path: Path = PATH) -> bool:
+    return Path(path).exists()
+
+
+def _epoch_sec(ts) -> np.ndarray:
+    t = pd.to_datetime(pd.Series(ts), utc=True, errors="coerce")
+    sec = t.to_numpy(dtype="datetime64[ns]").astype("int64") // 1_000_000_000
+    return np.where(t.notna().to_numpy(), sec, np.iinfo(np.int64).min)
+
+
+def _how(sec: np.ndarray) -> np.ndarray:
+    """epoch 초 → KST 요일·시간 칸 (1970-01-01 은 목요일 → +3일)"""
+    return ((sec + KST_SEC) // 3600 + 3 * 24) % HOW
+
+
+class Forecaster:
+    def __init__(self):
+        self.index = {}                                   # station_id → 행 번호
+        self.ids = []
+        self.prof_sum = np.zeros((0, HOW))
+        self.prof_cnt = np.zeros((0, HOW))
+        self.recent = np.full((0, RECENT_SLOTS), np.nan)  # [대여소, 최근 칸], 마지막 열 = recent_end
+        self.recent_end = None                            # 마지막 열의 slot 번호 (epoch 분 // SLOT_MIN)
+        self.cap = np.zeros(0)
+        self.watermark = None                             # epoch 초 (UTC)
+        self.lock = threading.Lock()
+
+    # ----- 갱신 -----
+    def _rows_for(self, station_ids) -> np.ndarray:
+        codes, uniq = pd.factorize(np.asarray(station_ids, dtype=object))
+        pos = np.empty(len(uniq), dtype=np.int64)
+        for i, sid in enumerate(uniq):
+            j = self.index.get(sid)
+            if j is None:
+                j = self.index[sid] = len(self.ids)
+                self.ids.append(sid)
+            pos[i] = j
+        grow = len(self.ids) - self.prof_sum.shape[0]
+        if grow > 0:
+            self.prof_sum = np.vstack([self.prof_sum, np.zeros((grow, HOW))])
+            self.prof_cnt = np.vstack([self.prof_cnt, np.zeros((grow, HOW))])
+            self.recent = np.vstack([self.recent, np.full((grow, RECENT_SLOTS), np.nan)])
+            self.cap = np.concatenate([self.cap, np.zeros(grow)])
+        return pos[codes]
+
+    def _shift_to(self, end_slot: int) -> None:
+        """최근 행렬을 end_slot 이 마지막 열이 되도록 왼쪽으로 밀기"""
+        if self.recent_end is None:
+            self.recent_end = end_slot
+            return
+        k = end_slot - self.recent_end
+        if k <= 0:
+            return
+        if k >= RECENT_SLOTS:
+            self.recent[:] = np.nan
+        else:
+            self.recent[:, :-k] = self.recent[:, k:]
+            self.recent[:, -k:] = np.nan
+        self.recent_end = end_slot
+
+    def update(self, station_ids, ts_utc, bikes, racks) -> int:
+        """벡터 입력(같은 길이) 반영, 반환: 반영된 행 수 (watermark 이하는 제외)"""
+        with self.lock:
+            return self._update(station_ids, ts_utc, bikes, racks)
+
+    def _update(self, station_ids, ts_utc, bikes, racks) -> int:
+        sec = _epoch_sec(ts_utc)
+        bikes = pd.to_numeric(pd.Series(bikes), errors="coerce").to_numpy(dtype=float)
+        racks = pd.to_numeric(pd.Series(racks), errors="coerce").to_numpy(dtype=float)
+
+        ok = (sec != np.iinfo(np.int64).min) & ~np.isnan(bikes)
+        if self.watermark is not None:
+            ok &= sec > self.watermark
+        if not ok.any():
+            return 0
+
+        o = np.argsort(sec[ok], kind="stable")
+        sid = np.asarray(station_ids, dtype=object)[ok][o]
+        sec, bikes, racks = sec[ok][o], bikes[ok][o], racks[ok][o]
+        rows = self._rows_for(sid)
+
+        # 요일·시간대 평균
+        flat = rows * HOW + _how(sec)
+        size = self.prof_sum.shape[0] * HOW
+        self.prof_sum += np.bincount(flat, weights=bikes, minlength=size).reshape(-1, HOW)
+        self.prof_cnt += np.bincount(flat, minlength=size).reshape(-1, HOW)
+
+        # 최근 행렬 (시각 순 정렬 → 같은 칸은 마지막 값)
+        slot = sec // 60 // SLOT_MIN
+        self._shift_to(int(slot.max()))
+        col = slot - self.recent_end + RECENT_SLOTS - 1
+        keep = col >= 0
+        self.recent[rows[keep], col[keep]] = bikes[keep]
+
+        has_cap = racks > 0
+        self.cap[rows[has_cap]] = racks[has_cap]
+        self.watermark = int(sec.max())
+        return int(ok.sum())
+
+    def has_newer(self, ts) -> bool:
+        """ts(데이터의 마지막 시각)가 watermark 이후인지 → 이때만 update 하면 됨"""
+        if ts is None or pd.isna(ts):
+            return False
+        sec = int(_epoch_sec([ts])[0])
+        return sec != np.iinfo(np.int64).min and (self.watermark is None or sec > self.watermark)
+
+    def update_frame(self, df: pd.DataFrame) -> int:
+        """
+        bike_status 형식 (station_id, ts_utc, bike_count / parking_bike_tot_cnt / bikes_available, rack_tot_cnt)
+        필수 컬럼(station_id, ts_utc, 자전거 수)이 없으면 0, rack_tot_cnt 가 없으면 거치대 수는 갱신하지 않음
+        """
+        if df is None or df.empty or not {"station_id", "ts_utc"}.issubset(df.columns):
+            return 0
+        col = next((c for c in BIKE_COLS if c in df.columns), None)
+        if col is None:
+            return 0
+        racks = df["rack_tot_cnt"] if "rack_tot_cnt" in df.columns else np.full(len(df), np.nan)
+        return self.update(df["station_id"].to_numpy(), df["ts_utc"], df[col], racks)
+
+    def update_snapshot(self, rows, ts) -> int:
+        """rentBikeStatus.row 형식 스냅샷 1개"""
+        if not rows:
+            return 0
+        return self.update(
+            [r.get("stationId") for r in rows],
+            [ts] * len(rows),
+            [r.get("parkingBikeTotCnt") for r in rows],
+            [r.get("rackTotCnt") for r in rows],
+        )
+
+    # ----- 예측 -----
+    def _profile(self) -> np.ndarray:
+        """[대여소, 168] 시간대 평균 (관측 없는 칸은 대여소 전체 평균, 그것도 없으면 NaN)"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prof = self.prof_sum / self.prof_cnt
+            overall = self.prof_sum.sum(axis=1) / self.prof_cnt.sum(axis=1)
+        return np.where(self.prof_cnt > 0, prof, overall[:, None])
+
+    def predict(self, horizons=HORIZONS, dry_bikes: float = DRY_BIKES) -> pd.DataFrame:
+        """
+        전체 대여소 예측 (기준 시각 = 마지막 반영 칸)
+        반환: station_id, bikes_now, rack_tot_cnt, trend_per_hour, pred_<h>m..., dry_risk
+        """
+        with self.lock:
+            return self._predict(horizons, dry_bikes)
+
+    def _predict(self, horizons, dry_bikes) -> pd.DataFrame:
+        if not self.ids or self.recent_end is None:
+            return pd.DataFrame()
+        prof = self._profile()
+        rows = np.arange(len(self.ids))
+
+        # 칸별 시간대 → 잔차 행렬
+        slots = self.recent_end - np.arange(RECENT_SLOTS)[::-1]
+        col_how = _how(slots * SLOT_MIN * 60)
+        resid = self.recent - prof[:, col_how]
+
+        # 현재 값 = 행마다 마지막 관측
+        seen = ~np.isnan(self.recent)
+        last_col = RECENT_SLOTS - 1 - np.argmax(seen[:, ::-1], axis=1)
+        now = np.where(seen.any(axis=1), self.recent[rows, last_col], np.nan)
+
+        # 최근 TREND_SLOTS 칸 잔차 기울기 (칸당 → 분당), 마스크 최소제곱
+        y = resid[:, -TREND_SLOTS:]
+        m = ~np.isnan(y)
+        x = np.broadcast_to(np.arange(TREND_SLOTS, dtype=float), y.shape)
+        n = m.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            xm = np.where(m, x, 0).sum(axis=1) / n
+            ym = np.where(m, y, 0).sum(axis=1) / n
+            dx = np.where(m, x - xm[:, None], 0)
+            dy = np.where(m, y - ym[:, None], 0)
+            den = (dx * dx).sum(axis=1)
+            slope = np.where((n >= 2) & (den > 0), (dx * dy).sum(axis=1) / den, 0.0) / SLOT_MIN
+
+        how_now = _how(np.array([self.recent_end * SLOT_MIN * 60]))[0]
+        base_now = prof[:, how_now]
+        cap = np.where(self.cap > 0, self.cap, np.inf)
+
+        out = pd.DataFrame({
+            "station_id": np.asarray(self.ids, dtype=object),
+            "bikes_now": now,
+            "rack_tot_cnt": self.cap,
+            "trend_per_hour": np.round(slope * 60, 2),
+        })
+        dry = np.zeros(len(rows), dtype=bool)
+        for h in horizons:
+            how_h = _how(np.array([(self.recent_end * SLOT_MIN + h) * 60]))[0]
+            season = np.nan_to_num(prof[:, how_h] - base_now)
+            pred = np.clip(now + season + slope * h * TREND_DAMP, 0, cap)
+            out[f"pred_{h}m"] = np.round(pred, 1)
+            dry |= pred <= dry_bikes
+        out["dry_risk"] = dry & ~np.isnan(now)
+        out = out[~np.isnan(now)]
+        return out.sort_values(f"pred_{horizons[-1]}m", kind="stable").reset_index(drop=True)
+
+    @property
+    def as_of(self):
+        """예측 기준 시각 (tz-aware UTC)"""
+        if self.recent_end is None:
+            return None
+        return pd.Timestamp(self.recent_end * SLOT_MIN * 60, unit="s", tz="UTC")
+
+    # ----- 저장 -----
+    def save(self, path: Path = PATH) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        with self.lock:
+            self._save(tmp)
+        tmp.replace(path)
+
+    def _save(self, tmp: Path) -> None:
+        np.savez_compressed(
+            tmp,
+            ids=np.asarray(self.ids, dtype=str),
+            prof_sum=self.prof_sum, prof_cnt=self.prof_cnt,
+            recent=self.recent, cap=self.cap,
+            meta=np.array([
+                -1 if self.recent_end is None else self.recent_end,
+                -1 if self.watermark is None else self.watermark,
+            ], dtype=np.int64),
+        )
+
+    @classmethod
+    def load(cls, path: Path = PATH) -> "Forecaster":
+        f = cls()
+        path = Path(path)
+        if not path.exists():
+            return f
+        with np.load(path, allow_pickle=False) as z:
+            f.ids = z["ids"].tolist()
+            f.index = {sid: i for i, sid in enumerate(f.ids)}
+            f.prof_sum, f.prof_cnt = z["prof_sum"], z["prof_cnt"]
+            f.recent, f.cap = z["recent"], z["cap"]
+            end, wm = (int(v) for v in z["meta"])
+        f.recent_end = None if end < 0 else end
+        f.watermark = None if wm < 0 else wm
+        return f
+
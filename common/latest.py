@@ -0,0 +1,63 @@
+# common/latest.py
+"""
+대여소별 최신 상태
+
+- latest_per_station(): station_id 해시 그룹별 ts_utc 최대 행을 통째로 선택 (전체 정렬 없음, O(n))
+  · sort + groupby.first() 와 달리 결측 컬럼이 다른 행 값으로 채워지지 않음
+- LatestState: 대여소별 최신 행을 메모리에 유지, 새 스냅샷이 들어올 때 O(대여소 수)로 갱신
+"""
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+KEY = "station_id"
+TS = "ts_utc"
+
+
+def latest_per_station(df: pd.DataFrame, key: str = KEY, ts: str = TS) -> pd.DataFrame:
+    if df is None or df.empty or key not in df.columns or ts not in df.columns:
+        return df
+    # 위치 기준으로 계산 (concat 등으로 인덱스 라벨이 중복돼도 대여소당 1행)
+    t = df[ts].reset_index(drop=True)
+    if not is_datetime64_any_dtype(t):
+        t = pd.to_datetime(t, utc=True, errors="coerce")  # CSV 등 문자열 시각
+    k = df[key].reset_index(drop=True)
+    mask = t.notna() & k.notna()
+    if not mask.any():
+        return df.iloc[0:0]
+    pos = t[mask].groupby(k[mask], sort=False, observed=True).idxmax()
+    return df.iloc[pos.to_numpy()].reset_index(drop=True)
+
+class LatestState:
+    def __init__(self, key: str = KEY, ts: str = TS):
+        self.key = key
+        self.ts = ts
+        self.df = None  # station_id 인덱스, 대여소당 1행
+
+    def update(self, new: pd.DataFrame) -> None:
+        """새로 들어온 행(스냅샷 1개 이상)으로 최신 상태 갱신"""
+        if new is None or new.empty:
+            return
+        cur = latest_per_station(new, self.key, self.ts)
+        if self.df is not None and not self.df.empty:
+            # 같은 ts_utc 를 다시 읽은 경우 새 행이 이기도록 새 행을 앞에 (idxmax 는 첫 최대값)
+            cur = latest_per_station(pd.concat([cur, self.df.reset_index()], ignore_index=True), self.key, self.ts)
+        self.df = cur.set_index(self.key, drop=True)
+
+    def evict_before(self, cutoff) -> None:
+        """cutoff 이전에 마지막으로 보고된 대여소 제거"""
+        if self.df is not None and not self.df.empty:
+            self.df = self.df[pd.to_datetime(self.df[self.ts]) >= cutoff]
+
+    def get(self, station_id):
+        """대여소 1곳의 최신 행 (없으면 None)"""
+        if self.df is None or station_id not in self.df.index:
+            return None
+        return self.df.loc[station_id]
+
+    def frame(self, since=None) -> pd.DataFrame:
+        if self.df is None:
+            return pd.DataFrame()
+        out = self.df
+        if since is not None and not out.empty:
+            out = out[pd.to_datetime(out[self.ts]) >= since]
+        return out.reset_index()
@@ -0,0 +1,256 @@
+# common/matrix_store.py
+"""
+대여소 × 시간(5분 칸) 고정 격자 저장소 (memmap)
+
+data/matrix/
+  meta.json        ← t0(첫 칸 slot 번호), 칸 크기, 행/열 용량, 마지막으로 쓴 칸, 배열 파일 세대(gen)
+  stations.json    ← 열 순서 = station_id 목록 (한 번 정해진 열 번호는 바뀌지 않음)
+  bikes.<gen>.i16  ← [시간 칸, 대여소] int16, 결측 MISSING(-1)  (gen 0 은 bikes.i16)
+  racks.<gen>.i16  ← 같은 모양, 거치대 수
+
+- 시간 우선(row-major) 배치 → 스냅샷 1개 추가 = 행 하나에 O(대여소 수) 쓰기
+- 용량이 모자라면 다음 세대 파일을 새로 만들어 복사 (시간은 GROW_SLOTS(하루) 단위, 클수록 크게 늘림 /
+  대여소 열은 2배), 열려 있는 파일은 크기를 바꾸지 않음 → 읽는 쪽 memmap 은 그대로 유효
+  (Windows 에서 열린 파일 truncate/replace 불가, POSIX 에서 잘린 파일을 읽는 문제 없음)
+- meta.json 교체(flush) 가 새 세대로 넘어가는 시점, 직전에 발행된 세대 파일은 읽는 쪽을 위해 남겨 둠
+- window() / series() / at() 은 memmap 슬라이스 → 복사 없는 view
+- 쓰기는 한 프로세스(funcs/update_matrix.py)만, 대시보드·분석은 mode="r" 로 읽기
+"""
+import re
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path("data") / "matrix"
+SLOT_MIN = 5
+GROW_SLOTS = 24 * 60 // SLOT_MIN   # 하루
+GROW_MAX_DAYS = 30                 # 한 번에 늘리는 최대 일수 (그 전까지는 2배씩)
+COLS_CAP = 4096
+MISSING = -1
+DTYPE = np.int16
+ARRAYS = ("bikes", "racks")
+
+
+def available(root: Path = ROOT) -> bool:
+    return (Path(root) / "meta.json").exists()
+
+
+def _file(name: str, gen: int) -> str:
+    return f"{name}.i16" if gen == 0 else f"{name}.{gen}.i16"
+
+
+def _gen_of(filename: str):
+    """배열 파일명 → 세대 번호 (해당 없으면 None)"""
+    m = re.fullmatch(r"(?:%s)(?:\.(\d+))?\.i16" % "|".join(ARRAYS), filename)
+    return None if m is None else int(m.group(1) or 0)
+
+
+def _slot_of(ts) -> np.ndarray:
+    """시각(들) → 5분 칸 번호 (epoch 분 // SLOT_MIN), 결측은 int64 최소값"""
+    t = pd.to_datetime(pd.Series(ts), utc=True, errors="coerce")
+    sec = t.to_numpy(dtype="datetime64[ns]").astype("int64") // 1_000_000_000
+    return np.where(t.notna().to_numpy(), sec // 60 // SLOT_MIN, np.iinfo(np.int64).min)
+
+
+class MatrixStore:
+    def __init__(self, root: Path = ROOT, mode: str = "r"):
+        self.root = Path(root)
+        self.mode = mode
+        meta = json.loads((self.root / "meta.json").read_text(encoding="utf-8"))
+        if meta["slot_min"] != SLOT_MIN:
+            raise ValueError(f"slot_min mismatch: {meta['slot_min']} != {SLOT_MIN}")
+        self.t0 = int(meta["t0_slot"])
+        self.rows_cap = int(meta["rows_cap"])
+        self.cols_cap = int(meta["cols_cap"])
+        self.n_slots = int(meta["n_slots"])     # 마지막으로 쓴 칸 + 1
+        self.gen = int(meta.get("gen", 0))      # 배열 파일 세대
+        self._published = self.gen              # meta.json 에 기록된 세대 (읽는 쪽이 열었을 수 있음)
+        self.ids = json.loads((self.root / "stations.json").read_text(encoding="utf-8"))
+        self.index = {sid: i for i, sid in enumerate(self.ids)}
+        self._open()
+
+    @classmethod
+    def create(cls, start, root: Path = ROOT, cols_cap: int = COLS_CAP) -> "MatrixStore":
+        """빈 저장소 생성 (start 가 속한 UTC 날짜 0시가 첫 칸)"""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        day = pd.Timestamp(start).tz_localize("UTC") if pd.Timestamp(start).tzinfo is None else pd.Timestamp(start).tz_convert("UTC")
+        t0 = int(_slot_of([day.floor("D")])[0])
+        for name in ARRAYS:
+            m = np.memmap(root / f"{name}.i16", dtype=DTYPE, mode="w+", shape=(GROW_SLOTS, cols_cap))
+            m[:] = MISSING
+            m.flush()
+            del m
+        (root / "stations.json").write_text("[]", encoding="utf-8")
+        meta = {"t0_slot": t0, "slot_min": SLOT_MIN, "rows_cap": GROW_SLOTS, "cols_cap": cols_cap, "n_slots": 0, "gen": 0}
+        (root / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        return cls(root, mode="r+")
+
+    def _open(self) -> None:
+        shape = (self.rows_cap, self.cols_cap)
+        self.bikes = np.memmap(self.root / _file("bikes", self.gen), dtype=DTYPE, mode=self.mode, shape=shape)
+        self.racks = np.memmap(self.root / _file("racks", self.gen), dtype=DTYPE, mode=self.mode, shape=shape)
+
+    def _close(self) -> None:
+        if self.mode != "r":
+            self.bikes.flush()
+            self.racks.flush()
+        del self.bikes, self.racks
+
+    # ----- 용량 -----
+    def _grow_rows(self, need: int) -> None:
+        """시간 칸 용량을 need 이상으로 (GROW_SLOTS 단위, GROW_MAX_DAYS 까지는 2배씩)"""
+        step = min(self.rows_cap, GROW_MAX_DAYS * GROW_SLOTS)
+        new_cap = -(-max(need, self.rows_cap + step) // GROW_SLOTS) * GROW_SLOTS
+        self._rewrite(new_cap, self.cols_cap)
+
+    def _grow_cols(self, need: int) -> None:
+        """대여소 열 용량 확장 (드묾)"""
+        self._rewrite(self.rows_cap, max(need, self.cols_cap * 2))
+
+    def _rewrite(self, rows_cap: int, cols_cap: int) -> None:
+        """다음 세대 파일(rows_cap × cols_cap)에 현재 내용 복사 후 전환, 늘어난 부분은 MISSING"""
+        gen = self.gen + 1
+        r, c = self.rows_cap, self.cols_cap
+        for name in ARRAYS:
+            old = getattr(self, name)
+            m = np.memmap(self.root / _file(name, gen), dtype=DTYPE, mode="w+", shape=(rows_cap, cols_cap))
+            m[:r, :c] = old
+            m[:r, c:] = MISSING
+            m[r:] = MISSING
+            m.flush()
+            del m
+        self._close()
+        self.gen, self.rows_cap, self.cols_cap = gen, rows_cap, cols_cap
+        self._open()
+
+    def _remove_old(self, keep: set) -> None:
+        """keep 이외 세대의 배열 파일 삭제 (열려 있어 못 지우면 다음 flush 때 다시 시도)"""
+        for f in self.root.glob("*.i16"):
+            gen = _gen_of(f.name)
+            if gen is not None and gen not in keep:
+                try:
+                    f.unlink()
+                except OSError:
+                    pass
+
+    def _cols_for(self, station_ids) -> np.ndarray:
+        codes, uniq = pd.factorize(np.asarray(station_ids, dtype=object))
+        pos = np.empty(len(uniq), dtype=np.int64)
+        for i, sid in enumerate(uniq):
+            j = self.index.get(sid)
+            if j is None:
+                j = self.index[sid] = len(self.ids)
+                self.ids.append(sid)
+            pos[i] = j
+        if len(self.ids) > self.cols_cap:
+            self._grow_cols(len(self.ids))
+        return pos[codes]
+
+    # ----- 쓰기 -----
+    def append(self, station_ids, ts_utc, bikes, racks) -> int:
+        """
+        벡터 입력 (같은 길이) 기록, 같은 칸·대여소는 덮어씀 (재실행해도 결과 동일)
+        반환: 기록한 값 수 (t0 이전 / 시각 결측 제외)
+        """
+        if self.mode == "r":
+            raise RuntimeError("matrix store opened read-only")
+        slot = _slot_of(ts_utc) - self.t0
+        bikes = pd.to_numeric(pd.Series(bikes), errors="coerce").to_numpy(dtype=float)
+        racks = pd.to_numeric(pd.Series(racks), errors="coerce").to_numpy(dtype=float)
+        ok = slot >= 0
+        if not ok.any():
+            return 0
+
+        slot = slot[ok]
+        cols = self._cols_for(np.asarray(station_ids, dtype=object)[ok])
+        if slot.max() >= self.rows_cap:
+            self._grow_rows(int(slot.max()) + 1)
+
+        info = np.iinfo(DTYPE)
+        for name, v in (("bikes", bikes[ok]), ("racks", racks[ok])):
+            v = np.where(np.isnan(v), MISSING, np.clip(v, 0, info.max)).astype(DTYPE)
+            getattr(self, name)[slot, cols] = v
+        self.n_slots = max(self.n_slots, int(slot.max()) + 1)
+        return int(ok.sum())
+
+    def append_snapshot(self, rows, ts) -> int:
+        """rentBikeStatus.row 형식 스냅샷 1개 → 행 하나"""
+        if not rows:
+            return 0
+        return self.append(
+            [r.get("stationId") for r in rows],
+            [ts] * len(rows),
+            [r.get("parkingBikeTotCnt") for r in rows],
+            [r.get("rackTotCnt") for r in rows],
+        )
+
+    def flush(self) -> None:
+        """memmap + 대여소 목록 + 메타 저장 (메타는 마지막에 교체 → 읽는 쪽은 완성된 칸까지만 봄)"""
+        self.bikes.flush()
+        self.racks.flush()
+        for name, obj in (("stations.json", self.ids), ("meta.json", {
+            "t0_slot": self.t0, "slot_min": SLOT_MIN, "rows_cap": self.rows_cap,
+            "cols_cap": self.cols_cap, "n_slots": self.n_slots, "gen": self.gen,
+        })):
+            tmp = self.root / f"{name}.tmp"
+            tmp.write_text(json.dumps(obj, ensure_ascii=False), encoding="utf-8")
+            tmp.replace(self.root / name)
+        self._remove_old({self._published, self.gen})
+        self._published = self.gen
+
+    # ----- 조회 (view) -----
+    def times(self, start: int = 0, stop: int = None) -> pd.DatetimeIndex:
+        """칸 범위 [start, stop) 의 시각 (UTC)"""
+        stop = self.n_slots if stop is None else stop
+        return pd.to_datetime((self.t0 + np.arange(start, stop)) * SLOT_MIN * 60, unit="s", utc=True)
+
+    def slot_index(self, ts) -> int:
+        return int(_slot_of([ts])[0]) - self.t0
+
+    def window(self, hours: float = None, start=None, end=None):
+        """
+        시간 구간 [start, end) 또는 마지막 hours 시간 → (times, bikes[t, s], racks[t, s]) view
+        열은 등록된 대여소 수(len(ids))까지만
+        """
+        hi = self.n_slots if end is None else min(max(self.slot_index(end), 0), self.n_slots)
+        if start is not None:
+            lo = min(max(self.slot_index(start), 0), hi)
+        elif hours is not None:
+            lo = max(hi - int(round(hours * 60 / SLOT_MIN)), 0)
+        else:
+            lo = 0
+        n = len(self.ids)
+        return self.times(lo, hi), self.bikes[lo:hi, :n], self.racks[lo:hi, :n]
+
+    def series(self, station_id, hours: float = None) -> pd.Series:
+        """대여소 1곳의 자전거 수 시계열 (결측 칸 NaN), 복사 없는 원본은 window()[1][:, index[station_id]]"""
+        times, bikes, _ = self.window(hours)
+        col = bikes[:, self.index[station_id]]
+        return pd.Series(np.where(col == MISSING, np.nan, col), index=times, name=station_id)
+
+    def at(self, ts) -> tuple:
+        """한 시각 칸의 전체 대여소 (bikes[s], racks[s]) view"""
+        i = self.slot_index(ts)
+        if not 0 <= i < self.n_slots:
+            raise KeyError(ts)
+        n = len(self.ids)
+        return self.bikes[i, :n], self.racks[i, :n]
+
+    def frame(self, hours: float = None) -> pd.DataFrame:
+        """window → 긴 형식 DataFrame (station_id, ts_utc, bike_count, rack_tot_cnt), 결측 칸 제외"""
+        times, bikes, racks = self.window(hours)
+        t, s = np.nonzero(bikes != MISSING)
+        return pd.DataFrame({
+            "station_id": np.asarray(self.ids, dtype=object)[s],
+            "ts_utc": times[t],
+            "bike_count": bikes[t, s],
+            "rack_tot_cnt": racks[t, s],
+        })
+
+    @property
+    def last_ts(self):
+        """마지막으로 쓴 칸 시각 (tz-aware UTC), 비었으면 None"""
+        return None if self.n_slots == 0 else self.times(self.n_slots - 1, self.n_slots)[0]
@@ -0,0 +1,14 @@
+# common/metrics.py
+"""
+계측 - Function 과 같은 코드 (azure_func/shared_code/metrics.py) 를 스크립트 / 대시보드에서 사용
+
+    from common import metrics
+    with metrics.timer("sql_query_seconds", query="recent"): ...
+    metrics.inc("rows_returned", len(df))
+    metrics.flush("export_csv")   # 실행 끝에 data/metrics/runs.jsonl 에 1줄
+
+shared_code 는 azure_func/ 가 sys.path 에 있어야 import 됨 (funcs/__init__.py, app/app.py 가 설정)
+"""
+from shared_code.metrics import (  # noqa: F401
+    METRICS_PATH, Registry, registry, inc, observe, timer, flush, flush_every, read_runs,
+)
@@ -0,0 +1,97 @@
+# common/recent_window.py
+"""
+최근 N분 bike_status 증분 캐시
+
+- 처음 한 번만 전체 구간 조회, 이후에는 ts_utc > watermark - GRACE_MINUTES 인 행만 조회
+  (적재가 늦어 watermark 보다 과거 ts_utc 로 들어온 행도 잡히도록 겹쳐 읽고 (station_id, ts_utc) 로 중복 제거)
+- 구간 밖으로 밀려난 행은 메모리에서 제거
+- 대여소별 최신 행(LatestState)도 신규 행으로만 갱신 → latest() 비용이 이력 길이와 무관
+- 여러 Streamlit 세션이 공유 (st.cache_resource) → lock으로 갱신 직렬화
+"""
+import os
+import threading
+import datetime as dt
+
+import pandas as pd
+
+from common import metrics
+from common.latest import LatestState
+
+TABLE = "dbo.bike_status"
+KEYS = ["station_id", "ts_utc"]
+GRACE_MINUTES = int(os.getenv("BIKE_RECENT_GRACE_MIN", "15"))   # watermark 아래로 다시 읽는 구간 (늦게 적재된 행)
+
+
+def _utcnow() -> dt.datetime:
+    """DB 값과 같은 naive UTC"""
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+class RecentWindow:
+    def __init__(self, table: str = TABLE, grace_minutes: int = GRACE_MINUTES):
+        self.table = table
+        self.grace = dt.timedelta(minutes=grace_minutes)
+        self.df = None
+        self.watermark = None       # 지금까지 읽은 최대 ts_utc (DB 값 그대로, naive UTC)
+        self.loaded_minutes = 0     # 메모리에 유지 중인 구간 길이
+        self.latest_state = LatestState()
+        self.lock = threading.Lock()
+
+    def _full(self, cn, minutes: int) -> pd.DataFrame:
+        q = f"""
+        SELECT *
+        FROM {self.table}
+        WHERE ts_utc >= DATEADD(minute, -{int(minutes)}, SYSUTCDATETIME());
+        """
+        with metrics.timer("sql_query_seconds", query="recent_full"):
+            df = pd.read_sql(q, cn)
+        metrics.inc("sql_rows_returned", len(df), query="recent_full")
+        return df
+
+    def _since(self, cn, watermark) -> pd.DataFrame:
+        q = f"SELECT * FROM {self.table} WHERE ts_utc > ?;"
+        with metrics.timer("sql_query_seconds", query="recent_since"):
+            df = pd.read_sql(q, cn, params=[watermark])
+        metrics.inc("sql_rows_returned", len(df), query="recent_since")
+        return df
+
+    def refresh(self, cn, lookback_minutes: int) -> pd.DataFrame:
+        """신규 행(+ watermark 아래 grace 구간)만 읽어 갱신하고 최근 lookback_minutes 구간을 반환"""
+        with self.lock:
+            if self.df is None or self.watermark is None or lookback_minutes > self.loaded_minutes:
+                self.df = self._full(cn, lookback_minutes)
+                self.loaded_minutes = lookback_minutes
+                self.latest_state = LatestState()
+                self.latest_state.update(self.df)
+            else:
+                new = self._since(cn, self.watermark - self.grace)
+                if not new.empty:
+                    # 겹쳐 읽은 행은 새로 읽은 값으로 (keep="last")
+                    self.df = pd.concat([self.df, new], ignore_index=True) \
+                        .drop_duplicates(KEYS, keep="last").reset_index(drop=True)
+                    self.latest_state.update(new)
+
+            if not self.df.empty:
+                ts = pd.to_datetime(self.df["ts_utc"])
+                cutoff = _utcnow() - dt.timedelta(minutes=self.loaded_minutes)
+                keep = ts >= cutoff
+                if not keep.all():
+                    self.df = self.df[keep].reset_index(drop=True)
+                    self.latest_state.evict_before(cutoff)
+                    ts = ts[keep]
+                if len(ts):
+                    self.watermark = ts.max().to_pydatetime()
+
+            return self.window(lookback_minutes)
+
+    def latest(self, lookback_minutes: int) -> pd.DataFrame:
+        """최근 lookback_minutes 안에서 대여소별 최신 행"""
+        with self.lock:
+            cutoff = _utcnow() - dt.timedelta(minutes=int(lookback_minutes))
+            return self.latest_state.frame(since=cutoff)
+
+    def window(self, lookback_minutes: int) -> pd.DataFrame:
+        if self.df is None or self.df.empty:
+            return pd.DataFrame() if self.df is None else self.df.copy()
+        cutoff = _utcnow() - dt.timedelta(minutes=int(lookback_minutes))
+        return self.df[pd.to_datetime(self.df["ts_utc"]) >= cutoff].reset_index(drop=True)
@@ -0,0 +1,122 @@
+# common/relocation.py
+"""
+재배치 후보 계산 (최신 스냅샷 → 부족/과잉 대여소 + 이동 제안)
+
+- flag(): 점유율(자전거/거치대) 기준으로 부족(< low) / 과잉(> high) 표시, 열 단위 NumPy 연산
+- pair(): 과잉 → 부족 이동 제안
+  · 과잉 x 부족 거리 행렬을 한 번에 계산 (max_dist_m 초과는 제외)
+  · 라운드마다 각 부족 대여소가 남은 과잉 중 가장 가까운 곳을 고르고,
+    같은 과잉 대여소를 고른 부족 대여소들은 가까운 순으로 남은 수량만큼 배정
+- 입력은 coerce_and_enrich() 를 거친 최신 스냅샷이면 SQL / CSV / 원본 blob 어디서 왔든 동일
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from common.spatial import EARTH_M
+
+DEFICIT = "부족"
+SURPLUS = "과잉"
+
+
+@dataclass
+class Thresholds:
+    low: float = 0.1            # 점유율 이하 → 부족
+    high: float = 0.9           # 점유율 이상 → 과잉
+    target: float = 0.5         # 이동 후 목표 점유율
+    min_racks: int = 1          # 거치대 수가 이보다 적으면 제외
+    max_dist_m: float = 2000.0  # 이동 제안 최대 거리
+
+
+def _occupancy(df: pd.DataFrame) -> np.ndarray:
+    if "occ_ratio" in df.columns:
+        return df["occ_ratio"].to_numpy(dtype=np.float32, na_value=np.nan)
+    bikes = df["bike_count"].to_numpy(dtype=np.float32, na_value=np.nan)
+    cap = df["rack_tot_cnt"].to_numpy(dtype=np.float32, na_value=np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cap > 0, bikes / cap, np.nan).astype(np.float32)
+
+
+def flag(latest: pd.DataFrame, th: Thresholds = Thresholds()) -> pd.DataFrame:
+    """부족/과잉 대여소만 (need_relocation, occ_ratio, move_need: +는 필요 대수, -는 남는 대수)"""
+    if latest is None or latest.empty or not {"bike_count", "rack_tot_cnt"}.issubset(latest.columns):
+        return pd.DataFrame()
+    occ = _occupancy(latest)
+    cap = latest["rack_tot_cnt"].to_numpy(dtype=np.float32, na_value=np.nan)
+    bikes = latest["bike_count"].to_numpy(dtype=np.float32, na_value=np.nan)
+    ok = np.isfinite(occ) & (cap >= th.min_racks)
+    low = ok & (occ <= th.low)
+    high = ok & (occ >= th.high)
+
+    out = latest[low | high].copy()
+    out["occ_ratio"] = occ[low | high]
+    out["need_relocation"] = np.where(low[low | high], DEFICIT, SURPLUS)
+    # 목표 점유율까지 필요한(+) / 남는(-) 대수
+    out["move_need"] = np.rint(th.target * cap - bikes)[low | high].astype(np.int32)
+    return out.sort_values("occ_ratio", kind="stable").reset_index(drop=True)
+
+
+def _distance_m(lat_a, lon_a, lat_b, lon_b) -> np.ndarray:
+    """(len(a), len(b)) 평면 근사 거리 행렬 (m)"""
+    k = np.pi / 180.0 * EARTH_M
+    coslat = np.cos(np.radians(np.nanmean(np.concatenate([lat_a, lat_b]))))
+    dx = (lon_a[:, None] - lon_b[None, :]) * k * coslat
+    dy = (lat_a[:, None] - lat_b[None, :]) * k
+    return np.hypot(dx, dy)
+
+
+def pair(flagged: pd.DataFrame, th: Thresholds = Thresholds(), max_rounds: int = 20) -> pd.DataFrame:
+    """과잉 → 부족 이동 제안 (from/to 대여소, distance_m, move_bikes), 거리 순"""
+    cols = ["from_station_id", "from_station_name", "to_station_id", "to_station_name", "distance_m", "move_bikes"]
+    if flagged is None or flagged.empty or not {"lat", "lon"}.issubset(flagged.columns):
+        return pd.DataFrame(columns=cols)
+    f = flagged[flagged["lat"].notna() & flagged["lon"].notna()]
+    src = f[(f["need_relocation"] == SURPLUS) & (f["move_need"] < 0)]
+    dst = f[(f["need_relocation"] == DEFICIT) & (f["move_need"] > 0)]
+    if src.empty or dst.empty:
+        return pd.DataFrame(columns=cols)
+
+    dist = _distance_m(src["lat"].to_numpy(np.float64), src["lon"].to_numpy(np.float64),
+                       dst["lat"].to_numpy(np.float64), dst["lon"].to_numpy(np.float64))
+    cost = np.where(dist <= th.max_dist_m, dist, np.inf).T   # (부족, 과잉)
+    excess = -src["move_need"].to_numpy(np.int64)
+    need = dst["move_need"].to_numpy(np.int64)
+    moves = np.zeros(cost.shape, dtype=np.int64)
+    rows = np.arange(len(dst))
+
+    for _ in range(max_rounds):
+        live = cost.copy()
+        live[:, excess <= 0] = np.inf
+        live[need <= 0, :] = np.inf
+        choice = live.argmin(axis=1)
+        d = live[rows, choice]
+        active = np.isfinite(d)
+        if not active.any():
+            break
+        r, s, d = rows[active], choice[active], d[active]
+        # 같은 과잉 대여소를 고른 부족 대여소는 가까운 순으로 남은 수량만큼
+        o = np.lexsort((d, s))
+        r, s = r[o], s[o]
+        want = need[r]
+        cum = np.cumsum(want)
+        first = np.r_[0, np.flatnonzero(np.diff(s)) + 1]
+        before = cum - want - np.repeat(np.r_[0, cum[first[1:] - 1]], np.diff(np.r_[first, len(s)]))
+        give = np.clip(excess[s] - before, 0, want)
+        moves[r, s] += give
+        need[r] -= give
+        np.subtract.at(excess, s, give)
+        cost[r, s] = np.inf  # 이미 쓴 쌍은 다음 라운드에서 제외
+
+    ri, si = np.nonzero(moves)
+    out = pd.DataFrame({
+        "from_station_id": src["station_id"].to_numpy()[si],
+        "from_station_name": src["station_name"].to_numpy()[si] if "station_name" in src.columns else None,
+        "to_station_id": dst["station_id"].to_numpy()[ri],
+        "to_station_name": dst["station_name"].to_numpy()[ri] if "station_name" in dst.columns else None,
+        "distance_m": np.round(dist[si, ri], 1),
+        "move_bikes": moves[ri, si],
+    })
+    return out.sort_values("distance_m", kind="stable").reset_index(drop=True)
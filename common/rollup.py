@@ -0,0 +1,163 @@
+# common/rollup.py
+"""
+대여소 × 시간대(KST 0~23시) 누적 집계
+
+- 스냅샷이 들어올 때마다 (station, hour_kst) 칸에 count / 가용률 합·제곱합 / 빈 거치대 합 / 거치대 합을 더함
+  → 평균·표준편차를 이력 길이와 무관하게 바로 계산
+- watermark(마지막 반영 ts_utc) 이하 스냅샷은 무시 → 같은 구간을 다시 돌려도 중복 집계 없음
+- data/rollup/station_hour_kst.parquet 한 파일로 저장 (watermark는 파일 메타데이터)
+"""
+import datetime as dt
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 선택 기능
+    pa = None
+    pq = None
+
+PATH = Path("data") / "rollup" / "station_hour_kst.parquet"
+KST_OFFSET = dt.timedelta(hours=9)
+FIELDS = ["count", "sum_avail", "sumsq_avail", "sum_slots", "sum_cap"]
+
+
+def available(path: Path = PATH) -> bool:
+    return pq is not None and Path(path).exists()
+
+
+class HourlyRollup:
+    def __init__(self):
+        self.index = {}                              # station_id → 행 번호
+        self.ids = []
+        self.acc = np.zeros((len(FIELDS), 0, 24))    # [필드, 대여소, 시간대]
+        self.watermark = None                        # tz-aware UTC
+
+    # ----- 갱신 -----
+    def _rows_for(self, station_ids) -> np.ndarray:
+        codes, uniq = pd.factorize(np.asarray(station_ids, dtype=object))
+        pos = np.empty(len(uniq), dtype=np.int64)
+        for i, sid in enumerate(uniq):
+            j = self.index.get(sid)
+            if j is None:
+                j = self.index[sid] = len(self.ids)
+                self.ids.append(sid)
+            pos[i] = j
+        if len(self.ids) > self.acc.shape[1]:
+            grow = np.zeros((len(FIELDS), len(self.ids) - self.acc.shape[1], 24))
+            self.acc = np.concatenate([self.acc, grow], axis=1)
+        return pos[codes]
+
+    def update(self, station_ids, ts_utc, bikes, racks) -> int:
+        """
+        벡터 입력(같은 길이) 반영. ts_utc: tz-aware 또는 naive(UTC)
+        반환: 반영된 행 수 (watermark 이하는 제외)
+        """
+        ts = pd.to_datetime(pd.Series(ts_utc), utc=True, errors="coerce")
+        bikes = pd.to_numeric(pd.Series(bikes), errors="coerce").to_numpy(dtype=float)
+        racks = pd.to_numeric(pd.Series(racks), errors="coerce").to_numpy(dtype=float)
+
+        ok = ts.notna().to_numpy() & ~np.isnan(bikes) & (racks > 0)
+        if self.watermark is not None:
+            ok &= (ts > self.watermark).to_numpy()
+        if not ok.any():
+            return 0
+
+        sid = np.asarray(station_ids, dtype=object)[ok]
+        ts, bikes, racks = ts[ok], bikes[ok], racks[ok]
+        rows = self._rows_for(sid)
+        hours = (ts + KST_OFFSET).dt.hour.to_numpy()
+
+        slots = racks - bikes
+        avail = slots / racks
+        flat = rows * 24 + hours
+        size = self.acc.shape[1] * 24
+        for k, v in enumerate([None, avail, avail * avail, slots, racks]):
+            self.acc[k] += np.bincount(flat, weights=v, minlength=size).reshape(-1, 24)
+
+        self.watermark = ts.max()
+        return int(ok.sum())
+
+    def update_frame(self, df: pd.DataFrame) -> int:
+        """bike_status 형식 (station_id, ts_utc, parking_bike_tot_cnt, rack_tot_cnt)"""
+        if df is None or df.empty:
+            return 0
+        df = df.sort_values("ts_utc", kind="stable")
+        return self.update(df["station_id"].to_numpy(), df["ts_utc"], df["parking_bike_tot_cnt"], df["rack_tot_cnt"])
+
+    def update_snapshot(self, rows, ts) -> int:
+        """rentBikeStatus.row 형식 스냅샷 1개"""
+        if not rows:
+            return 0
+        return self.update(
+            [r.get("stationId") for r in rows],
+            [ts] * len(rows),
+            [r.get("parkingBikeTotCnt") for r in rows],
+            [r.get("rackTotCnt") for r in rows],
+        )
+
+    # ----- 조회 -----
+    def station_frame(self) -> pd.DataFrame:
+        """대여소 × 시간대 평균/표준편차"""
+        n, s, ss, slots, cap = self.acc
+        st, hr = np.nonzero(n)
+        cnt = n[st, hr]
+        mean = s[st, hr] / cnt
+        var = np.maximum(ss[st, hr] / cnt - mean ** 2, 0)
+        return pd.DataFrame({
+            "station_id": np.asarray(self.ids, dtype=object)[st],
+            "hour_kst": hr,
+            "samples": cnt.astype(np.int64),
+            "availability_pct": mean * 100,
+            "availability_std": np.sqrt(var) * 100,
+            "avg_slots_available": slots[st, hr] / cnt,
+            "avg_rack_capacity": cap[st, hr] / cnt,
+        })
+
+    def hour_frame(self) -> pd.DataFrame:
+        """시간대별 전체 평균 (vw_station_peak_hours 대체, KST 기준)"""
+        n, s, _, slots, cap = self.acc.sum(axis=1)
+        hr = np.nonzero(n)[0]
+        return pd.DataFrame({
+            "hour_kst": hr,
+            "samples": n[hr].astype(np.int64),
+            "availability_pct": s[hr] / n[hr] * 100,
+            "avg_slots_available": slots[hr] / n[hr],
+            "avg_rack_capacity": cap[hr] / n[hr],
+        })
+
+    # ----- 저장 -----
+    def save(self, path: Path = PATH) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        st, hr = np.nonzero(self.acc[0])
+        cols = {"station_id": pa.array(np.asarray(self.ids, dtype=object)[st], type=pa.string()),
+                "hour_kst": pa.array(hr, type=pa.int8())}
+        for k, f in enumerate(FIELDS):
+            cols[f] = pa.array(self.acc[k][st, hr], type=pa.float64())
+        meta = {b"watermark": (self.watermark.isoformat() if self.watermark is not None else "").encode()}
+        table = pa.table(cols).replace_schema_metadata(meta)
+        tmp = path.with_suffix(".tmp")
+        pq.write_table(table, tmp, compression="zstd")
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path = PATH) -> "HourlyRollup":
+        r = cls()
+        path = Path(path)
+        if not path.exists():
+            return r
+        table = pq.read_table(path)
+        wm = (table.schema.metadata or {}).get(b"watermark", b"").decode()
+        r.watermark = pd.Timestamp(wm) if wm else None
+        df = table.to_pandas()
+        if df.empty:
+            return r
+        rows = r._rows_for(df["station_id"].to_numpy())
+        hours = df["hour_kst"].to_numpy().astype(np.int64)
+        for k, f in enumerate(FIELDS):
+            r.acc[k][rows, hours] = df[f].to_numpy()
+        return r
@@ -0,0 +1,226 @@
+# common/serving.py
+"""
+대시보드 서빙 스냅샷 (파이프라인이 미리 계산해 두는 화면용 결과)
+
+data/serving/
+  serving_<as_of>_<built>.arrow   ← Arrow IPC 파일 1개 = 버전 1개 (읽는 쪽은 memory map)
+  CURRENT.json                    ← 현재 버전 파일명 (tmp → replace 로 교체)
+
+- 본문 테이블: 대여소별 최신 행 (coerce_and_enrich 적용 + 지도 색/크기 r, g, b, size), KST 최신순
+- 스키마 메타데이터: KPI (대여소 수, 평균 가용률, 최신 시각, 가용률 95% 분위수),
+  시간대(KST) 집계 24행, 만든 시각 / 원본 / 형식 버전
+- 새 버전은 새 파일로 쓰고 포인터만 바꿈 → 열려 있는 이전 버전은 그대로 읽힘 (KEEP 개만 남기고 정리)
+- 대시보드는 버전별로 한 번만 읽어 모든 세션이 공유 → 페이지 로드/위젯 조작은 필터링만
+
+생성: python -m funcs.publish_serving (load_raw_to_sql 도 적재 후 발행)
+"""
+import os
+import json
+import datetime as dt
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from common.enrich import coerce_and_enrich
+from common.latest import latest_per_station
+from common.snapshot_reader import Columns, read_hour
+from common.snapshots import list_hour
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+except ImportError:  # 선택 기능
+    pa = None
+    ipc = None
+
+ROOT = Path("data") / "serving"
+POINTER = "CURRENT.json"
+FORMAT = 1
+KEEP = 3
+MAX_AGE_MIN = float(os.getenv("BIKE_SERVING_MAX_AGE_MIN", "15"))  # 이보다 오래된 버전은 대시보드가 쓰지 않음
+META_KEY = b"bike_serving"
+
+
+# =========================================================
+# 화면용 계산 (대시보드 실시간 경로와 공용)
+# =========================================================
+def map_style(df: pd.DataFrame) -> pd.DataFrame:
+    """지도 색(r, g, b) / 크기(size): 가용률이 낮을수록 붉고 크게"""
+    if "avail_ratio" in df.columns:
+        norm = df["avail_ratio"].astype(np.float32).clip(0, 1).fillna(0.5).to_numpy()
+        df["r"] = (255 * (1 - norm)).astype(np.int16)
+        df["g"] = (80 * (1 - np.abs(norm - 0.5) * 2)).astype(np.int16)
+        df["b"] = (255 * norm).astype(np.int16)
+        df["size"] = (300 * (1 - norm) + 50).astype(np.int16)
+    else:
+        df["r"], df["g"], df["b"], df["size"] = 100, 100, 200, 80
+    return df
+
+
+def peak_by_kst(peak: pd.DataFrame) -> pd.DataFrame:
+    """시간대 집계 → hour_kst 기준 (뷰의 hour_utc 는 +9), 시간순"""
+    if peak is None or peak.empty:
+        return pd.DataFrame()
+    out = peak.copy()
+    if "hour_kst" not in out.columns:
+        if "hour_utc" in out.columns:
+            out["hour_kst"] = (pd.to_numeric(out["hour_utc"], errors="coerce") + 9) % 24
+        else:
+            out["hour_kst"] = np.nan
+    return out.sort_values("hour_kst").reset_index(drop=True)
+
+
+def kpis(latest: pd.DataFrame) -> dict:
+    kpi = {"stations": None, "avail_mean": None, "latest_kst": None, "avail_q95": 1.0}
+    if latest is None or latest.empty:
+        return kpi
+    if "station_id" in latest.columns:
+        kpi["stations"] = int(latest["station_id"].nunique())
+    if "avail_ratio" in latest.columns and latest["avail_ratio"].notna().any():
+        kpi["avail_mean"] = float(np.nanmean(latest["avail_ratio"]))
+        kpi["avail_q95"] = float(latest["avail_ratio"].quantile(0.95))
+    if "ts_kst_str" in latest.columns and latest["ts_kst_str"].notna().any():
+        kpi["latest_kst"] = str(latest["ts_kst_str"].max())
+    return kpi
+
+
+# =========================================================
+# 서빙 스냅샷
+# =========================================================
+class ServingSnapshot:
+    def __init__(self, latest: pd.DataFrame, peak: pd.DataFrame, kpi: dict, meta: dict):
+        self.latest = latest
+        self.peak = peak
+        self.kpi = kpi
+        self.meta = meta
+
+    @property
+    def version(self) -> str:
+        return self.meta.get("version")
+
+    @property
+    def as_of(self):
+        return pd.Timestamp(self.meta["as_of_utc"]) if self.meta.get("as_of_utc") else None
+
+    @classmethod
+    def build(cls, latest: pd.DataFrame, peak: pd.DataFrame = None, source: str = "") -> "ServingSnapshot":
+        """최신 스냅샷(원본 컬럼 또는 enrich 된 것) + 시간대 집계 → 화면용 결과 한 벌"""
+        latest = latest.copy()
+        if "avail_ratio" not in latest.columns:
+            latest = coerce_and_enrich(latest)
+        latest = map_style(latest)
+        if "ts_kst" in latest.columns:
+            latest = latest.sort_values("ts_kst", ascending=False, kind="stable")
+        latest = latest.reset_index(drop=True)
+
+        as_of = pd.to_datetime(latest["ts_utc"], utc=True, errors="coerce").max() if "ts_utc" in latest.columns else None
+        built = dt.datetime.now(dt.timezone.utc)
+        meta = {
+            "format": FORMAT,
+            "source": source,
+            "built_utc": built.isoformat(),
+            "as_of_utc": as_of.isoformat() if as_of is not None and not pd.isna(as_of) else None,
+            "version": f"{(as_of if as_of is not None and not pd.isna(as_of) else built):%Y%m%d_%H%M%S}_{built:%H%M%S%f}",
+        }
+        return cls(latest, peak_by_kst(peak), kpis(latest), meta)
+
+    # ----- 저장 / 읽기 -----
+    def publish(self, root: Path = ROOT) -> Path:
+        """새 버전 파일 쓰기 → 포인터 교체 → 오래된 버전 정리, 반환: 파일 경로"""
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(self.latest, preserve_index=False)
+        extra = {"meta": self.meta, "kpi": self.kpi, "peak": json.loads(self.peak.to_json(orient="split", index=False))}
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               META_KEY: json.dumps(extra, ensure_ascii=False).encode("utf-8")})
+        path = root / f"serving_{self.version}.arrow"
+        tmp = path.with_name(path.name + ".tmp")
+        with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as w:
+            w.write_table(table)
+        tmp.replace(path)
+
+        ptr = root / POINTER
+        ptr_tmp = ptr.with_name(POINTER + ".tmp")
+        ptr_tmp.write_text(json.dumps({"file": path.name, **self.meta}, ensure_ascii=False), encoding="utf-8")
+        ptr_tmp.replace(ptr)
+        _prune(root, keep=path.name)
+        return path
+
+    @classmethod
+    def load(cls, file: str = None, root: Path = ROOT) -> "ServingSnapshot":
+        """file 없으면 현재 버전, memory map 으로 읽음"""
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed")
+        root = Path(root)
+        file = file or current(root)["file"]
+        with pa.memory_map(str(root / file), "r") as src:
+            table = ipc.open_file(src).read_all()
+        extra = json.loads(table.schema.metadata[META_KEY])
+        if extra["meta"].get("format") != FORMAT:
+            raise ValueError(f"unsupported serving format: {extra['meta'].get('format')}")
+        p = extra["peak"]
+        peak = pd.DataFrame(p["data"], columns=p["columns"])
+        return cls(table.to_pandas(), peak, extra["kpi"], extra["meta"])
+
+
+def _prune(root: Path, keep: str) -> None:
+    files = sorted(root.glob("serving_*.arrow"), key=lambda p: (p.stat().st_mtime, p.name), reverse=True)
+    for p in files[KEEP:]:
+        if p.name == keep:
+            continue
+        try:
+            p.unlink()
+        except OSError:
+            pass  # 다른 프로세스가 열어 둔 파일 (Windows) → 다음 발행 때 정리
+
+
+def current(root: Path = ROOT):
+    """포인터 내용 {"file", "version", "as_of_utc", ...}, 없으면 None"""
+    p = Path(root) / POINTER
+    if pa is None or not p.exists():
+        return None
+    try:
+        ptr = json.loads(p.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return ptr if (Path(root) / ptr.get("file", "")).is_file() else None
+
+
+def available(root: Path = ROOT) -> bool:
+    return current(root) is not None
+
+
+# =========================================================
+# 파이프라인에서 만들기 (raw 최신 스냅샷 + 시간대 집계)
+# =========================================================
+def latest_from_store(store, now: dt.datetime = None, lookback_hours: int = 3) -> pd.DataFrame:
+    """raw 에서 가장 최근 스냅샷 1개 (bike_status 형식), 최근 lookback_hours 시간 안에 없으면 빈 DataFrame"""
+    now = now or dt.datetime.now(dt.timezone.utc)
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    for _ in range(lookback_hours + 1):
+        names = list_hour(store, hour)
+        if names:
+            cols = Columns(capacity=4096)
+            if any(n.rsplit("/", 1)[-1].startswith("bike_delta_") for n in names):
+                read_hour(store, hour, cols)   # delta 는 keyframe 부터 복원
+            else:
+                cols.read(store, names[-1])
+            if len(cols):
+                return latest_per_station(cols.frame())
+        hour -= dt.timedelta(hours=1)
+    return pd.DataFrame()
+
+
+def publish_from_store(store, peak: pd.DataFrame = None, root: Path = ROOT, source: str = "raw",
+                       now: dt.datetime = None):
+    """raw 최신 스냅샷으로 서빙 스냅샷 발행, 스냅샷이 없으면 None"""
+    latest = latest_from_store(store, now)
+    if latest.empty:
+        return None
+    snap = ServingSnapshot.build(latest, peak, source=source)
+    snap.publish(root)
+    return snap
+
@@ -0,0 +1,349 @@
+# common/snapshot_reader.py
+"""
+스냅샷 JSON 스트리밍 읽기 → 열 배열
+
+- 파일 전체를 json.loads 하지 않고 청크 단위로 읽으며 "row": [ ... ] 배열의 원소만 하나씩 디코딩
+  (gzip 도 청크 단위로 풀기 → 메모리는 청크 + BATCH_ROWS 행 + 열 버퍼로 일정)
+- iter_records(): 행마다 타입 변환된 튜플 (자전거/거치대 수 int, 위경도 float, 결측 MISSING / NaN)
+- Columns: 미리 잡아 둔 numpy 열 배열에 스냅샷을 이어 붙임 (부족하면 2배로 늘림, clear() 로 재사용)
+  · station_id 는 정수 코드 + ids 목록 (행마다 문자열을 들고 있지 않음), 이름은 대여소별 마지막 값
+- read_hour(): 시간 폴더 1개 → Columns (delta 폴더는 snapshots.iter_hour 로 복원)
+- read_prefix(): 폴더 / blob prefix 아래 스냅샷 전체 → Columns
+
+    cols = read_hour(open_store("raw"), hour)
+    rollup.update(*cols.vectors())
+"""
+import re
+import json
+import zlib
+import codecs
+import datetime as dt
+from itertools import islice
+
+import numpy as np
+import pandas as pd
+
+from common.snapshots import is_snapshot_name, iter_hour, list_hour, ts_from_name
+
+CHUNK = 1 << 18          # 256KB
+MISSING = -1             # 정수 열 결측
+BATCH_ROWS = 4096        # 열 배열로 옮기는 단위 (이 이상은 dict 로 들고 있지 않음)
+_ROW_START = re.compile(r'"row"\s*:\s*\[')
+_SEP = re.compile(r"[\s,]*")
+_TAIL = 64               # "row": [ 가 청크 경계에 걸칠 때를 위해 남겨 두는 길이
+
+
+def _int(v) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        try:
+            return int(float(v))
+        except (TypeError, ValueError):
+            return MISSING
+
+
+def _float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# =========================================================
+# 스트리밍 디코딩
+# =========================================================
+def iter_chunks(store, name: str, size: int = CHUNK):
+    """store 의 파일을 bytes 청크로 (*.gz 는 풀면서)"""
+    src = store.iter_chunks(name, size) if hasattr(store, "iter_chunks") else (store.read_bytes(name),)
+    if not name.endswith(".gz"):
+        yield from src
+        return
+    z = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    for chunk in src:
+        out = z.decompress(chunk)
+        if out:
+            yield out
+    out = z.flush()
+    if out:
+        yield out
+
+
+def iter_rows(chunks):
+    """bytes 청크 → rentBikeStatus.row 원소(dict)를 하나씩 yield (row 배열이 없으면 아무것도 없음)"""
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    raw_decode = json.JSONDecoder().raw_decode
+    loads = json.loads
+    it = iter(chunks)
+    buf, pos, eof, in_rows = "", 0, False, False
+    slow_until = -1     # 이 위치까지는 한 번에 디코딩 실패 → 원소별 raw_decode
+
+    while True:
+        if not in_rows:
+            m = _ROW_START.search(buf)
+            if m:
+                buf, pos, in_rows = buf[m.end():], 0, True
+                continue
+            if eof:
+                return
+            buf = buf[-_TAIL:]
+        else:
+            pos = _SEP.match(buf, pos).end()
+            if pos < len(buf):
+                if buf[pos] == "]":
+                    return
+                # 버퍼 안의 마지막 "}," 까지는 C 디코더 1회로 (문자열 안 "}," 등으로 실패하면 그 구간은 하나씩)
+                end = buf.rfind("},", pos)
+                if end > slow_until:
+                    try:
+                        objs = loads("[" + buf[pos:end + 1] + "]")
+                    except ValueError:
+                        slow_until = end
+                    else:
+                        yield from objs
+                        pos = end + 2
+                        continue
+                try:
+                    obj, pos = raw_decode(buf, pos)
+                except ValueError:
+                    if eof:
+                        raise
+                else:
+                    yield obj
+                    continue
+            elif eof:
+                raise ValueError("snapshot ended inside the row array")
+            slow_until = max(slow_until - pos, -1)
+            buf, pos = buf[pos:], 0
+
+        chunk = next(it, None)
+        if chunk is None:
+            eof = True
+            buf += decode(b"", final=True)
+        else:
+            buf += decode(chunk)
+
+
+def iter_records(chunks):
+    """(station_id, station_name, rack_tot_cnt, parking_bike_tot_cnt, lat, lon) 타입 변환된 튜플"""
+    for r in iter_rows(chunks):
+        sid = r.get("stationId")
+        if not sid:
+            continue
+        yield (
+            sid,
+            r.get("stationName"),
+            _int(r.get("rackTotCnt")),
+            _int(r.get("parkingBikeTotCnt")),
+            _float(r.get("stationLatitude")),
+            _float(r.get("stationLongitude")),
+        )
+
+
+# =========================================================
+# 열 배열
+# =========================================================
+class Columns:
+    def __init__(self, capacity: int = 1 << 16):
+        self.n = 0
+        self.files = 0
+        self.ids, self.names, self._code = [], [], {}
+        self._alloc(max(int(capacity), 1))
+
+    def _alloc(self, cap: int) -> None:
+        old = getattr(self, "_arrays", None)
+        self._arrays = {
+            "ts": np.empty(cap, dtype="datetime64[s]"),
+            "code": np.empty(cap, dtype=np.int32),
+            "racks": np.empty(cap, dtype=np.int32),
+            "bikes": np.empty(cap, dtype=np.int32),
+            "lat": np.empty(cap, dtype=np.float64),
+            "lon": np.empty(cap, dtype=np.float64),
+        }
+        if old is not None:
+            for k, a in self._arrays.items():
+                a[:self.n] = old[k][:self.n]
+
+    def _reserve(self, k: int) -> None:
+        cap = len(self._arrays["ts"])
+        if self.n + k > cap:
+            while cap < self.n + k:
+                cap *= 2
+            self._alloc(cap)
+
+    def clear(self) -> None:
+        """행만 비움 (버퍼와 대여소 코드는 유지)"""
+        self.n = self.files = 0
+
+    def __len__(self) -> int:
+        return self.n
+
+    # ----- 추가 -----
+    def add_rows(self, rows, ts) -> int:
+        """
+        rentBikeStatus.row(dict) 스냅샷 1개 추가, 같은 스냅샷 안 station_id 중복은 마지막 값
+        BATCH_ROWS 행씩 끊어서 변환 (문자열 목록 → numpy 한 번, 실패할 때만 값별 변환)
+        """
+        start, t = self.n, _ts64(ts)
+        it = iter(rows)
+        while True:
+            part = list(islice(it, BATCH_ROWS))
+            if not part:
+                break
+            self._add_batch(part, t)
+        k = self.n - start
+        if not k:
+            return 0
+
+        code = self._arrays["code"][start:self.n]
+        if len(np.unique(code)) < k:
+            # 중복 대여소는 마지막 행만 (행 순서는 유지)
+            _, last = np.unique(code[::-1], return_index=True)
+            idx = np.sort(k - 1 - last)
+            for a in self._arrays.values():
+                a[start:start + len(idx)] = a[start:self.n][idx]
+            self.n = start + len(idx)
+        self.files += 1
+        return self.n - start
+
+    def _add_batch(self, rows: list, ts: np.datetime64) -> None:
+        sids = [r.get("stationId") for r in rows]
+        code_of = self._code
+        get = code_of.get
+        codes = [get(sid, -1) for sid in sids]
+        for i, c in enumerate(codes):
+            if c < 0 and sids[i]:
+                c = codes[i] = get(sids[i], -1)   # 같은 배치에서 이미 새로 등록된 경우
+                if c < 0:
+                    c = codes[i] = code_of[sids[i]] = len(self.ids)
+                    self.ids.append(sids[i])
+                    self.names.append(None)
+        for c, r in zip(codes, rows):
+            if c >= 0:
+                self.names[c] = r.get("stationName")
+
+        code = np.array(codes, dtype=np.int32)
+        idx = np.flatnonzero(code >= 0)
+        k = len(idx)
+        if not k:
+            return
+        self._reserve(k)
+        a, s = self._arrays, slice(self.n, self.n + k)
+        a["ts"][s] = ts
+        a["code"][s] = code[idx]
+        a["racks"][s] = _ints([r.get("rackTotCnt") for r in rows])[idx]
+        a["bikes"][s] = _ints([r.get("parkingBikeTotCnt") for r in rows])[idx]
+        a["lat"][s] = _floats([r.get("stationLatitude") for r in rows])[idx]
+        a["lon"][s] = _floats([r.get("stationLongitude") for r in rows])[idx]
+        self.n += k
+
+    def read(self, store, name: str, ts=None) -> int:
+        """스냅샷 파일 1개를 스트리밍으로 추가, ts 없으면 파일명 시각"""
+        ts = ts or ts_from_name(name)
+        if ts is None:
+            return 0
+        return self.add_rows(iter_rows(iter_chunks(store, name)), ts)
+
+    # ----- 조회 (길이 n 인 view) -----
+    @property
+    def code(self) -> np.ndarray:
+        return self._arrays["code"][:self.n]
+
+    @property
+    def bikes(self) -> np.ndarray:
+        return self._arrays["bikes"][:self.n]
+
+    @property
+    def racks(self) -> np.ndarray:
+        return self._arrays["racks"][:self.n]
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self._arrays["lat"][:self.n]
+
+    @property
+    def lon(self) -> np.ndarray:
+        return self._arrays["lon"][:self.n]
+
+    def ts_utc(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._arrays["ts"][:self.n]).tz_localize("UTC")
+
+    def station_ids(self) -> np.ndarray:
+        return np.asarray(self.ids, dtype=object)[self.code]
+
+    def vectors(self):
+        """rollup / forecast / matrix 의 update(station_ids, ts_utc, bikes, racks) 입력 (결측은 NaN)"""
+        return self.station_ids(), self.ts_utc(), _as_float(self.bikes), _as_float(self.racks)
+
+    def frame(self) -> pd.DataFrame:
+        """bike_status 형식 (결측 정수는 <NA>), ts_utc 는 naive UTC"""
+        return pd.DataFrame({
+            "station_id": self.station_ids(),
+            "station_name": np.asarray(self.names, dtype=object)[self.code],
+            "rack_tot_cnt": _nullable(self.racks),
+            "parking_bike_tot_cnt": _nullable(self.bikes),
+            "lat": self.lat,
+            "lon": self.lon,
+            "ts_utc": self._arrays["ts"][:self.n].astype("datetime64[ns]"),
+        })
+
+
+def _floats(vals: list) -> np.ndarray:
+    try:
+        return np.array(vals, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_float(v) for v in vals], dtype=np.float64)
+
+
+def _ints(vals: list) -> np.ndarray:
+    f = _floats(vals)
+    return np.where(np.isnan(f), MISSING, f).astype(np.int32)
+
+
+def _as_float(a: np.ndarray) -> np.ndarray:
+    return np.where(a == MISSING, np.nan, a.astype(np.float64))
+
+
+def _nullable(a: np.ndarray):
+    out = pd.array(a, dtype="Int64")
+    out[a == MISSING] = pd.NA
+    return out
+
+
+def _ts64(ts) -> np.datetime64:
+    t = pd.Timestamp(ts)
+    if t.tzinfo is not None:
+        t = t.tz_convert("UTC").tz_localize(None)
+    return t.to_datetime64().astype("datetime64[s]")
+
+
+# =========================================================
+# 시간 폴더 / prefix 단위
+# =========================================================
+def read_hour(store, hour: dt.datetime, cols: Columns = None, since: dt.datetime = None) -> Columns:
+    """
+    시간 폴더 1개의 스냅샷을 수집 시각 순으로 cols 에 추가 (없으면 새로 만듦)
+    since: 이 시각 이전 스냅샷은 건너뜀 (delta 는 복원을 위해 읽기만 함)
+    """
+    cols = Columns() if cols is None else cols
+    names = list_hour(store, hour)
+    if any("/bike_delta_" in n or n.startswith("bike_delta_") for n in names):
+        for ts, _, rows in iter_hour(store, hour, names):
+            if since is None or ts >= since:
+                cols.add_rows(rows, ts)
+        return cols
+    for name in names:
+        ts = ts_from_name(name)
+        if ts is not None and (since is None or ts >= since):
+            cols.read(store, name, ts)
+    return cols
+
+
+def read_prefix(store, prefix: str = "", cols: Columns = None) -> Columns:
+    """폴더 / blob prefix 아래 전체 스냅샷 (bike_snapshot_* 만, 수집 시각 순)"""
+    cols = Columns() if cols is None else cols
+    names = [n for n in store.list_names(prefix)
+             if is_snapshot_name(n) and n.rsplit("/", 1)[-1].startswith("bike_snapshot_")]
+    for name in sorted(names, key=lambda n: (ts_from_name(n) or dt.datetime.min.replace(tzinfo=dt.timezone.utc), n)):
+        cols.read(store, name)
+    return cols
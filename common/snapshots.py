@@ -0,0 +1,78 @@
+# common/snapshots.py
+"""
+Raw 스냅샷 파일 공통 처리
+
+- 파일명에서 수집 시각 추출 (ingest: 20251029_082044 / backfill: 2025-10-29T08-00-00)
+- 시간 폴더(YYYY/MM/DD/HH/) 단위로 스냅샷 (ts, rows) 순회
+  · bike_snapshot_*.json : 전체 스냅샷
+  · bike_delta_*.json    : delta 레코드 → keyframe부터 순서대로 복원
+  · *.json.gz            : gzip 저장분 (BIKE_GZIP=1) 동일하게 처리
+"""
+import re
+import gzip
+import json
+import datetime as dt
+from pathlib import Path
+
+# delta 복원은 Function과 같은 코드 사용 (azure_func/ 경로는 funcs/__init__.py, app/app.py 가 설정)
+from shared_code import delta
+
+_TS_DIGITS = re.compile(r"\D")
+
+
+def ts_from_name(name: str):
+    """파일명 숫자 14자리(YYYYMMDDHHMMSS) → UTC datetime, 실패 시 None"""
+    digits = _TS_DIGITS.sub("", Path(name).name.split(".")[0])[-14:]
+    if len(digits) != 14:
+        return None
+    try:
+        return dt.datetime.strptime(digits, "%Y%m%d%H%M%S").replace(tzinfo=dt.timezone.utc)
+    except ValueError:
+        return None
+
+
+def hour_prefix(ts: dt.datetime) -> str:
+    return f"{ts:%Y/%m/%d/%H}/"
+
+
+def is_snapshot_name(name: str) -> bool:
+    base = name.rsplit("/", 1)[-1]
+    return base.endswith((".json", ".json.gz")) and base.startswith(("bike_snapshot_", "bike_delta_"))
+
+
+def load_payload(name: str, data: bytes) -> dict:
+    if name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+def list_hour(store, hour: dt.datetime):
+    """시간 폴더의 스냅샷 파일명 (수집 시각 순)"""
+    names = [n for n in store.list_names(hour_prefix(hour)) if is_snapshot_name(n)]
+    return sorted(names, key=lambda n: (ts_from_name(n) or hour, n))
+
+
+def rows_of(payload: dict) -> list:
+    return (payload.get("rentBikeStatus") or {}).get("row", []) or []
+
+
+def iter_hour(store, hour: dt.datetime, names=None):
+    """(ts, name, rows) 를 수집 시각 순으로 yield"""
+    stations = {}
+    has_keyframe = False
+
+    for name in names if names is not None else list_hour(store, hour):
+        ts = ts_from_name(name)
+        if ts is None:
+            continue
+        payload = load_payload(name, store.read_bytes(name))
+
+        if name.rsplit("/", 1)[-1].startswith("bike_delta_"):
+            if payload.get("type") == "keyframe":
+                has_keyframe = True
+            elif not has_keyframe:
+                continue  # keyframe 이전 delta는 복원 불가
+            delta.apply(stations, payload)
+            yield ts, name, [dict(r) for r in stations.values()]
+        else:
+            yield ts, name, rows_of(payload)
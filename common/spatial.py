@@ -0,0 +1,141 @@
+# common/spatial.py
+"""
+대여소 위치 공간 인덱스 (격자 버킷)
+
+- 대여소 lat/lon 을 기준점 주변 평면(m)으로 근사 투영 후 CELL_M 크기 격자에 버킷팅
+  · 버킷은 셀 번호로 정렬된 인덱스 배열 + 셀별 시작/끝 위치 (CSR), 한 번만 구성
+- within(lat, lon, radius_m): 반경 안 대여소 (가까운 순), 주변 셀만 검사
+- nearest(lat, lon, k, mask): 가장 가까운 k개, mask(예: 빈 거치대 있음)를 만족하는 것만
+  · 링(ring) 단위로 넓혀가며 k번째 거리보다 먼 링이 나오면 중단
+- 서울 범위(수십 km)에서는 평면 근사 오차가 무시할 수준
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+CELL_M = 250.0
+EARTH_M = 6_371_000.0
+
+
+class StationIndex:
+    def __init__(self, station_ids, lat, lon, cell_m: float = CELL_M):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        ok = np.isfinite(lat) & np.isfinite(lon)
+        self.ids = np.asarray(station_ids, dtype=object)[ok]
+        self.lat = lat[ok]
+        self.lon = lon[ok]
+        self.cell_m = float(cell_m)
+
+        # 기준점 (중앙값) 주변 등장방형 투영
+        self.lat0 = float(np.median(self.lat)) if len(self.lat) else 37.5665
+        self.lon0 = float(np.median(self.lon)) if len(self.lon) else 126.9780
+        self.x, self.y = self._project(self.lat, self.lon)
+
+        # 격자 버킷 (CSR)
+        cx = np.floor(self.x / self.cell_m).astype(np.int64)
+        cy = np.floor(self.y / self.cell_m).astype(np.int64)
+        self.cx0 = int(cx.min()) if len(cx) else 0
+        self.cy0 = int(cy.min()) if len(cy) else 0
+        self.nx = int(cx.max()) - self.cx0 + 1 if len(cx) else 1
+        self.ny = int(cy.max()) - self.cy0 + 1 if len(cy) else 1
+        cell = (cy - self.cy0) * self.nx + (cx - self.cx0)
+        self.order = np.argsort(cell, kind="stable")
+        self.start = np.searchsorted(cell[self.order], np.arange(self.nx * self.ny + 1))
+
+        self.pos = {sid: i for i, sid in enumerate(self.ids)}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, cell_m: float = CELL_M) -> "StationIndex":
+        """대여소 마스터(또는 최신 스냅샷) DataFrame 에서 구성, station_id 중복은 첫 행만"""
+        d = df.drop_duplicates("station_id")
+        return cls(d["station_id"].to_numpy(), pd.to_numeric(d["lat"], errors="coerce"),
+                   pd.to_numeric(d["lon"], errors="coerce"), cell_m)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _project(self, lat, lon):
+        k = np.pi / 180.0 * EARTH_M
+        x = (np.asarray(lon, dtype=np.float64) - self.lon0) * k * np.cos(np.radians(self.lat0))
+        y = (np.asarray(lat, dtype=np.float64) - self.lat0) * k
+        return x, y
+
+    def coords(self, station_id):
+        """station_id 의 (lat, lon), 없으면 None"""
+        i = self.pos.get(station_id)
+        return None if i is None else (float(self.lat[i]), float(self.lon[i]))
+
+    # ----- 셀 후보 -----
+    def _cells(self, gx0: int, gx1: int, gy0: int, gy1: int) -> np.ndarray:
+        """격자 좌표 사각형 [gx0..gx1]x[gy0..gy1] 안 대여소 위치 (인덱스 배열)"""
+        gx0, gx1 = max(gx0, 0), min(gx1, self.nx - 1)
+        gy0, gy1 = max(gy0, 0), min(gy1, self.ny - 1)
+        if gx0 > gx1 or gy0 > gy1:
+            return np.empty(0, dtype=np.int64)
+        parts = []
+        for gy in range(gy0, gy1 + 1):
+            # 한 행의 연속 셀은 CSR 상에서도 연속 구간
+            a = self.start[gy * self.nx + gx0]
+            b = self.start[gy * self.nx + gx1 + 1]
+            if b > a:
+                parts.append(self.order[a:b])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def _grid(self, x: float, y: float):
+        return int(np.floor(x / self.cell_m)) - self.cx0, int(np.floor(y / self.cell_m)) - self.cy0
+
+    # ----- 질의 -----
+    def within(self, lat: float, lon: float, radius_m: float) -> tuple[np.ndarray, np.ndarray]:
+        """반경 radius_m 안 대여소 (위치 인덱스, 거리 m), 가까운 순"""
+        x, y = self._project(lat, lon)
+        x, y = float(x), float(y)
+        r = float(radius_m)
+        gx0, gy0 = self._grid(x - r, y - r)
+        gx1, gy1 = self._grid(x + r, y + r)
+        cand = self._cells(gx0, gx1, gy0, gy1)
+        d = np.hypot(self.x[cand] - x, self.y[cand] - y)
+        keep = d <= r
+        cand, d = cand[keep], d[keep]
+        o = np.argsort(d, kind="stable")
+        return cand[o], d[o]
+
+    def nearest(self, lat: float, lon: float, k: int = 5, mask=None) -> tuple[np.ndarray, np.ndarray]:
+        """가까운 k개 대여소 (위치 인덱스, 거리 m), mask(bool 배열, 위치 인덱스 기준)를 만족하는 것만"""
+        if k <= 0 or not len(self.ids):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        mask = None if mask is None else np.asarray(mask, dtype=bool)
+        x, y = self._project(lat, lon)
+        x, y = float(x), float(y)
+        gx, gy = self._grid(x, y)
+        max_ring = max(self.nx, self.ny) + abs(gx) + abs(gy)
+
+        found = np.empty(0, dtype=np.int64)
+        ring = 0
+        while ring <= max_ring:
+            cand = self._cells(gx - ring, gx + ring, gy - ring, gy + ring)
+            if mask is not None:
+                cand = cand[mask[cand]]
+            found = cand
+            if len(found) >= k:
+                d = np.hypot(self.x[found] - x, self.y[found] - y)
+                kth = np.partition(d, k - 1)[k - 1]
+                # 링 경계까지의 최소 거리가 k번째 거리 이상이면 바깥 셀에 더 가까운 후보 없음
+                if ring * self.cell_m >= kth:
+                    break
+                # 한 번에 k번째 거리만큼 링 확장
+                ring = max(ring + 1, int(np.ceil(kth / self.cell_m)))
+                continue
+            ring += 1
+
+        d = np.hypot(self.x[found] - x, self.y[found] - y)
+        o = np.argsort(d, kind="stable")[:k]
+        return found[o], d[o]
+
+    def frame(self, idx: np.ndarray, dist_m: np.ndarray, df: pd.DataFrame | None = None) -> pd.DataFrame:
+        """질의 결과 → DataFrame (station_id, distance_m [+ df 의 컬럼])"""
+        out = pd.DataFrame({"station_id": self.ids[idx], "distance_m": np.round(dist_m, 1)})
+        if df is not None and not df.empty:
+            out = out.merge(df.drop_duplicates("station_id"), on="station_id", how="left")
+        return out
@@ -0,0 +1,85 @@
+# common/storage.py
+"""
+Blob 컨테이너 / 로컬 폴더 공통 인터페이스
+
+- BlobStore: Azure Blob 컨테이너 (AZURE_STORAGE_CONN_STR)
+- LocalStore: 로컬 폴더를 컨테이너처럼 사용 (LOCAL_BLOB_ROOT 지정 시, 테스트/재처리용)
+- read_bytes(): 파일 전체, iter_chunks(): bytes 청크 순회 (스트리밍 읽기용)
+"""
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class LocalStore:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def list_names(self, prefix: str = ""):
+        if not prefix or prefix.endswith("/"):
+            base = self.root / prefix
+        else:
+            base = (self.root / prefix).parent
+        if not base.exists():
+            return []
+        names = (p.relative_to(self.root).as_posix() for p in base.rglob("*") if p.is_file())
+        return sorted(n for n in names if n.startswith(prefix))
+
+    def exists(self, name: str) -> bool:
+        return (self.root / name).is_file()
+
+    def read_bytes(self, name: str) -> bytes:
+        return (self.root / name).read_bytes()
+
+    def iter_chunks(self, name: str, size: int = 1 << 18):
+        with open(self.root / name, "rb") as fh:
+            while True:
+                chunk = fh.read(size)
+                if not chunk:
+                    return
+                yield chunk
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        path = self.root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)  # 쓰기 도중 중단돼도 반쪽 파일이 남지 않도록
+
+
+class BlobStore:
+    def __init__(self, conn_str: str, container: str):
+        from azure.storage.blob import BlobServiceClient
+
+        self.container = BlobServiceClient.from_connection_string(conn_str).get_container_client(container)
+
+    def list_names(self, prefix: str = ""):
+        return sorted(b.name for b in self.container.list_blobs(name_starts_with=prefix))
+
+    def exists(self, name: str) -> bool:
+        return self.container.get_blob_client(name).exists()
+
+    def read_bytes(self, name: str) -> bytes:
+        return self.container.download_blob(name).readall()
+
+    def iter_chunks(self, name: str, size: int = 1 << 18):
+        # 다운로드 청크 크기는 SDK 설정(max_chunk_get_size)을 따름
+        yield from self.container.download_blob(name).chunks()
+
+    def write_bytes(self, name: str, data: bytes) -> None:
+        self.container.upload_blob(name=name, data=data, overwrite=True)
+
+
+def open_store(container: str):
+    """LOCAL_BLOB_ROOT가 있으면 <root>/<container> 폴더, 없으면 Azure Blob 컨테이너"""
+    local_root = os.getenv("LOCAL_BLOB_ROOT")
+    if local_root:
+        return LocalStore(Path(local_root) / container)
+
+    conn_str = os.getenv("AZURE_STORAGE_CONN_STR")
+    if not conn_str:
+        raise RuntimeError("AZURE_STORAGE_CONN_STR is missing in .env (or set LOCAL_BLOB_ROOT)")
+    return BlobStore(conn_str, container)
@@ -0,0 +1,118 @@
+# common/synth.py
+"""
+합성 따릉이 데이터 생성 (벤치마크 / 오프라인 검증용)
+
+- out_simple/ 의 실제 스냅샷 1개에서 대여소 모양(좌표 분포, 거치대 수, 이름)을 읽어 기준으로 삼음
+  (없으면 서울 범위 균등 분포)
+- stations(n): 실제 대여소 수보다 많으면 좌표를 흔들어 복제 (2.7k → 50k)
+- snapshot(): API 그대로의 rentBikeStatus.row (값은 문자열)
+- history(): bike_status 형식 긴 DataFrame (대여소 × 시각), 시간대 주기 + 잡음
+- 같은 seed 면 같은 데이터
+"""
+import json
+import datetime as dt
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_DIR = Path("out_simple")
+SEOUL_LAT = (37.43, 37.70)
+SEOUL_LON = (126.80, 127.18)
+JITTER_DEG = 0.003
+
+
+def _sample_rows(sample_dir: Path = SAMPLE_DIR) -> list:
+    """out_simple/ 에서 행이 있는 가장 최근 스냅샷의 row"""
+    for p in sorted(Path(sample_dir).glob("bike_snapshot_*.json"), reverse=True):
+        try:
+            rows = json.loads(p.read_text(encoding="utf-8")).get("rentBikeStatus", {}).get("row") or []
+        except (OSError, ValueError):
+            continue
+        if rows:
+            return rows
+    return []
+
+
+def stations(n: int, seed: int = 0, sample_dir: Path = SAMPLE_DIR) -> pd.DataFrame:
+    """station_id, station_name, rack_tot_cnt, lat, lon (n 행)"""
+    rng = np.random.default_rng(seed)
+    base = _sample_rows(sample_dir)
+    if base:
+        b = pd.DataFrame({
+            "station_name": [r.get("stationName") for r in base],
+            "rack_tot_cnt": pd.to_numeric(pd.Series([r.get("rackTotCnt") for r in base]), errors="coerce").fillna(10),
+            "lat": pd.to_numeric(pd.Series([r.get("stationLatitude") for r in base]), errors="coerce"),
+            "lon": pd.to_numeric(pd.Series([r.get("stationLongitude") for r in base]), errors="coerce"),
+        }).dropna(subset=["lat", "lon"])
+        pick = np.arange(n) % len(b)
+        out = b.iloc[pick].reset_index(drop=True)
+        dup = np.arange(n) >= len(b)
+        out.loc[dup, "lat"] += rng.normal(0, JITTER_DEG, dup.sum())
+        out.loc[dup, "lon"] += rng.normal(0, JITTER_DEG, dup.sum())
+        out["station_name"] = np.where(dup, out["station_name"].astype(str) + "-" + (np.arange(n) // len(b)).astype(str),
+                                       out["station_name"])
+    else:
+        out = pd.DataFrame({
+            "station_name": [f"합성 대여소 {i}" for i in range(n)],
+            "rack_tot_cnt": rng.integers(5, 30, n),
+            "lat": rng.uniform(*SEOUL_LAT, n),
+            "lon": rng.uniform(*SEOUL_LON, n),
+        })
+    out.insert(0, "station_id", [f"ST-{i + 1}" for i in range(n)])
+    out["rack_tot_cnt"] = out["rack_tot_cnt"].astype(np.int64)
+    return out
+
+
+def _occupancy(n: int, ts: pd.DatetimeIndex, rng, phase=None) -> np.ndarray:
+    """[시각, 대여소] 점유율 0~1.5 (KST 시간대 주기 + 대여소별 위상 + 잡음)"""
+    phase = rng.uniform(0, 2 * np.pi, n) if phase is None else phase
+    hour = ((ts.hour + 9) % 24 + ts.minute / 60).to_numpy(dtype=float)
+    occ = 0.6 + 0.4 * np.sin(2 * np.pi * hour[:, None] / 24 + phase[None, :])
+    occ += rng.normal(0, 0.08, occ.shape)
+    return np.clip(occ, 0, 1.5)
+
+
+def snapshot(st: pd.DataFrame, ts: dt.datetime = None, seed: int = 0) -> list:
+    """rentBikeStatus.row 형식 (API 와 같이 문자열 값)"""
+    rng = np.random.default_rng(seed)
+    ts = pd.DatetimeIndex([pd.Timestamp(ts or dt.datetime.now(dt.timezone.utc))])
+    racks = st["rack_tot_cnt"].to_numpy()
+    bikes = np.rint(_occupancy(len(st), ts, rng)[0] * racks).astype(np.int64)
+    shared = np.where(racks > 0, np.rint(bikes * 100 / np.maximum(racks, 1)), 0).astype(np.int64)
+    return [
+        {
+            "rackTotCnt": str(r), "stationName": name, "parkingBikeTotCnt": str(b), "shared": str(s),
+            "stationLatitude": f"{lat:.8f}", "stationLongitude": f"{lon:.8f}", "stationId": sid,
+        }
+        for sid, name, r, b, s, lat, lon in zip(
+            st["station_id"], st["station_name"], racks, bikes, shared, st["lat"], st["lon"])
+    ]
+
+
+def payload(rows: list, ts: dt.datetime) -> dict:
+    """ingest 가 저장하는 스냅샷 JSON 모양"""
+    return {
+        "meta": {"timestamp_utc": ts.strftime("%Y%m%d_%H%M%S"), "total_rows": len(rows)},
+        "rentBikeStatus": {"row": rows},
+    }
+
+
+def history(st: pd.DataFrame, start, hours: float, freq_min: int = 5, seed: int = 0) -> pd.DataFrame:
+    """bike_status 형식 (station_id, station_name, rack_tot_cnt, parking_bike_tot_cnt, lat, lon, ts_utc)"""
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range(pd.Timestamp(start), periods=max(int(hours * 60 // freq_min), 1), freq=f"{freq_min}min")
+    ts = ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+    racks = st["rack_tot_cnt"].to_numpy()
+    bikes = np.rint(_occupancy(len(st), ts, rng) * racks[None, :]).astype(np.int32)
+    n_t, n_s = bikes.shape
+    idx = np.tile(np.arange(n_s), n_t)
+    return pd.DataFrame({
+        "station_id": st["station_id"].to_numpy()[idx],
+        "station_name": st["station_name"].to_numpy()[idx],
+        "rack_tot_cnt": racks[idx].astype(np.int32),
+        "parking_bike_tot_cnt": bikes.ravel(),
+        "lat": st["lat"].to_numpy()[idx],
+        "lon": st["lon"].to_numpy()[idx],
+        "ts_utc": np.repeat(ts.tz_localize(None).to_numpy(), n_s),
+    })
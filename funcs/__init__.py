@@ -0,0 +1,13 @@
+# funcs/__init__.py
+"""
+CLI 스크립트 모음 (python -m funcs.xxx 로 프로젝트 루트에서 실행)
+
+Function 앱과 같은 코드(azure_func/shared_code)를 쓰도록 azure_func/ 를 sys.path 에 한 번 추가
+(common/ 라이브러리 모듈은 경로를 건드리지 않음)
+"""
+import sys
+from pathlib import Path
+
+_FUNC_APP = str(Path(__file__).resolve().parents[1] / "azure_func")
+if _FUNC_APP not in sys.path:
+    sys.path.insert(0, _FUNC_APP)
@@ -1,9 +1,22 @@
-import os, json, time, datetime as dt
+# funcs/backfill_to_blob.py
+"""
+raw 컨테이너 backfill (임의 시간 구간, 5분 간격 스냅샷)
+
+- 업로드는 제한된 worker 풀 + token bucket 속도 제한 (고정 sleep 대신)
+- (A) 복제 모드: 소스 JSON은 한 번만 파싱, 시각마다 _ingest_ts만 덧붙여 직렬화
+- 이미 있는 blob은 시간 폴더(YYYY/MM/DD/HH/)별 목록 조회로 건너뜀 (--overwrite로 덮어쓰기)
+
+실행 예)
+  python -m funcs.backfill_to_blob                                   # 최근 8개 (기존 동작)
+  python -m funcs.backfill_to_blob --start 2025-10-01 --end 2025-11-01 --workers 8 --rate 20
+"""
+import os, json, time, argparse, threading, datetime as dt
 from pathlib import Path
-from azure.storage.blob import BlobServiceClient
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
-CONN_STR = os.getenv("AZURE_STORAGE_CONN_STR")
+from common.storage import open_store
+
 CONTAINER = "raw"
 
 SRC_LOCAL_JSON = Path("data") / "example_source.json"  # (A) 복제용 소스 파일 경로
@@ -13,55 +26,129 @@ API_URL = "http://openapi.seoul.go.kr:8088/{key}/json/bikeList/1/1000/".format(
     key=os.getenv("SEOUL_BIKE_API_KEY", "")
 )
 
-def _blob_client():
-    if not CONN_STR:
-        raise RuntimeError("AZURE_STORAGE_CONN_STR is missing in .env")
-    return BlobServiceClient.from_connection_string(CONN_STR)
+STEP = dt.timedelta(minutes=5)
+WORKERS = 4
+RATE = 10.0  # 초당 최대 업로드(요청) 수
 
-def _upload_bytes(bsc, rel_path:str, data:bytes):
-    container = bsc.get_container_client(CONTAINER)
-    container.upload_blob(name=rel_path, data=data, overwrite=True)
-    print(f"[UP] {rel_path}")
+class TokenBucket:
+    """초당 rate개, 최대 capacity개까지 몰아서 허용"""
+    def __init__(self, rate:float, capacity:float=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
 
 def make_path(ts:dt.datetime):
     y, m, d, h = ts.strftime("%Y/%m/%d/%H").split("/")
     fname = f"bike_snapshot_{ts.strftime('%Y-%m-%dT%H-%M-%S')}.json"
     return f"{y}/{m}/{d}/{h}/{fname}"
 
-def run_backfill(count=8, mode="A"):
+def load_template():
+    """
+    (A) 소스 JSON을 한 번만 읽고 파싱
+    반환: ts → payload bytes 함수
+    """
+    if not SRC_LOCAL_JSON.exists():
+        raise FileNotFoundError(f"Source JSON not found: {SRC_LOCAL_JSON}")
+    raw = SRC_LOCAL_JSON.read_bytes()
+
+    try:
+        j = json.loads(raw)
+    except Exception:
+        j = None
+    if not isinstance(j, dict):
+        return lambda ts: raw  # 파싱 불가 → 원본 그대로 복제
+
+    # 본문은 한 번만 직렬화하고 마지막 '}' 앞에 _ingest_ts만 붙임
+    j.pop("_ingest_ts", None)
+    body = json.dumps(j, ensure_ascii=False)
+    head = body[:-1] + (", " if j else "")
+    return lambda ts: (head + f'"_ingest_ts": "{ts.isoformat()}Z"}}').encode("utf-8")
+
+def fetch_api(ts:dt.datetime) -> bytes:
+    # (B) 실제 API 호출
+    resp = requests.get(API_URL, timeout=15)
+    resp.raise_for_status()
+    return resp.content
+
+def time_range(start:dt.datetime, end:dt.datetime, step:dt.timedelta=STEP):
+    """[start, end) 구간 step 간격 시각"""
+    ts = start
+    while ts < end:
+        yield ts
+        ts += step
+
+def existing_names(store, paths):
+    """구간에 걸친 시간 폴더(YYYY/MM/DD/HH/)마다 목록 조회 (연/월이 바뀌어도 컨테이너 전체를 훑지 않음)"""
+    names = set()
+    for prefix in sorted({p[:p.rfind("/") + 1] for p in paths}):
+        names.update(store.list_names(prefix))
+    return names
+
+def run_backfill(count=8, mode="A", start=None, end=None, workers=WORKERS, rate=RATE, overwrite=False):
     """
-    count: 만들 스냅샷 개수 (예: 8개면 1시간치 7.5분 간격으로 가정)
+    count: start/end가 없을 때 만들 스냅샷 개수 (현재 정시부터 5분 간격 거꾸로)
     mode: "A" 복제 / "B" API 호출
+    start, end: 구간 [start, end) (UTC)
     """
-    bsc = _blob_client()
-    now = dt.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
-    for i in range(count):
-        ts = now - dt.timedelta(minutes=5*i)  # 5분 간격 거꾸로 생성
-        rel = make_path(ts)
-
-        if mode.upper() == "B":
-            # (B) 실제 API 호출
-            resp = requests.get(API_URL, timeout=15)
-            resp.raise_for_status()
-            payload = resp.content
-        else:
-            # (A) 로컬 파일 복제
-            if not SRC_LOCAL_JSON.exists():
-                raise FileNotFoundError(f"Source JSON not found: {SRC_LOCAL_JSON}")
-            payload = SRC_LOCAL_JSON.read_bytes()
-
-            # 파일 안의 ts 값을 바꾸고 싶다면(선택), 간단 변환:
-            try:
-                j = json.loads(payload)
-                j["_ingest_ts"] = ts.isoformat() + "Z"
-                payload = json.dumps(j, ensure_ascii=False).encode("utf-8")
-            except Exception:
-                pass
-
-        _upload_bytes(bsc, f"{CONTAINER}/{rel}".replace(f"{CONTAINER}/",""), payload)
-        time.sleep(0.3)  # 과도한 요청 방지
+    if start is None or end is None:
+        now = dt.datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+        stamps = [now - STEP * i for i in range(count)]
+    else:
+        stamps = list(time_range(start, end))
+
+    store = open_store(CONTAINER)
+    todo = {make_path(ts): ts for ts in stamps}
+    if not overwrite:
+        done = existing_names(store, list(todo))
+        for rel in done & todo.keys():
+            del todo[rel]
+        print(f"[PLAN] {len(stamps)} snapshots, {len(stamps) - len(todo)} already exist, {len(todo)} to upload")
+
+    payload_for = fetch_api if mode.upper() == "B" else load_template()
+    bucket = TokenBucket(rate)
+
+    def upload(item):
+        rel, ts = item
+        bucket.acquire()  # 과도한 요청 방지
+        store.write_bytes(rel, payload_for(ts))
+        print(f"[UP] {rel}")
+
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for _ in ex.map(upload, sorted(todo.items())):
+            pass
+    print(f"[DONE] uploaded {len(todo)} snapshot(s)")
+
+def _parse_utc(s:str):
+    if not s:
+        return None
+    ts = dt.datetime.fromisoformat(s)
+    return ts.astimezone(dt.timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts
 
 if __name__ == "__main__":
-    # 기본: 복제 모드(A)로 8개 업로드
-    mode = "B" if (os.getenv("USE_API_MODE","0") == "1") else "A"
-    run_backfill(count=8, mode=mode)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--start", help="시작 시각 (ISO, UTC)")
+    ap.add_argument("--end", help="끝 시각 (ISO, UTC, 미포함)")
+    ap.add_argument("--count", type=int, default=8, help="start/end 없을 때 개수")
+    ap.add_argument("--workers", type=int, default=WORKERS)
+    ap.add_argument("--rate", type=float, default=RATE, help="초당 최대 업로드 수")
+    ap.add_argument("--overwrite", action="store_true")
+    args = ap.parse_args()
+
+    # 기본: 복제 모드(A)
+    mode = "B" if (USE_API or os.getenv("USE_API_MODE","0") == "1") else "A"
+    run_backfill(count=args.count, mode=mode, start=_parse_utc(args.start), end=_parse_utc(args.end),
+                 workers=args.workers, rate=args.rate, overwrite=args.overwrite)
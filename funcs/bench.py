@@ -0,0 +1,210 @@
+# funcs/bench.py
+"""
+파이프라인 벤치마크 (오프라인, 합성 데이터)
+
+- common/synth.py 로 out_simple/ 모양의 스냅샷 / bike_status 이력 생성 (대여소 수·기간 조절)
+- 단계별 시간(best / median of --repeat)과 처리량(rows/s), tracemalloc 최대 메모리 측정
+  · ingest_parse  : 스냅샷 JSON bytes → json.loads + loader.flatten
+  · stream_parse  : 같은 bytes → snapshot_reader 스트리밍 디코딩 → 열 배열 (청크 단위)
+  · ingest_encode : 스냅샷 → blob 업로드용 JSON (gzip 포함) 직렬화
+  · delta_encode  : 연속 스냅샷 delta 인코딩
+  · enrich        : coerce_and_enrich (이력 전체)
+  · latest        : latest_per_station (이력 전체)
+  · latest_state  : LatestState 스냅샷 단위 증분 갱신
+  · rollup        : HourlyRollup.update_frame
+  · matrix_append : MatrixStore 스냅샷 행 쓰기
+  · export_csv    : csv.writer 로 이력 기록 (+ pyarrow 있으면 fallback Parquet part)
+- --baseline 과 비교해 best 시간이 tolerance 이상 느려진 단계가 있으면 종료 코드 1
+
+실행 예)
+  python -m funcs.bench --stations 2700 --hours 6
+  python -m funcs.bench --stations 50000 --hours 1 --cases enrich,latest
+  python -m funcs.bench --save-baseline          # 현재 결과를 기준으로 저장
+"""
+import csv, json, sys, time, shutil, argparse, platform, tempfile, tracemalloc, statistics, datetime as dt
+from pathlib import Path
+
+import pandas as pd
+
+from common import synth, fallback_store, snapshot_reader
+from common.db.loader import flatten
+from common.enrich import coerce_and_enrich
+from common.latest import latest_per_station, LatestState
+from common.rollup import HourlyRollup
+from common.matrix_store import MatrixStore
+from shared_code import blob_writer, delta
+
+BASELINE = Path("data") / "bench" / "baseline.json"
+TOLERANCE = 0.25
+MIN_DELTA_S = 0.005   # 이보다 작은 절대 차이는 잡음으로 보고 무시
+
+
+# =========================================================
+# 단계 정의: (이름, 준비(측정 제외) → 입력, 실행(입력), 처리 행 수)
+# =========================================================
+def build_cases(args):
+    st = synth.stations(args.stations, seed=args.seed)
+    start = pd.Timestamp(args.start, tz="UTC")
+    hist = synth.history(st, start, args.hours, args.freq, seed=args.seed)
+    snap_ts = [start.to_pydatetime() + dt.timedelta(minutes=args.freq * i) for i in range(args.snapshots)]
+    snaps = [synth.snapshot(st, ts, seed=args.seed + i) for i, ts in enumerate(snap_ts)]
+    blobs = [json.dumps(synth.payload(rows, ts), ensure_ascii=False).encode("utf-8") for rows, ts in zip(snaps, snap_ts)]
+    by_ts = [g for _, g in hist.groupby("ts_utc", sort=True)]
+    n_snap_rows = sum(len(r) for r in snaps)
+    tmp = Path(tempfile.mkdtemp(prefix="bike_bench_"))
+
+    def ingest_parse(_):
+        for b, ts in zip(blobs, snap_ts):
+            flatten(json.loads(b)["rentBikeStatus"]["row"], ts)
+
+    def stream_parse(_):
+        cols = snapshot_reader.Columns(capacity=n_snap_rows)
+        for b, ts in zip(blobs, snap_ts):
+            chunks = (b[i:i + snapshot_reader.CHUNK] for i in range(0, len(b), snapshot_reader.CHUNK))
+            cols.add_rows(snapshot_reader.iter_rows(chunks), ts)
+
+    def ingest_encode(_):
+        for rows, ts in zip(snaps, snap_ts):
+            for gz in (False, True):
+                fh, _ = blob_writer.encode_json(synth.payload(rows, ts), compress=gz)
+                fh.close()
+
+    def delta_encode(_):
+        state = {}
+        for rows, ts in zip(snaps, snap_ts):
+            _, state = delta.encode(rows, state, ts)
+
+    def latest_state(_):
+        s = LatestState()
+        for g in by_ts:
+            s.update(g)
+
+    def matrix_append(root):
+        m = MatrixStore.create(snap_ts[0], root=root)
+        for rows, ts in zip(snaps, snap_ts):
+            m.append_snapshot(rows, ts)
+        m.flush()
+
+    def export_csv(root):
+        with open(root / "bike_status_all.csv", "w", newline="", encoding="utf-8") as fh:
+            w = csv.writer(fh)
+            w.writerow(hist.columns)
+            w.writerows(hist.itertuples(index=False, name=None))
+        if fallback_store.pa is not None:
+            fallback_store.FallbackStore(root / "fallback").write(hist)
+
+    def fresh_dir(name):
+        def prep():
+            d = tmp / f"{name}_{time.perf_counter_ns()}"
+            d.mkdir(parents=True)
+            return d
+        return prep
+
+    none = lambda: None  # noqa: E731
+    cases = [
+        ("ingest_parse", none, ingest_parse, n_snap_rows),
+        ("stream_parse", none, stream_parse, n_snap_rows),
+        ("ingest_encode", none, ingest_encode, n_snap_rows),
+        ("delta_encode", none, delta_encode, n_snap_rows),
+        ("enrich", hist.copy, coerce_and_enrich, len(hist)),
+        ("latest", none, lambda _: latest_per_station(hist), len(hist)),
+        ("latest_state", none, latest_state, len(hist)),
+        ("rollup", none, lambda _: HourlyRollup().update_frame(hist), len(hist)),
+        ("matrix_append", fresh_dir("matrix"), matrix_append, n_snap_rows),
+        ("export_csv", fresh_dir("export"), export_csv, len(hist)),
+    ]
+    if args.cases:
+        want = set(args.cases.split(","))
+        cases = [c for c in cases if c[0] in want]
+    return cases, tmp
+
+
+def measure(prepare, run, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        x = prepare()
+        t0 = time.perf_counter()
+        run(x)
+        times.append(time.perf_counter() - t0)
+
+    # 메모리는 별도 1회 (tracemalloc 이 시간 측정을 왜곡하지 않도록)
+    x = prepare()
+    tracemalloc.start()
+    try:
+        run(x)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"best_s": min(times), "median_s": statistics.median(times), "peak_mb": peak / 2**20}
+
+
+# =========================================================
+# 기준 비교
+# =========================================================
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """best 시간이 기준 대비 (1 + tolerance) 배를 넘은 단계 [(이름, 기준, 현재, 비율)] (MIN_DELTA_S 이하 차이 제외)"""
+    regressions = []
+    for name, r in results["cases"].items():
+        b = baseline.get("cases", {}).get(name)
+        if not b:
+            continue
+        ratio = r["best_s"] / b["best_s"] if b["best_s"] > 0 else float("inf")
+        r["vs_baseline"] = round(ratio, 3)
+        if ratio > 1 + tolerance and r["best_s"] - b["best_s"] > MIN_DELTA_S:
+            regressions.append((name, b["best_s"], r["best_s"], ratio))
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--stations", type=int, default=2700, help="대여소 수 (2.7k ~ 50k)")
+    ap.add_argument("--hours", type=float, default=6, help="이력 기간(시간)")
+    ap.add_argument("--freq", type=int, default=5, help="수집 간격(분)")
+    ap.add_argument("--snapshots", type=int, default=12, help="ingest 계열 단계의 스냅샷 수")
+    ap.add_argument("--start", default="2025-10-29T00:00", help="이력 시작 시각 (UTC)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--cases", help="쉼표로 구분한 단계 이름만 실행")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--tolerance", type=float, default=TOLERANCE, help="허용 느려짐 비율 (0.25 = 25%%)")
+    ap.add_argument("--save-baseline", action="store_true", help="이번 결과를 기준으로 저장")
+    ap.add_argument("--out", help="결과 JSON 저장 경로")
+    args = ap.parse_args()
+
+    params = {k: getattr(args, k) for k in ("stations", "hours", "freq", "snapshots", "seed")}
+    print(f"[BENCH] {params} python={platform.python_version()} pandas={pd.__version__}")
+    cases, tmp = build_cases(args)
+
+    results = {"params": params, "created_at_utc": dt.datetime.now(dt.timezone.utc).isoformat(), "cases": {}}
+    for name, prepare, run, rows in cases:
+        r = measure(prepare, run, args.repeat)
+        r["rows"] = rows
+        r["rows_per_s"] = rows / r["best_s"] if r["best_s"] > 0 else float("inf")
+        results["cases"][name] = r
+        print(f"  {name:<14} best={r['best_s'] * 1000:9.1f} ms  median={r['median_s'] * 1000:9.1f} ms  "
+              f"{r['rows_per_s']:>12,.0f} rows/s  peak={r['peak_mb']:8.1f} MB")
+
+    regressions = []
+    baseline_path = Path(args.baseline)
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if baseline.get("params") != params:
+            print(f"[WARN] baseline params differ: {baseline.get('params')}")
+        regressions = compare(results, baseline, args.tolerance)
+        for name, b, c, ratio in regressions:
+            print(f"[REGRESSION] {name}: {b * 1000:.1f} ms -> {c * 1000:.1f} ms (x{ratio:.2f})")
+        if not regressions:
+            print(f"[OK] no regression over {args.tolerance:.0%} vs {baseline_path}")
+
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"[OK] baseline saved -> {baseline_path}")
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
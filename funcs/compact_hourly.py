@@ -0,0 +1,121 @@
+# funcs/compact_hourly.py
+"""
+시간 단위 compaction: raw/YYYY/MM/DD/HH/ 의 5분 스냅샷들 → Parquet 1개 + manifest
+
+- 마감된 시간(hour_end + GRACE 경과)만 처리
+- (station_id, ts_utc) 순 정렬, zstd 압축
+- manifest의 원본 목록이 현재와 같으면 건너뜀 → 재실행해도 안전 (--force로 강제)
+- LOCAL_BLOB_ROOT 지정 시 로컬 폴더를 컨테이너처럼 사용
+
+실행: python -m funcs.compact_hourly --hours 24
+"""
+import json, argparse, datetime as dt
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from common.storage import open_store
+from common.snapshots import hour_prefix, iter_hour, list_hour
+from shared_code import columnar
+
+SRC_CONTAINER = "raw"
+DST_CONTAINER = "compacted"
+GRACE = dt.timedelta(minutes=10)  # 마지막 tick 업로드 지연 여유
+
+def manifest_name(hour:dt.datetime) -> str:
+    return f"{hour_prefix(hour)}_manifest.json"
+
+def data_name(hour:dt.datetime) -> str:
+    return f"{hour_prefix(hour)}bike_status_{hour:%Y%m%d_%H}.parquet"
+
+def _load_manifest(dst, hour):
+    name = manifest_name(hour)
+    if not dst.exists(name):
+        return None
+    return json.loads(dst.read_bytes(name))
+
+def build_table(src, hour, names):
+    tables = [columnar.to_table(rows, ts) for ts, _, rows in iter_hour(src, hour, names) if rows]
+    if not tables:
+        return None
+    table = pa.concat_tables(tables)
+
+    # dictionary 컬럼은 직접 정렬이 안 되므로 문자열 키로 정렬 순서만 계산
+    keys = pa.table({
+        "station_id": table["station_id"].cast(pa.string()),
+        "ts_utc": table["ts_utc"],
+    })
+    order = pc.sort_indices(keys, sort_keys=[("station_id", "ascending"), ("ts_utc", "ascending")])
+    return table.take(order).unify_dictionaries().combine_chunks()
+
+def compact_hour(src, dst, hour:dt.datetime, force=False):
+    """반환: 새 manifest (건너뛰면 None)"""
+    names = list_hour(src, hour)
+    if not names:
+        return None
+
+    old = _load_manifest(dst, hour)
+    if old and old.get("sources") == names and not force:
+        print(f"[SKIP] {hour_prefix(hour)} already compacted ({len(names)} files)")
+        return None
+
+    table = build_table(src, hour, names)
+    if table is None:
+        return None
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink, compression=columnar.COMPRESSION)
+    data = sink.getvalue().to_pybytes()
+
+    # 데이터 먼저, manifest는 마지막에 → manifest가 있으면 데이터도 완전함
+    dst.write_bytes(data_name(hour), data)
+
+    ts_col = table["ts_utc"]
+    manifest = {
+        "hour_utc": hour.isoformat(),
+        "file": data_name(hour),
+        "bytes": len(data),
+        "rows": table.num_rows,
+        "stations": pc.count_distinct(table["station_id"].cast(pa.string())).as_py(),
+        "snapshots": pc.count_distinct(ts_col).as_py(),
+        "min_ts_utc": pc.min(ts_col).as_py().isoformat(),
+        "max_ts_utc": pc.max(ts_col).as_py().isoformat(),
+        "sources": names,
+        "compacted_at_utc": dt.datetime.now(dt.timezone.utc).isoformat(),
+    }
+    dst.write_bytes(manifest_name(hour), json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    print(f"[OK] {data_name(hour)} rows={manifest['rows']} files={len(names)} bytes={len(data)}")
+    return manifest
+
+def closed_hours(since:dt.datetime, until:dt.datetime):
+    """[since, until) 구간 중 마감된 시간들"""
+    now = dt.datetime.now(dt.timezone.utc)
+    h = since.replace(minute=0, second=0, microsecond=0)
+    while h < until:
+        if h + dt.timedelta(hours=1) + GRACE <= now:
+            yield h
+        h += dt.timedelta(hours=1)
+
+def _parse_utc(s:str) -> dt.datetime:
+    ts = dt.datetime.fromisoformat(s)
+    return ts.replace(tzinfo=dt.timezone.utc) if ts.tzinfo is None else ts.astimezone(dt.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=int, default=24, help="최근 N시간 (since/until 미지정 시)")
+    ap.add_argument("--since", help="시작 시각 (ISO, UTC)")
+    ap.add_argument("--until", help="끝 시각 (ISO, UTC, 미포함)")
+    ap.add_argument("--force", action="store_true", help="manifest가 같아도 다시 생성")
+    args = ap.parse_args()
+
+    now = dt.datetime.now(dt.timezone.utc).replace(minute=0, second=0, microsecond=0)
+    until = _parse_utc(args.until) if args.until else now
+    since = _parse_utc(args.since) if args.since else until - dt.timedelta(hours=args.hours)
+
+    src, dst = open_store(SRC_CONTAINER), open_store(DST_CONTAINER)
+    done = sum(1 for h in closed_hours(since, until) if compact_hour(src, dst, h, args.force))
+    print(f"[DONE] compacted {done} hour(s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# funcs/delta_rebuild.py
+"""
+delta 레코드(raw/YYYY/MM/DD/HH/bike_delta_*.json) → 특정 시점 전체 스냅샷 복원
+
+사용 예)
+  python -m funcs.delta_rebuild 2025-10-29T08:35:00+00:00
+  python -m funcs.delta_rebuild 2025-10-29T08:35:00+00:00 --src out_delta/2025/10/29/08
+"""
+import os, gzip, json, argparse, datetime as dt
+from pathlib import Path
+from azure.storage.blob import BlobServiceClient
+
+from shared_code import delta
+
+CONN_STR = os.getenv("AZURE_STORAGE_CONN_STR")
+CONTAINER = "raw"
+OUT = Path("out")
+
+def _load(name:str, data:bytes):
+    return json.loads(gzip.decompress(data) if name.endswith(".gz") else data)
+
+def _records_from_dir(src:Path):
+    for p in sorted(src.glob("bike_delta_*.json*")):
+        yield _load(p.name, p.read_bytes())
+
+def _records_from_blob(ts:dt.datetime):
+    if not CONN_STR:
+        raise RuntimeError("AZURE_STORAGE_CONN_STR is missing in .env")
+    container = BlobServiceClient.from_connection_string(CONN_STR).get_container_client(CONTAINER)
+    prefix = f"{ts:%Y/%m/%d/%H}/bike_delta_"
+    # 매 시간 첫 레코드가 keyframe 이므로 해당 시간 폴더만 읽으면 됨
+    for b in sorted(container.list_blobs(name_starts_with=prefix), key=lambda b: b.name):
+        yield _load(b.name, container.download_blob(b.name).readall())
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("at", help="복원 시점 (ISO, UTC)")
+    ap.add_argument("--src", help="로컬 delta 폴더 (없으면 Blob에서 조회)")
+    args = ap.parse_args()
+
+    ts = dt.datetime.fromisoformat(args.at)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=dt.timezone.utc)
+    at = ts.astimezone(dt.timezone.utc).isoformat()
+
+    records = _records_from_dir(Path(args.src)) if args.src else _records_from_blob(ts)
+    payload = delta.rebuild(records, at=at)
+
+    OUT.mkdir(exist_ok=True)
+    path = OUT / f"bike_snapshot_rebuilt_{ts:%Y%m%d_%H%M%S}.json"
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"[REBUILT] {payload['meta']['timestamp_utc']} rows={payload['meta']['total_rows']} -> {path}")
+
+if __name__ == "__main__":
+    main()
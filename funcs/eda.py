@@ -1,6 +1,7 @@
 # funcs/eda.py
 from pathlib import Path
-import pandas as pd, matplotlib.pyplot as plt
+import numpy as np, pandas as pd, matplotlib.pyplot as plt
+from common import matrix_store
 plt.rcParams["font.family"]="Malgun Gothic"; plt.rcParams["axes.unicode_minus"]=False
 
 util = pd.read_csv(Path("data")/"station_utilization_latest.csv", encoding="utf-8-sig")
@@ -15,3 +16,13 @@ hot = util.sort_values("avail_ratio").head(10)
 plt.figure(); plt.barh(hot["station_name"], hot["avail_ratio"])
 plt.title("핫스팟 TOP10(가용률 낮음)"); plt.xlabel("avail_ratio"); plt.gca().invert_yaxis()
 plt.tight_layout(); plt.show()
+
+# 3) 최근 24시간 전체 주차 자전거 수 (data/matrix 격자가 있으면, 행 합계만)
+if matrix_store.available():
+    mx = matrix_store.MatrixStore(mode="r")
+    times, bikes, _ = mx.window(hours=24)
+    valid = bikes != matrix_store.MISSING
+    total = np.where(valid, bikes, 0).sum(axis=1)
+    plt.figure(); plt.plot(times.tz_convert("Asia/Seoul"), total)
+    plt.title("최근 24시간 전체 주차 자전거 수"); plt.xlabel("시각(KST)"); plt.ylabel("bikes")
+    plt.tight_layout(); plt.show()
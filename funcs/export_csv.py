@@ -1,23 +1,187 @@
 # funcs/export_csv_fixed.py
+"""
+dbo.bike_status → data/bike_status_all.csv (+ fallback Parquet 저장소) 스트리밍 export
+(BIKE_READ_FACT=1 이면 bike_status_fact 를 읽고 station_dim 을 메모리에서 붙여 같은 넓은 형식으로 기록)
+
+- PK (station_id, ts_utc) 순 keyset 페이지 단위 조회 → fetchmany로 받아 바로 파일에 기록 (전체 DataFrame 없음)
+  (페이지마다 PK 범위 seek + TOP, 별도 인덱스 없이 테이블 전체를 한 번만 훑음)
+- 시작할 때 MAX(ts_utc) 를 상한(until_ts)으로 고정 → 훑는 도중 들어온 tick 은 다음 export 에서 통째로
+- 페이지마다 checkpoint 기록 → 중단되면 다음 실행이 마지막 키부터 이어서 진행 (같은 상한)
+- --incremental: 지난 상한 이후 행 + 지난 export 이후 늦게 적재된 시각의 행
+  (loader 의 적재 목록 bike_load_files.loaded_at_utc 기준, 목록은 LATE_HOURS 창만 유지하므로 그보다 자주 실행)
+  ADF 처럼 목록을 남기지 않는 경로로 늦게 들어온 행은 전체 export 에서만 반영
+- fallback 저장소에는 상한 - fallback_store.KEEP_MINUTES 분 이후 행만 기록, 끝나면 정리(maintain)
+
+실행: python -m funcs.export_csv [--incremental]
+"""
+import csv, json, time, argparse, datetime as dt
 from pathlib import Path
 import pandas as pd
-from common.db.connect import get_conn
+from common.db.pool import get_pool
+from common import fallback_store, metrics
+from common.db import loader, station_dim
 
 OUT = Path("data"); OUT.mkdir(exist_ok=True)
+NAME = "bike_status_all"
+CSV_PATH = OUT / f"{NAME}.csv"
+CHECKPOINT = OUT / f"{NAME}.checkpoint.json"
+
+PAGE = 200000   # keyset 페이지 크기 (행)
+FETCH = 20000   # fetchmany 배치 크기
+
+SQL_PAGE = """
+SELECT TOP (?) *
+FROM {table}
+WHERE {where}
+ORDER BY station_id, ts_utc;
+"""
+AFTER_KEY = "(station_id > ? OR (station_id = ? AND ts_utc > ?))"
+UNTIL = "ts_utc <= ?"
+SINCE = "ts_utc > ?"
+LEDGER = loader.SqlServerDialect.files_table
+SINCE_OR_LATE = f"""(ts_utc > ? OR ts_utc IN (
+    SELECT ts_utc FROM {LEDGER}
+    WHERE source = ? AND loaded_at_utc > ? AND loaded_at_utc <= ? AND ts_utc <= ?))"""
+
+def _ts(v):
+    return dt.datetime.fromisoformat(v) if v else None
+
+def _page_query(table, cp, source):
+    """checkpoint → (SQL, 파라미터): 마지막 키 이후 + 상한 이하 + (incremental 이면) since_ts 이후 또는 늦게 적재된 시각"""
+    where, params = [UNTIL], [_ts(cp["until_ts"])]
+    if cp["last_station_id"] is not None:
+        where.append(AFTER_KEY)
+        params += [cp["last_station_id"], cp["last_station_id"], _ts(cp["last_ts"])]
+    if cp["since_ts"] and cp["loaded_from"] and cp["loaded_to"]:
+        where.append(SINCE_OR_LATE)
+        params += [_ts(cp["since_ts"]), source, _ts(cp["loaded_from"]), _ts(cp["loaded_to"]), _ts(cp["since_ts"])]
+    elif cp["since_ts"]:
+        where.append(SINCE)
+        params.append(_ts(cp["since_ts"]))
+    return SQL_PAGE.format(table=table, where=" AND ".join(where)), params
 
-QUERIES = {
-    "bike_status_all": "SELECT * FROM dbo.bike_status ORDER BY ts_utc DESC;"
-}
+def _bounds(cur, table, source):
+    """(MAX(ts_utc), 적재 목록의 MAX(loaded_at_utc)) - 이번 export 의 상한, 목록이 없으면 두 번째는 None"""
+    max_ts = cur.execute(f"SELECT MAX(ts_utc) FROM {table};").fetchone()[0]
+    loaded = None
+    if cur.execute(f"SELECT OBJECT_ID('{LEDGER}');").fetchone()[0] is not None:
+        loaded = cur.execute(f"SELECT MAX(loaded_at_utc) FROM {LEDGER} WHERE source = ?;", source).fetchone()[0]
+    return max_ts, loaded
 
-def run():
+def _load_checkpoint():
+    if not CHECKPOINT.exists():
+        return None
+    return json.loads(CHECKPOINT.read_text(encoding="utf-8"))
+
+def _save_checkpoint(cp:dict):
+    tmp = CHECKPOINT.with_suffix(".tmp")
+    tmp.write_text(json.dumps(cp, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp.replace(CHECKPOINT)
+
+def run(incremental=False):
     OUT.mkdir(exist_ok=True)
-    with get_conn() as cn:
-        for name, sql in QUERIES.items():
-            print(f"[RUN] {sql}")
-            df = pd.read_sql(sql, cn)
-            out_path = OUT / f"{name}.csv"
-            df.to_csv(out_path, index=False, encoding="utf-8-sig")
-            print(f"[OK] {name} ({len(df)} rows) -> {out_path}")
+    cp = _load_checkpoint()
+    resume = bool(cp) and CSV_PATH.exists() and (incremental or not cp.get("complete"))
+
+    store = fallback_store.FallbackStore() if fallback_store.pa is not None else None
+    if store is None:
+        print("[SKIP] pyarrow not installed, fallback store not written")
+
+    if resume:
+        # 마지막 checkpoint 이후 반쯤 쓰인 내용은 잘라냄
+        with open(CSV_PATH, "r+b") as fh:
+            fh.truncate(cp["csv_bytes"])
+    else:
+        cp = {"last_station_id": None, "last_ts": None, "since_ts": None, "until_ts": None,
+              "loaded_from": None, "loaded_to": None, "rows": 0, "csv_bytes": 0, "complete": False}
+        CSV_PATH.unlink(missing_ok=True)
+        if store is not None:
+            store.reset()
+
+    new_rows = 0
+    keep = dt.timedelta(minutes=fallback_store.KEEP_MINUTES)
+    need_header = not resume
+
+    with get_pool().connection() as cn, open(CSV_PATH, "a", newline="", encoding="utf-8-sig" if not resume else "utf-8") as fh:
+        writer = csv.writer(fh)
+        cur = cn.cursor()
+        fact = station_dim.fact_table(cn)
+        dim = station_dim.load_dim(cn) if fact else None
+        table = fact or "dbo.bike_status"
+        source = loader.ledger_source(split=bool(fact))
+
+        if not resume or cp["complete"]:
+            # 새 pass: 상한을 먼저 고정 (incremental 은 지난 상한 / 적재 시각 이후부터, 키는 처음부터)
+            max_ts, loaded_to = _bounds(cur, table, source)
+            if resume:
+                cp.update(since_ts=cp["until_ts"], loaded_from=cp["loaded_to"])
+            cp.update(until_ts=max_ts.isoformat() if max_ts else cp["until_ts"],
+                      loaded_to=loaded_to.isoformat() if loaded_to else cp["loaded_to"],
+                      last_station_id=None, last_ts=None, complete=False)
+            if resume:
+                print(f"[INCREMENTAL] ts_utc in ({cp['since_ts']}, {cp['until_ts']}] + loaded after {cp['loaded_from']} ({cp['rows']} rows done)")
+        else:
+            print(f"[RESUME] after station_id={cp['last_station_id']} ts_utc={cp['last_ts']} ({cp['rows']} rows done)")
+        # 대시보드 백업은 상한 기준 최근 구간만 (남는 오래된 행은 maintain 이 정리)
+        recent_from = _ts(cp["until_ts"]) - keep if cp["until_ts"] else None
+
+        while cp["until_ts"]:   # 빈 테이블이면 훑을 것 없음
+            t_page = time.perf_counter()
+            sql, params = _page_query(table, cp, source)
+            cur.execute(sql, PAGE, *params)
+
+            cols = [c[0] for c in cur.description]
+            out_cols = cols + station_dim.DIM_COLS if dim is not None else cols
+            if need_header:
+                writer.writerow(out_cols)
+                need_header = False
+            i_ts, i_sid = cols.index("ts_utc"), cols.index("station_id")
+
+            page_rows, page_batches = 0, []
+            while True:
+                batch = cur.fetchmany(FETCH)
+                if not batch:
+                    break
+                last = batch[-1]
+                if dim is not None:
+                    # 배치 단위로 차원 붙이기 (해시 매핑 / 버전 여러 개인 대여소만 as-of)
+                    wide = station_dim.join(pd.DataFrame.from_records(batch, columns=cols), dim)[out_cols]
+                    batch = list(wide.astype(object).where(wide.notna(), None).itertuples(index=False, name=None))
+                writer.writerows(batch)
+                cp["last_station_id"], cp["last_ts"] = last[i_sid], last[i_ts].isoformat()
+                if store is not None:
+                    page_batches.extend(tuple(r) for r in batch if r[i_ts] >= recent_from)
+                page_rows += len(batch)
+
+            metrics.observe("sql_query_seconds", time.perf_counter() - t_page, query="export_page")
+            metrics.inc("sql_rows_returned", page_rows, query="export_page")
+
+            # fallback 저장소는 페이지당 part 1개 (메모리는 페이지 크기로 제한)
+            if page_batches:
+                with metrics.timer("fallback_write_seconds"):
+                    store.write(pd.DataFrame.from_records(page_batches, columns=out_cols))
+
+            fh.flush()
+            cp["rows"] += page_rows
+            cp["csv_bytes"] = CSV_PATH.stat().st_size
+            _save_checkpoint(cp)
+            new_rows += page_rows
+            print(f"[PAGE] {page_rows} rows (total {cp['rows']}) up to station_id={cp['last_station_id']}")
+
+            if page_rows < PAGE:
+                break
+
+    cp["complete"] = True
+    cp["exported_at_utc"] = dt.datetime.now(dt.timezone.utc).isoformat()
+    _save_checkpoint(cp)
+    metrics.flush("export_csv", rows=new_rows)
+    print(f"[OK] {NAME} (+{new_rows} rows, {cp['rows']} total) -> {CSV_PATH}")
+    if store is not None:
+        with metrics.timer("fallback_maintain_seconds"):
+            st = store.maintain()
+        print(f"[OK] fallback store -> {store.root} (latest {store.max_ts()}, parts={st['parts']} pruned={st['pruned']} compacted={st['compacted']})")
 
 if __name__ == "__main__":
-    run()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--incremental", action="store_true", help="지난 export 이후 새 행만 추가")
+    run(incremental=ap.parse_args().incremental)
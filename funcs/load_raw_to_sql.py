@@ -0,0 +1,58 @@
+# funcs/load_raw_to_sql.py
+"""
+raw 컨테이너 스냅샷 → dbo.bike_status 재적재 (watermark 이후 신규분 + 그 아래 BIKE_LOAD_LATE_HOURS 시간 안에 늦게 올라온 파일)
+(--split: dbo.station_dim + dbo.bike_status_fact, 대시보드 / export 는 BIKE_READ_FACT=1 일 때만 읽음)
+
+실행 예)
+  python -m funcs.load_raw_to_sql --since 2025-10-29T00:00
+  LOCAL_BLOB_ROOT=./blob python -m funcs.load_raw_to_sql --since 2025-10-29T00:00 --sqlite data/local.db
+"""
+import argparse, sqlite3, datetime as dt
+
+from common.storage import open_store
+from common.db.loader import load, BATCH_SIZE
+from common import metrics, rollup as rollup_mod, serving
+
+def _parse_utc(s:str):
+    if not s:
+        return None
+    ts = dt.datetime.fromisoformat(s)
+    return ts.replace(tzinfo=dt.timezone.utc) if ts.tzinfo is None else ts.astimezone(dt.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--since", help="watermark가 없을 때 시작 시각 (ISO, UTC)")
+    ap.add_argument("--until", help="끝 시각 (ISO, UTC, 미포함)")
+    ap.add_argument("--batch", type=int, default=BATCH_SIZE)
+    ap.add_argument("--sqlite", help="SQL Server 대신 SQLite 파일에 적재 (로컬 검증용)")
+    ap.add_argument("--split", action="store_true", help="dbo.bike_status 대신 station_dim + bike_status_fact 에 적재")
+    ap.add_argument("--no-serving", action="store_true", help="적재 후 대시보드 서빙 스냅샷 발행 생략")
+    args = ap.parse_args()
+
+    store = open_store("raw")
+    # 시간대 집계 파일도 같이 갱신 (pyarrow 있을 때, 시간 폴더마다 DB commit 과 함께 저장)
+    rollup = rollup_mod.HourlyRollup.load() if rollup_mod.pq is not None else None
+    since, until = _parse_utc(args.since), _parse_utc(args.until)
+    if args.sqlite:
+        cn = sqlite3.connect(args.sqlite)
+        try:
+            stats = load(store, cn, since, until, args.batch, rollup=rollup, split=args.split)
+        finally:
+            cn.close()
+    else:
+        from common.db.pool import get_pool  # pyodbc는 SQL Server 모드에서만 필요
+        with get_pool().connection() as cn:
+            stats = load(store, cn, since, until, args.batch, rollup=rollup, split=args.split)
+    # 새로 적재한 스냅샷이 있으면 대시보드 서빙 스냅샷도 갱신
+    if stats["files"] and not args.no_serving and serving.pa is not None:
+        with metrics.timer("serving_publish_seconds"):
+            snap = serving.publish_from_store(store, rollup.hour_frame() if rollup is not None else None)
+        if snap is not None:
+            print(f"[SERVING] {snap.version} -> {serving.ROOT}")
+        else:
+            print("[SERVING] no recent snapshot in raw, skipped")
+    metrics.flush("load_raw_to_sql", files=stats["files"], rows=stats["rows"])
+    print(f"[DONE] files={stats['files']} late={stats['late']} rows={stats['rows']} inserted={stats['inserted']} dim_changes={stats['dim_changes']} watermark={stats['watermark']}")
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,33 @@
-import os, json, requests, datetime as dt
+# 실행: python -m funcs.local_bike_fetch
+import os, json, datetime as dt
 from pathlib import Path
 from dotenv import load_dotenv
 
+# Function 앱과 동일한 수집 로직 사용 (azure_func/shared_code, 경로는 funcs/__init__.py)
+from shared_code import columnar, pagination
+
 load_dotenv()
 
 API_KEY = os.getenv("SEOUL_BIKE_API_KEY")
 print(API_KEY)
 BASE = f"http://openapi.seoul.go.kr:8088/{API_KEY}/json/bikeList"
+WRITE_PARQUET = os.getenv("BIKE_PARQUET", "0") == "1"  # JSON 옆에 Parquet 사본 저장
 
-# 따릉이 데이터 전체 구간 (2725까지, 구간당 999)
-RANGES = [(1, 999), (1000, 1998), (1999, 2725)]
-
+# 구간은 첫 응답의 list_total_count로 자동 계산 (shared_code/pagination.py)
 def fetch_simple():
-    rows = []
-    for start, end in RANGES:
-        url = f"{BASE}/{start}/{end}/"
-        print(f"[CALL] {url}")
-        res = requests.get(url, timeout=15)
-        if res.status_code != 200:
-            print(f"[ERROR] HTTP {res.status_code}: {res.text[:100]}")
-            continue
-        try:
-            data = res.json().get("rentBikeStatus", {})
-            page = data.get("row", []) or []
-            print(f"[PAGE {start}-{end}] {len(page)} rows")
-            rows.extend(page)
-        except json.JSONDecodeError:
-            print(f"[PARSE ERROR] invalid JSON for {url}")
-    print(f"[TOTAL] {len(rows)} rows fetched")
+    try:
+        rows, pages, total = pagination.fetch_planned(BASE)
+    except RuntimeError as e:
+        print(f"[ERROR] {e}")
+        return []
+    for p in pages:
+        print(f"[PAGE {p.start}-{p.end}] {len(p.rows)} rows ({p.latency_ms:.0f}ms)")
+    print(f"[TOTAL] {len(rows)} rows fetched (list_total_count={total})")
     return rows
 
 def main():
-    ts = dt.datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    now = dt.datetime.now(dt.timezone.utc)
+    ts = now.strftime("%Y%m%d_%H%M%S")
     outdir = Path("out_simple"); outdir.mkdir(exist_ok=True)
     rows = fetch_simple()
     payload = {
@@ -42,5 +38,16 @@ def main():
     path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
     print(f"[SAVED] {path}")
 
+    if WRITE_PARQUET and rows:
+        if not columnar.available():
+            print("[SKIP] pyarrow not installed, parquet not written")
+            return
+        # raw/YYYY/MM/DD/HH/ 와 같은 파티션 구조
+        pdir = outdir / f"{now:%Y/%m/%d/%H}"
+        pdir.mkdir(parents=True, exist_ok=True)
+        ppath = pdir / f"bike_snapshot_{ts}.parquet"
+        ppath.write_bytes(columnar.to_parquet_bytes(rows, now))
+        print(f"[SAVED] {ppath}")
+
 if __name__ == "__main__":
     main()
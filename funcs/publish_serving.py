@@ -0,0 +1,35 @@
+# funcs/publish_serving.py
+"""
+대시보드 서빙 스냅샷 발행 (data/serving/, common/serving.py)
+
+- raw 컨테이너의 가장 최근 스냅샷 → enrich + 지도 색/크기 + KPI
+- 시간대(KST) 집계는 data/rollup/ 이 있으면 같이 넣음
+- 대시보드는 새 버전을 한 번만 읽어 모든 세션이 공유 (DB 조회 없음)
+- ingest 주기(5분)에 맞춰 스케줄러로 돌리거나, load_raw_to_sql 적재 후 자동 발행
+
+실행: python -m funcs.publish_serving [--at 2025-10-29T09:00]
+"""
+import argparse, datetime as dt
+
+from common.storage import open_store
+from common import rollup, serving
+
+def _parse_utc(s:str):
+    if not s:
+        return None
+    ts = dt.datetime.fromisoformat(s)
+    return ts.replace(tzinfo=dt.timezone.utc) if ts.tzinfo is None else ts.astimezone(dt.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--at", help="이 시각 기준 최근 스냅샷 (ISO, UTC, 재처리/확인용), 기본: 현재")
+    args = ap.parse_args()
+
+    peak = rollup.HourlyRollup.load().hour_frame() if rollup.available() else None
+    snap = serving.publish_from_store(open_store("raw"), peak, now=_parse_utc(args.at))
+    if snap is None:
+        raise SystemExit("no recent snapshot in raw")
+    print(f"[OK] serving {snap.version} stations={snap.kpi['stations']} as_of={snap.as_of} -> {serving.ROOT}")
+
+if __name__ == "__main__":
+    main()
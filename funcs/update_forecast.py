@@ -0,0 +1,57 @@
+# funcs/update_forecast.py
+"""
+raw 스냅샷 → 단기 예측 모델 증분 갱신 (data/forecast/forecaster.npz)
+
+- 저장된 watermark 이후 스냅샷만 반영 (처음이면 --since 필요, 시간대 평균을 위해 1~2주 권장)
+- 타이머/cron 으로 매 틱 실행 → 대시보드 "고갈 예측" 탭이 파일을 읽어 바로 예측
+
+실행: python -m funcs.update_forecast [--since 2025-10-15T00:00] [--show 20]
+"""
+import argparse, datetime as dt
+
+from common.storage import open_store
+from common.snapshot_reader import Columns, read_hour
+from common.forecast import Forecaster, PATH
+
+def _parse_utc(s:str):
+    if not s:
+        return None
+    ts = dt.datetime.fromisoformat(s)
+    return ts.replace(tzinfo=dt.timezone.utc) if ts.tzinfo is None else ts.astimezone(dt.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--since", help="모델이 없을 때 시작 시각 (ISO, UTC)")
+    ap.add_argument("--show", type=int, default=0, help="고갈 위험 상위 N개 출력")
+    args = ap.parse_args()
+
+    model = Forecaster.load(PATH)
+    if model.watermark is not None:
+        start = dt.datetime.fromtimestamp(model.watermark, dt.timezone.utc)
+    else:
+        start = _parse_utc(args.since)
+    if start is None:
+        raise SystemExit("no model yet: pass --since for the first run")
+
+    store = open_store("raw")
+    now = dt.datetime.now(dt.timezone.utc)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    snaps = rows = 0
+    cols = Columns()   # 시간 폴더마다 재사용 (스트리밍 읽기 → 열 배열 → 한 번에 반영)
+    while hour <= now:
+        read_hour(store, hour, cols)
+        if len(cols):
+            rows += model.update(*cols.vectors())
+            snaps += cols.files
+            cols.clear()
+        hour += dt.timedelta(hours=1)
+
+    model.save(PATH)
+    print(f"[OK] forecaster {snaps} snapshots read (+{rows} rows), as_of={model.as_of} -> {PATH}")
+
+    if args.show:
+        pred = model.predict()
+        print(pred[pred["dry_risk"]].head(args.show).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
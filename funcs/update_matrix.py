@@ -0,0 +1,57 @@
+# funcs/update_matrix.py
+"""
+raw 스냅샷 → 대여소×시간(5분) memmap 격자 갱신 (data/matrix/)
+
+- 마지막으로 쓴 칸 이후 스냅샷만 추가 (처음이면 --since 로 생성, 그 날짜 0시가 첫 칸)
+- 같은 칸은 덮어쓰므로 구간을 다시 돌려도 결과 동일
+- 대시보드(대여소 시계열 / 예측 입력)와 분석 스크립트는 MatrixStore(mode="r") 로 바로 읽음
+
+실행: python -m funcs.update_matrix [--since 2025-10-29T00:00]
+"""
+import argparse, datetime as dt
+
+from common.storage import open_store
+from common.snapshot_reader import Columns, read_hour
+from common import matrix_store
+from common.matrix_store import MatrixStore
+
+def _parse_utc(s:str):
+    if not s:
+        return None
+    ts = dt.datetime.fromisoformat(s)
+    return ts.replace(tzinfo=dt.timezone.utc) if ts.tzinfo is None else ts.astimezone(dt.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--since", help="저장소가 없을 때 시작 시각 (ISO, UTC)")
+    args = ap.parse_args()
+
+    if matrix_store.available():
+        store = MatrixStore(mode="r+")
+        start = store.last_ts.to_pydatetime() if store.last_ts is not None else _parse_utc(args.since)
+    else:
+        start = _parse_utc(args.since)
+        if start is None:
+            raise SystemExit("no matrix store yet: pass --since for the first run")
+        store = MatrixStore.create(start)
+    if start is None:
+        raise SystemExit("matrix store is empty: pass --since")
+
+    raw = open_store("raw")
+    now = dt.datetime.now(dt.timezone.utc)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    snaps = values = 0
+    cols = Columns()   # 시간 폴더마다 재사용 (스트리밍 읽기 → 열 배열 → 한 번에 기록)
+    while hour <= now:
+        read_hour(raw, hour, cols, since=start)
+        if len(cols):
+            values += store.append(*cols.vectors())
+            snaps += cols.files
+            cols.clear()
+        hour += dt.timedelta(hours=1)
+
+    store.flush()
+    print(f"[OK] matrix +{snaps} snapshots ({values} values), stations={len(store.ids)}, last={store.last_ts} -> {store.root}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+# funcs/update_rollup.py
+"""
+raw 스냅샷 → 대여소×시간대(KST) 누적 집계 갱신 (data/rollup/station_hour_kst.parquet)
+
+- 저장된 watermark 이후 스냅샷만 반영 (처음이면 --since 필요)
+- 대시보드 "시간대 혼잡도" 탭이 이 파일을 바로 읽음 (vw_station_peak_hours 전체 스캔 대체)
+
+실행: python -m funcs.update_rollup [--since 2025-10-29T00:00]
+"""
+import argparse, datetime as dt
+
+from common.storage import open_store
+from common.snapshot_reader import Columns, read_hour
+from common.rollup import HourlyRollup, PATH
+
+def _parse_utc(s:str):
+    if not s:
+        return None
+    ts = dt.datetime.fromisoformat(s)
+    return ts.replace(tzinfo=dt.timezone.utc) if ts.tzinfo is None else ts.astimezone(dt.timezone.utc)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--since", help="watermark가 없을 때 시작 시각 (ISO, UTC)")
+    args = ap.parse_args()
+
+    rollup = HourlyRollup.load(PATH)
+    start = rollup.watermark.to_pydatetime() if rollup.watermark is not None else _parse_utc(args.since)
+    if start is None:
+        raise SystemExit("no rollup yet: pass --since for the first run")
+
+    store = open_store("raw")
+    now = dt.datetime.now(dt.timezone.utc)
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    snaps = rows = 0
+    cols = Columns()   # 시간 폴더마다 재사용 (스트리밍 읽기 → 열 배열 → 한 번에 반영)
+    while hour <= now:
+        read_hour(store, hour, cols)
+        if len(cols):
+            rows += rollup.update(*cols.vectors())
+            snaps += cols.files
+            cols.clear()
+        hour += dt.timedelta(hours=1)
+
+    rollup.save(PATH)
+    print(f"[OK] rollup {snaps} snapshots read (+{rows} rows), watermark={rollup.watermark} -> {PATH}")
+
+if __name__ == "__main__":
+    main()
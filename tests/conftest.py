@@ -0,0 +1,14 @@
+# tests/conftest.py
+"""
+pytest 공통 설정 - 프로젝트 루트(common/, funcs/) + azure_func/(shared_code) 를 import 경로에 추가
+(스크립트는 funcs/__init__.py, 대시보드는 app/app.py 가 같은 설정을 함)
+
+실행: pip install -r requirements-dev.txt && python -m pytest -q
+"""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT, ROOT / "azure_func"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
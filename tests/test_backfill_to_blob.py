@@ -0,0 +1,52 @@
+# tests/test_backfill_to_blob.py
+"""
+funcs/backfill_to_blob - 기존 blob 확인은 시간 폴더별 목록 조회, 이미 있는 스냅샷은 건너뜀 (LocalStore)
+"""
+import json
+import datetime as dt
+
+from common.storage import LocalStore
+from funcs import backfill_to_blob as bf
+
+
+class SpyStore(LocalStore):
+    def __init__(self, root):
+        super().__init__(root)
+        self.prefixes = []
+
+    def list_names(self, prefix=""):
+        self.prefixes.append(prefix)
+        return super().list_names(prefix)
+
+
+def test_existing_names_lists_each_hour_across_year_boundary(tmp_path):
+    store = SpyStore(tmp_path)
+    stamps = list(bf.time_range(dt.datetime(2025, 12, 31, 23, 50), dt.datetime(2026, 1, 1, 0, 10)))
+    paths = [bf.make_path(ts) for ts in stamps]
+    store.write_bytes(paths[1], b"{}")
+    store.write_bytes("2025/06/01/00/bike_snapshot_2025-06-01T00-00-00.json", b"{}")   # 구간 밖
+
+    assert bf.existing_names(store, paths) == {paths[1]}
+    assert store.prefixes == ["2025/12/31/23/", "2026/01/01/00/"]
+    assert "" not in store.prefixes
+    assert bf.existing_names(store, []) == set()
+
+
+def test_backfill_skips_existing(tmp_path, monkeypatch):
+    src = tmp_path / "source.json"
+    src.write_text(json.dumps({"rentBikeStatus": {"row": [{"stationId": "ST-1"}]}}), encoding="utf-8")
+    monkeypatch.setattr(bf, "SRC_LOCAL_JSON", src)
+    monkeypatch.setenv("LOCAL_BLOB_ROOT", str(tmp_path / "blob"))
+    start, end = dt.datetime(2025, 12, 31, 23, 45), dt.datetime(2026, 1, 1, 0, 15)
+
+    store = LocalStore(tmp_path / "blob" / bf.CONTAINER)
+    first = bf.make_path(start)
+    store.write_bytes(first, b"keep")
+    bf.run_backfill(start=start, end=end, rate=1000)
+
+    names = store.list_names()
+    assert len(names) == 6
+    assert store.read_bytes(first) == b"keep"
+    body = json.loads(store.read_bytes(bf.make_path(end - bf.STEP)))
+    assert body["_ingest_ts"] == "2026-01-01T00:10:00Z"
+    assert body["rentBikeStatus"]["row"][0]["stationId"] == "ST-1"
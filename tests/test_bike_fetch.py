@@ -0,0 +1,152 @@
+# tests/test_bike_fetch.py
+"""
+shared_code/bike_fetch.fetch_pages - 로컬 http.server 를 따릉이 API 대신 사용
+
+- 응답이 늦게 오는 페이지가 있어도 결과는 ranges 순서
+- 5xx / timeout 은 backoff 후 재시도, RETRIES 를 넘으면 RuntimeError
+- 동시 요청 수는 max_workers 이하
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from shared_code import bike_fetch
+
+
+class FakeApi:
+    """/{start}/{end}/ → rentBikeStatus, 구간별 지연/실패를 설정"""
+
+    def __init__(self):
+        self.delay = {}       # start → 응답 지연(초)
+        self.fail = {}        # start → 앞으로 500 을 돌려줄 횟수
+        self.slow = {}        # start → 앞으로 timeout 나게 늦게 줄 횟수
+        self.calls = {}       # start → 받은 요청 수
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+
+    def handle(self, start: int, end: int):
+        with self.lock:
+            self.calls[start] = self.calls.get(start, 0) + 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            fail = self.fail.get(start, 0) > 0
+            if fail:
+                self.fail[start] -= 1
+            slow = not fail and self.slow.get(start, 0) > 0
+            if slow:
+                self.slow[start] -= 1
+        try:
+            self.stop.wait(1.0 if slow else self.delay.get(start, 0))
+            if fail:
+                return 500, {}
+            rows = [{"stationId": f"ST-{i}"} for i in range(start, end + 1)]
+            return 200, {"rentBikeStatus": {"list_total_count": end, "row": rows}}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def api():
+    fake = FakeApi()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            start, end = (int(x) for x in self.path.strip("/").split("/")[-2:])
+            status, body = fake.handle(start, end)
+            data = json.dumps(body).encode("utf-8")
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            except OSError:
+                pass  # 클라이언트가 timeout 으로 끊은 경우
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bike_fetch._session = None   # 모듈 공용 Session 은 테스트마다 새로 (풀 크기 = max_workers)
+    fake.base = f"http://127.0.0.1:{server.server_address[1]}/api/json/bikeList"
+    yield fake
+    fake.stop.set()
+    server.shutdown()
+    server.server_close()
+    bike_fetch._session = None
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """backoff 대기는 기록만 하고 바로 진행"""
+    rec = []
+    monkeypatch.setattr(bike_fetch.time, "sleep", rec.append)
+    return rec
+
+
+RANGES = [(1, 999), (1000, 1998), (1999, 2997), (2998, 3000)]
+
+
+def test_pages_keep_range_order_when_responses_arrive_out_of_order(api):
+    # 앞 페이지일수록 늦게 응답
+    api.delay = {1: 0.3, 1000: 0.2, 1999: 0.1, 2998: 0.0}
+    pages = bike_fetch.fetch_pages(api.base, RANGES, max_workers=4)
+
+    assert [(p.start, p.end) for p in pages] == RANGES
+    assert [len(p.rows) for p in pages] == [999, 999, 999, 3]
+    assert pages[0].rows[0]["stationId"] == "ST-1"
+    assert pages[-1].rows[-1]["stationId"] == "ST-3000"
+    assert all(p.attempts == 1 for p in pages)
+
+
+def test_5xx_is_retried_with_exponential_backoff(api, sleeps):
+    api.fail = {1000: 2}
+    pages = bike_fetch.fetch_pages(api.base, RANGES, max_workers=4, retries=3, backoff=0.5)
+
+    assert [p.attempts for p in pages] == [1, 3, 1, 1]
+    assert api.calls[1000] == 3
+    assert len(pages[1].rows) == 999
+    assert sleeps == [0.5, 1.0]
+
+
+def test_timeout_is_retried(api, sleeps):
+    api.slow = {1: 1}
+    pages = bike_fetch.fetch_pages(api.base, RANGES[:2], max_workers=2, retries=2, backoff=0.1, timeout=0.2)
+
+    assert [p.attempts for p in pages] == [2, 1]
+    assert api.calls[1] == 2
+    assert sleeps == [0.1]
+
+
+def test_gives_up_after_retries(api, sleeps):
+    api.fail = {1999: 5}
+    with pytest.raises(RuntimeError, match="1999-2997"):
+        bike_fetch.fetch_pages(api.base, RANGES, max_workers=4, retries=3, backoff=0.5)
+    assert api.calls[1999] == 3
+    assert sleeps == [0.5, 1.0]
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+def test_concurrency_is_bounded_by_max_workers(api, workers):
+    ranges = [(s, s + 9) for s in range(1, 121, 10)]
+    api.delay = {s: 0.05 for s, _ in ranges}
+    pages = bike_fetch.fetch_pages(api.base, ranges, max_workers=workers)
+
+    assert len(pages) == len(ranges)
+    assert api.max_active == workers
+
+
+def test_default_max_workers(api):
+    ranges = [(s, s + 9) for s in range(1, 201, 10)]
+    api.delay = {s: 0.05 for s, _ in ranges}
+    pages = bike_fetch.fetch_pages(api.base, ranges)
+
+    assert len(pages) == len(ranges)
+    assert api.max_active == bike_fetch.MAX_WORKERS
@@ -0,0 +1,129 @@
+# tests/test_blob_writer.py
+"""
+shared_code/blob_writer - encode_json 직렬화, Spill 보관/재업로드 (로컬 폴더 + 가짜 컨테이너)
+"""
+import gzip
+import io
+import json
+
+import pytest
+
+from shared_code import blob_writer
+from shared_code.blob_writer import Spill
+
+
+class FakeContainer:
+    """upload_blob(name, data) 만 흉내, down 이면 예외"""
+
+    def __init__(self):
+        self.blobs = {}
+        self.down = False
+        self.calls = 0
+
+    def upload_blob(self, name, data, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("storage unavailable")
+        self.blobs[name] = data.read() if hasattr(data, "read") else data
+
+
+def upload(container, spill, name, data):
+    """ingest _upload 와 같은 흐름: 실패하면 spill 에 보관"""
+    try:
+        container.upload_blob(name=name, data=data, overwrite=True)
+        return True
+    except Exception:
+        spill.save(name, data)
+        return False
+
+
+PAYLOAD = {"meta": {"timestamp_utc": "2026-10-17T00:05:00+00:00"},
+           "rentBikeStatus": {"row": [{"stationId": f"ST-{i}", "stationName": "역삼역 1번출구"} for i in range(500)]}}
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_encode_json_round_trip(compress):
+    fh, size = blob_writer.encode_json(PAYLOAD, compress=compress)
+    with fh:
+        assert fh.tell() == 0
+        raw = fh.read()
+    assert len(raw) == size
+    if compress:
+        raw = gzip.decompress(raw)
+    assert json.loads(raw.decode("utf-8")) == PAYLOAD
+
+
+def test_encode_json_rolls_over_to_disk(monkeypatch):
+    monkeypatch.setattr(blob_writer, "SPOOL_MAX", 1024)
+    fh, size = blob_writer.encode_json(PAYLOAD)
+    with fh:
+        assert size > 1024
+        assert fh._rolled
+        assert json.loads(fh.read()) == PAYLOAD
+
+
+@pytest.mark.parametrize("name", [
+    "2026/10/17/00/bike_snapshot_20261017_000500.json",
+    "_quality/2026/10/17/00/quality_20261017_000500.json",
+    "a_/b__c/d%2Fe.json",
+])
+def test_spill_file_name_is_reversible(name):
+    file_name = Spill._file_name(name)
+    assert "/" not in file_name
+    assert Spill._blob_name(file_name) == name
+
+
+def test_spill_file_name_keeps_double_underscore():
+    name = "_quality/2026/10/17/00/q__x.json"
+    assert Spill._blob_name(Spill._file_name(name)) == name
+    assert Spill._blob_name("q__x.json") == "q__x.json"
+
+
+def test_failed_upload_is_spilled_and_retried(tmp_path):
+    container, spill = FakeContainer(), Spill(tmp_path)
+    names = [f"2026/10/17/00/bike_snapshot_20261017_00{m:02d}00.json" for m in (0, 5)]
+
+    container.down = True
+    for name in names:
+        fh, _ = blob_writer.encode_json(PAYLOAD, compress=True)
+        with fh:
+            assert not upload(container, spill, name, fh)
+    assert upload(container, spill, "_quality/2026/10/17/00/q_x.json", b'{"status": "ok"}') is False
+    assert len(spill.pending()) == 3
+    assert container.blobs == {}
+
+    # 아직 장애 중 → 첫 건에서 멈추고 그대로 보관
+    assert spill.retry(lambda n, fh: container.upload_blob(name=n, data=fh)) == 0
+    assert container.calls == 4
+    assert len(spill.pending()) == 3
+
+    container.down = False
+    assert spill.retry(lambda n, fh: container.upload_blob(name=n, data=fh)) == 3
+    assert spill.pending() == []
+    assert set(container.blobs) == set(names) | {"_quality/2026/10/17/00/q_x.json"}
+    for name in names:
+        assert json.loads(gzip.decompress(container.blobs[name])) == PAYLOAD
+    assert container.blobs["_quality/2026/10/17/00/q_x.json"] == b'{"status": "ok"}'
+
+
+def test_retry_keeps_blob_order(tmp_path):
+    spill, order = Spill(tmp_path), []
+    for m in (10, 0, 5):
+        spill.save(f"2026/10/17/00/bike_delta_20261017_00{m:02d}00.json", io.BytesIO(b"{}"))
+    spill.retry(lambda n, fh: order.append(n))
+    assert order == sorted(order)
+    assert len(order) == 3
+
+
+def test_retry_on_empty_spill(tmp_path):
+    assert Spill(tmp_path / "missing").retry(lambda n, fh: None) == 0
+
+
+def test_find_by_prefix(tmp_path):
+    spill = Spill(tmp_path)
+    spill.save("2026/10/17/08/bike_delta_20261017_080500.json", b"{}")
+    spill.save("2026/10/17/09/bike_delta_20261017_090000.json", b"{}")
+    spill.save("_quality/2026/10/17/08/quality_20261017_080500.json", b"{}")
+    found = spill.find("2026/10/17/08/bike_delta_")
+    assert list(found) == ["2026/10/17/08/bike_delta_20261017_080500.json"]
+    assert found["2026/10/17/08/bike_delta_20261017_080500.json"].read_bytes() == b"{}"
@@ -0,0 +1,115 @@
+# tests/test_compact_hourly.py
+"""
+funcs/compact_hourly - LocalStore 에 만든 합성 스냅샷으로 시간 단위 compaction 확인
+
+- 출력 행 수 = 스냅샷 수 × 대여소 수, 스키마 = columnar.schema(), (station_id, ts_utc) 순
+- manifest 원본 목록이 그대로면 재실행해도 아무것도 쓰지 않음
+"""
+import gzip
+import json
+import datetime as dt
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from common.storage import LocalStore, open_store
+from funcs import compact_hourly
+from shared_code import columnar
+
+HOUR = dt.datetime(2026, 10, 17, 3, tzinfo=dt.timezone.utc)
+STATIONS = 7
+TICKS = (0, 5, 10, 15)
+
+
+def rows_at(minute: int) -> list:
+    return [{
+        "stationId": f"ST-{i:03d}",
+        "stationName": f"{i}. 대여소",
+        "rackTotCnt": "10",
+        "parkingBikeTotCnt": str((i + minute) % 11),
+        "shared": "50",
+        "stationLatitude": "37.55",
+        "stationLongitude": "126.97",
+    } for i in range(STATIONS, 0, -1)]   # 원본은 대여소 역순
+
+
+def write_snapshot(store, minute: int, gz: bool = False) -> str:
+    ts = HOUR + dt.timedelta(minutes=minute)
+    body = json.dumps({"meta": {"timestamp_utc": ts.isoformat()},
+                       "rentBikeStatus": {"row": rows_at(minute)}}, ensure_ascii=False).encode("utf-8")
+    name = f"{ts:%Y/%m/%d/%H}/bike_snapshot_{ts:%Y%m%d_%H%M%S}.json" + (".gz" if gz else "")
+    store.write_bytes(name, gzip.compress(body) if gz else body)
+    return name
+
+
+@pytest.fixture
+def stores(tmp_path):
+    src, dst = LocalStore(tmp_path / "raw"), LocalStore(tmp_path / "compacted")
+    for m in TICKS:
+        write_snapshot(src, m, gz=(m == 10))
+    return src, dst
+
+
+def test_compacts_hour_into_one_parquet(stores):
+    src, dst = stores
+    manifest = compact_hourly.compact_hour(src, dst, HOUR)
+
+    assert manifest["rows"] == STATIONS * len(TICKS)
+    assert manifest["stations"] == STATIONS
+    assert manifest["snapshots"] == len(TICKS)
+    assert manifest["sources"] == src.list_names(f"{HOUR:%Y/%m/%d/%H}/")
+    assert manifest["file"] == compact_hourly.data_name(HOUR)
+
+    table = pq.read_table(dst.root / manifest["file"])
+    assert table.num_rows == STATIONS * len(TICKS)
+    expected = columnar.schema()
+    assert table.schema.names == expected.names
+    for f in expected:
+        if f.name == "ts_utc":   # Parquet 에는 초 단위 timestamp 가 없어 ms 로 저장됨
+            assert pa.types.is_timestamp(table.schema.field(f.name).type)
+            assert table.schema.field(f.name).type.tz == "UTC"
+        else:
+            assert table.schema.field(f.name).type == f.type, f.name
+    keys = list(zip(table["station_id"].to_pylist(), table["ts_utc"].to_pylist()))
+    assert keys == sorted(keys)
+    assert json.loads(dst.read_bytes(compact_hourly.manifest_name(HOUR))) == manifest
+
+
+def test_rerun_with_unchanged_manifest_is_noop(stores, capsys):
+    src, dst = stores
+    first = compact_hourly.compact_hour(src, dst, HOUR)
+    data = dst.root / compact_hourly.data_name(HOUR)
+    man = dst.root / compact_hourly.manifest_name(HOUR)
+    before = (data.stat().st_mtime_ns, man.read_bytes())
+
+    assert compact_hourly.compact_hour(src, dst, HOUR) is None
+    assert "[SKIP]" in capsys.readouterr().out
+    assert (data.stat().st_mtime_ns, man.read_bytes()) == before
+    assert sorted(dst.list_names()) == sorted([first["file"], compact_hourly.manifest_name(HOUR)])
+
+
+def test_new_snapshot_or_force_recompacts(stores):
+    src, dst = stores
+    compact_hourly.compact_hour(src, dst, HOUR)
+
+    write_snapshot(src, 20)
+    manifest = compact_hourly.compact_hour(src, dst, HOUR)
+    assert manifest["rows"] == STATIONS * (len(TICKS) + 1)
+
+    again = compact_hourly.compact_hour(src, dst, HOUR, force=True)
+    assert again["rows"] == manifest["rows"]
+    assert again["sources"] == manifest["sources"]
+
+
+def test_empty_hour(stores):
+    src, dst = stores
+    assert compact_hourly.compact_hour(src, dst, HOUR + dt.timedelta(hours=1)) is None
+    assert dst.list_names() == []
+
+
+def test_open_store_uses_local_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCAL_BLOB_ROOT", str(tmp_path))
+    store = open_store("raw")
+    assert isinstance(store, LocalStore)
+    assert store.root == tmp_path / "raw"
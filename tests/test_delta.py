@@ -0,0 +1,120 @@
+# tests/test_delta.py
+"""
+shared_code/delta - encode → rebuild 왕복, 대여소 제거, 시간이 바뀌면 keyframe, 콜드 스타트 상태 복원
+"""
+import copy
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from shared_code import delta
+
+T0 = datetime(2026, 10, 17, 8, 0, tzinfo=timezone.utc)
+
+
+def base_rows(n=30):
+    return [{
+        "stationId": f"ST-{i}",
+        "stationName": f"{i}. 대여소",
+        "rackTotCnt": "10",
+        "parkingBikeTotCnt": str(i % 10),
+        "shared": "0",
+        "stationLatitude": "37.5",
+        "stationLongitude": "127.0",
+    } for i in range(n)]
+
+
+def ticks(n, start=T0):
+    """5분 간격 스냅샷 n개: 매 tick 일부 대여소 자전거 수 변경, 4번째 tick 에 대여소 2곳 제거, 6번째에 1곳 추가"""
+    rows, out = base_rows(), []
+    for k in range(n):
+        rows = copy.deepcopy(rows)
+        for r in rows[k % 3::7]:
+            r["parkingBikeTotCnt"] = str((int(r["parkingBikeTotCnt"]) + 1) % 10)
+        if k == 4:
+            rows = rows[2:]
+        if k == 6:
+            rows.append({**base_rows(1)[0], "stationId": "ST-NEW"})
+        out.append((start + timedelta(minutes=5 * k), rows))
+    return out
+
+
+def encode_all(snaps, state=None):
+    records = []
+    for ts, rows in snaps:
+        rec, state = delta.encode(rows, state, ts)
+        records.append(rec)
+    return records, state
+
+
+def by_id(rows):
+    return sorted(rows, key=lambda r: r["stationId"])
+
+
+def test_round_trip_every_tick():
+    snaps = ticks(10)
+    records, _ = encode_all(snaps)
+    assert [r["type"] for r in records] == ["keyframe"] + ["delta"] * 9
+    for ts, rows in snaps:
+        payload = delta.rebuild(records, at=ts.isoformat())
+        assert payload["meta"]["timestamp_utc"] == ts.isoformat()
+        assert by_id(payload["rentBikeStatus"]["row"]) == by_id(rows)
+
+
+def test_delta_only_carries_changed_fields():
+    records, _ = encode_all(ticks(2))
+    changed = records[1]["changed"]
+    assert changed
+    assert all(set(c) == {"stationId", "parkingBikeTotCnt"} for c in changed)
+
+
+def test_removed_and_added_stations():
+    snaps = ticks(8)
+    records, _ = encode_all(snaps)
+    assert sorted(records[4]["removed"]) == ["ST-0", "ST-1"]
+    assert any(c["stationId"] == "ST-NEW" and "stationName" in c for c in records[6]["changed"])
+    rows = delta.rebuild(records)["rentBikeStatus"]["row"]
+    ids = {r["stationId"] for r in rows}
+    assert "ST-0" not in ids and "ST-NEW" in ids
+    assert len(rows) == 29
+
+
+def test_keyframe_when_hour_changes():
+    snaps = ticks(14, start=T0 + timedelta(minutes=30))   # 08:30 ~ 09:35
+    records, _ = encode_all(snaps)
+    types = {rec["timestamp_utc"][11:16]: rec["type"] for rec in records}
+    assert types["08:30"] == "keyframe"
+    assert types["09:00"] == "keyframe"
+    assert list(types.values()).count("keyframe") == 2
+
+    # 09시 폴더 레코드만으로 복원 가능
+    hour9 = [r for r in records if r["timestamp_utc"][11:13] == "09"]
+    assert by_id(delta.rebuild(hour9)["rentBikeStatus"]["row"]) == by_id(snaps[-1][1])
+
+
+def test_delta_before_keyframe_cannot_rebuild():
+    records, _ = encode_all(ticks(3))
+    with pytest.raises(ValueError):
+        delta.rebuild(records[1:])
+
+
+def test_state_from_records_continues_encoding():
+    snaps = ticks(9)
+    records, warm_state = encode_all(snaps[:6])
+
+    # 콜드 스타트: 현재 시간 폴더 레코드로 상태 복원 → 웜 인스턴스와 같은 다음 레코드
+    cold_state = delta.state_from_records(records)
+    assert cold_state == warm_state
+    cold, _ = encode_all(snaps[6:], cold_state)
+    warm, _ = encode_all(snaps[6:], warm_state)
+    assert cold == warm
+    assert cold[0]["type"] == "delta"
+    assert by_id(delta.rebuild(records + cold)["rentBikeStatus"]["row"]) == by_id(snaps[-1][1])
+
+
+def test_state_from_records_without_keyframe():
+    assert delta.state_from_records([]) == {}
+    records, _ = encode_all(ticks(3))
+    assert delta.state_from_records(records[1:]) == {}
+    rec, _ = delta.encode(base_rows(), {}, T0)
+    assert rec["type"] == "keyframe"
@@ -0,0 +1,120 @@
+# tests/test_forecast.py
+"""
+common/forecast.Forecaster - 증분 갱신(watermark), 예측 값 범위/추세, 저장·읽기, 대시보드 갱신 조건(has_newer)
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from common import forecast
+from common.forecast import Forecaster
+
+T0 = pd.Timestamp("2026-10-12 00:00", tz="UTC")   # 월요일 09시 KST
+
+
+def frame(ticks, stations=("A", "B", "C"), start=T0, bikes=None, step_min=10):
+    """ticks 개 × 대여소, 기본 자전거 수: A 는 칸마다 1씩 감소, B 는 일정, C 는 증가"""
+    recs = []
+    for k in range(ticks):
+        ts = start + pd.Timedelta(minutes=step_min * k)
+        for j, sid in enumerate(stations):
+            b = bikes(k, j) if bikes else (12 - k, 5, 2 + k)[j % 3]
+            recs.append({"station_id": sid, "ts_utc": ts, "parking_bike_tot_cnt": b, "rack_tot_cnt": 15})
+    return pd.DataFrame(recs)
+
+
+def test_update_and_watermark():
+    f = Forecaster()
+    assert f.update_frame(frame(6)) == 18
+    assert f.watermark == int((T0 + pd.Timedelta(minutes=50)).timestamp())
+    assert f.update_frame(frame(6)) == 0                  # 같은 구간 재반영 없음
+    assert f.update_frame(frame(8)) == 6                  # 새 칸 2개만
+    assert f.prof_cnt.sum() == 24
+
+
+def test_predict_trend_and_bounds():
+    f = Forecaster()
+    f.update_frame(frame(6))
+    pred = f.predict().set_index("station_id")
+
+    assert f.as_of == T0 + pd.Timedelta(minutes=50)
+    assert list(pred.loc[["A", "B", "C"], "bikes_now"]) == [7, 5, 7]
+    assert pred.loc["A", "trend_per_hour"] < 0 < pred.loc["C", "trend_per_hour"]
+    assert pred.loc["B", "trend_per_hour"] == 0
+    assert pred.loc["B", "pred_60m"] == 5
+    for h in forecast.HORIZONS:
+        assert pred[f"pred_{h}m"].between(0, 15).all()
+    assert pred.loc["A", "pred_60m"] < pred.loc["A", "pred_30m"] < 7
+
+
+def test_dry_risk_and_clip_to_capacity():
+    f = Forecaster()
+    f.update_frame(frame(6, bikes=lambda k, j: (6 - k, 10 + k)[j], stations=("A", "B")))
+    pred = f.predict().set_index("station_id")
+    assert bool(pred.loc["A", "dry_risk"])
+    assert not bool(pred.loc["B", "dry_risk"])
+    assert pred.loc["A", "pred_60m"] >= 0
+    assert pred.loc["B", "pred_60m"] <= 15
+    assert f.predict()["station_id"].iloc[0] == "A"      # 60분 예측 오름차순
+
+
+def test_update_frame_columns():
+    f = Forecaster()
+    df = frame(3).drop(columns=["parking_bike_tot_cnt"])
+    assert f.update_frame(df) == 0
+    assert f.update_frame(frame(3).drop(columns=["ts_utc"])) == 0
+    assert f.update_frame(None) == 0
+
+    # 거치대 수 없으면 상한 없이 예측
+    df = frame(3).drop(columns=["rack_tot_cnt"]).rename(columns={"parking_bike_tot_cnt": "bike_count"})
+    assert f.update_frame(df) == 9
+    assert (f.predict()["rack_tot_cnt"] == 0).all()
+
+
+def test_update_snapshot():
+    f = Forecaster()
+    rows = [{"stationId": "A", "parkingBikeTotCnt": "3", "rackTotCnt": "10"},
+            {"stationId": "B", "parkingBikeTotCnt": None, "rackTotCnt": "10"}]
+    assert f.update_snapshot(rows, T0.to_pydatetime()) == 1
+    assert f.update_snapshot([], T0.to_pydatetime()) == 0
+
+
+def test_has_newer():
+    f = Forecaster()
+    assert f.has_newer(T0)
+    assert not f.has_newer(None)
+    assert not f.has_newer(pd.NaT)
+    f.update_frame(frame(3))
+    last = T0 + pd.Timedelta(minutes=20)
+    assert not f.has_newer(last)
+    assert not f.has_newer(last.tz_localize(None))      # naive 는 UTC
+    assert f.has_newer(last + pd.Timedelta(minutes=5))
+
+
+def test_save_load_round_trip(tmp_path):
+    f = Forecaster()
+    f.update_frame(frame(6))
+    path = tmp_path / "forecaster.npz"
+    f.save(path)
+    g = Forecaster.load(path)
+
+    assert g.ids == f.ids
+    assert g.watermark == f.watermark and g.recent_end == f.recent_end
+    pd.testing.assert_frame_equal(g.predict(), f.predict())
+    assert g.update_frame(frame(6)) == 0
+    assert Forecaster.load(tmp_path / "missing.npz").predict().empty
+
+
+def test_concurrent_updates_apply_once():
+    f = Forecaster()
+    df = frame(12, stations=[f"S{i}" for i in range(50)])
+    done = []
+    threads = [threading.Thread(target=lambda: done.append(f.update_frame(df))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(done) == [0] * 7 + [600]
+    assert f.prof_cnt.sum() == 600
@@ -0,0 +1,62 @@
+# tests/test_latest.py
+"""
+common/latest - 대여소별 최신 행 (인덱스 라벨 중복 / 결측 / 문자열 시각), LatestState 증분 갱신
+"""
+import pandas as pd
+
+from common.latest import LatestState, latest_per_station
+
+
+def snap(ts, bikes, stations=("A", "B")):
+    return pd.DataFrame({"station_id": list(stations), "ts_utc": pd.Timestamp(ts),
+                         "bike_count": bikes, "station_name": [f"{s} 대여소" for s in stations]})
+
+
+def test_one_row_per_station_with_duplicate_index_labels():
+    df = pd.concat([snap("2026-10-17 08:00", [1, 2]), snap("2026-10-17 08:05", [3, 4])])   # 인덱스 0,1,0,1
+    assert df.index.duplicated().any()
+    out = latest_per_station(df)
+    assert len(out) == 2
+    assert out.set_index("station_id")["bike_count"].to_dict() == {"A": 3, "B": 4}
+
+
+def test_whole_row_is_kept_and_missing_keys_dropped():
+    df = pd.concat([snap("2026-10-17 08:00", [1, 2]), snap("2026-10-17 08:05", [3, None])], ignore_index=True)
+    df.loc[1, "station_name"] = "B 옛 이름"
+    df.loc[3, "station_name"] = None
+    df.loc[4] = [None, pd.Timestamp("2026-10-17 09:00"), 9, "?"]
+    df.loc[5] = ["C", pd.NaT, 9, "C 대여소"]
+    out = latest_per_station(df).set_index("station_id")
+    assert list(out.index) == ["A", "B"]
+    assert pd.isna(out.loc["B", "bike_count"]) and pd.isna(out.loc["B", "station_name"])   # 다른 행 값으로 채우지 않음
+
+
+def test_string_timestamps():
+    df = pd.DataFrame({"station_id": ["A", "A", "B"],
+                       "ts_utc": ["2026-10-17 08:05:00", "2026-10-17 08:00:00", "2026-10-17 07:00:00"],
+                       "bike_count": [5, 1, 2]})
+    out = latest_per_station(df).set_index("station_id")
+    assert out["bike_count"].to_dict() == {"A": 5, "B": 2}
+
+
+def test_empty_and_missing_columns():
+    assert latest_per_station(pd.DataFrame()).empty
+    df = pd.DataFrame({"station_id": ["A"]})
+    assert latest_per_station(df) is df
+    df = pd.DataFrame({"station_id": [None], "ts_utc": [pd.NaT]})
+    assert latest_per_station(df).empty
+
+
+def test_latest_state_update_and_evict():
+    st = LatestState()
+    st.update(snap("2026-10-17 08:00", [1, 2]))
+    st.update(pd.concat([snap("2026-10-17 08:05", [3], ("A",)), snap("2026-10-17 07:55", [9], ("B",))]))
+    assert st.frame().set_index("station_id")["bike_count"].to_dict() == {"A": 3, "B": 2}
+    assert st.get("A")["bike_count"] == 3 and st.get("Z") is None
+
+    st.update(snap("2026-10-17 08:05", [7], ("A",)))          # 같은 시각 다시 읽음 → 새 값
+    assert st.get("A")["bike_count"] == 7
+
+    st.evict_before(pd.Timestamp("2026-10-17 08:01"))
+    assert list(st.frame()["station_id"]) == ["A"]
+    assert len(st.frame(since=pd.Timestamp("2026-10-17 08:10"))) == 0
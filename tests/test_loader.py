@@ -0,0 +1,205 @@
+# tests/test_loader.py
+"""
+common/db/loader - SQLite(SqliteDialect) + LocalStore 로 적재 확인
+
+- 같은 스냅샷 재적재는 행이 늘지 않음 (INSERT OR IGNORE = SQL Server MERGE)
+- watermark 가 마지막 적재 시각으로 전진, 다음 실행은 그 이후만
+- watermark 아래로 늦게 올라온 blob (spill 재시도) 도 LATE_HOURS 안이면 적재
+- split: station_dim(변경 시에만 새 버전) + bike_status_fact / 기본: 넓은 bike_status
+"""
+import json
+import sqlite3
+import datetime as dt
+
+import pytest
+
+from common.db import loader
+from common.storage import LocalStore
+
+T0 = dt.datetime(2026, 10, 17, 1, 0, tzinfo=dt.timezone.utc)
+STATIONS = 5
+
+
+def rows_at(minute: int, rack: int = 10) -> list:
+    return [{
+        "stationId": f"ST-{i}",
+        "stationName": f"{i}. 대여소",
+        "rackTotCnt": str(rack),
+        "parkingBikeTotCnt": str((i + minute) % 7),
+        "stationLatitude": "37.5",
+        "stationLongitude": "127.0",
+    } for i in range(STATIONS)]
+
+
+def write_snapshot(store, ts: dt.datetime, rows=None) -> str:
+    name = f"{ts:%Y/%m/%d/%H}/bike_snapshot_{ts:%Y%m%d_%H%M%S}.json"
+    rows = rows if rows is not None else rows_at(ts.minute)
+    store.write_bytes(name, json.dumps({"rentBikeStatus": {"row": rows}}, ensure_ascii=False).encode("utf-8"))
+    return name
+
+
+def at(minutes: int) -> dt.datetime:
+    return T0 + dt.timedelta(minutes=minutes)
+
+
+def count(cn, table: str) -> int:
+    return cn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = LocalStore(tmp_path / "raw")
+    for m in (0, 5, 10, 65):   # 두 시간 폴더
+        write_snapshot(s, at(m))
+    return s
+
+
+@pytest.fixture
+def cn():
+    c = sqlite3.connect(":memory:")
+    yield c
+    c.close()
+
+
+def test_first_load_needs_since(store, cn):
+    with pytest.raises(ValueError):
+        loader.load(store, cn, until=at(120))
+
+
+def test_wide_load_and_watermark(store, cn):
+    stats = loader.load(store, cn, since=T0, until=at(120))
+
+    assert stats["files"] == 4
+    assert stats["rows"] == stats["inserted"] == 4 * STATIONS
+    assert stats["watermark"] == at(65)
+    assert count(cn, "bike_status") == 4 * STATIONS
+    assert loader.SqliteDialect().get_watermark(cn, loader.SOURCE) == at(65)
+    row = cn.execute("SELECT station_name, rack_tot_cnt, lat, ts_utc FROM bike_status "
+                     "WHERE station_id = 'ST-1' ORDER BY ts_utc LIMIT 1").fetchone()
+    assert row == ("1. 대여소", 10, 37.5, "2026-10-17 01:00:00")
+
+
+def test_rerun_loads_only_after_watermark(store, cn):
+    loader.load(store, cn, since=T0, until=at(120))
+    again = loader.load(store, cn, since=T0, until=at(120))
+    assert again["files"] == 0
+    assert again["watermark"] == at(65)
+
+    write_snapshot(store, at(70))
+    more = loader.load(store, cn, until=at(120))
+    assert more["files"] == 1
+    assert more["inserted"] == STATIONS
+    assert more["watermark"] == at(70)
+    assert count(cn, "bike_status") == 5 * STATIONS
+
+
+def test_upsert_is_idempotent(cn):
+    d = loader.SqliteDialect()
+    d.ensure_schema(cn)
+    batch = loader.flatten(rows_at(0) + rows_at(0)[:2], at(0))   # 스냅샷 내 중복은 flatten 에서 제거
+    assert len(batch) == STATIONS
+    assert d.upsert(cn, batch) == STATIONS
+    assert d.upsert(cn, batch) == 0
+    assert count(cn, "bike_status") == STATIONS
+
+
+def test_late_blob_below_watermark_is_loaded(store, cn):
+    loader.load(store, cn, since=T0, until=at(120))
+
+    # 01:15 tick 이 spill 에 있다가 watermark(02:05) 이후에 올라옴
+    late = write_snapshot(store, at(15))
+    stats = loader.load(store, cn, until=at(120))
+    assert stats["files"] == stats["late"] == 1
+    assert stats["inserted"] == STATIONS
+    assert stats["watermark"] == at(65)   # watermark 는 뒤로 가지 않음
+    assert cn.execute("SELECT COUNT(*) FROM bike_status WHERE ts_utc = ?",
+                      (at(15).replace(tzinfo=None).isoformat(sep=" "),)).fetchone()[0] == STATIONS
+    assert late in loader.SqliteDialect().loaded_files(cn, loader.SOURCE, T0)
+
+    # 한 번 적재한 늦은 파일은 다시 읽지 않음
+    assert loader.load(store, cn, until=at(120))["files"] == 0
+
+
+def test_late_blob_outside_window_is_skipped(store, cn):
+    loader.load(store, cn, since=T0, until=at(120), late_hours=0)
+    write_snapshot(store, at(15))
+    assert loader.load(store, cn, until=at(120), late_hours=0)["files"] == 0
+
+
+def test_loaded_files_are_pruned_below_window(store, cn):
+    loader.load(store, cn, since=T0, until=at(120), late_hours=1)
+    names = loader.SqliteDialect().loaded_files(cn, loader.SOURCE, T0 - dt.timedelta(days=1))
+    # watermark 02:05 - 1시간 = 01:05 이전 (01:00) 은 목록에서 정리
+    assert names == {f"{ts:%Y/%m/%d/%H}/bike_snapshot_{ts:%Y%m%d_%H%M%S}.json" for ts in (at(5), at(10), at(65))}
+
+
+def test_split_load(store, cn):
+    # 02시 tick 부터 ST-0 거치대 수 변경 → 차원 새 버전 1개
+    changed = rows_at(65)
+    changed[0]["rackTotCnt"] = "20"
+    write_snapshot(store, at(65), changed)
+
+    stats = loader.load(store, cn, since=T0, until=at(120), split=True)
+    assert stats["files"] == 4
+    assert count(cn, "bike_status_fact") == 4 * STATIONS
+    assert stats["dim_changes"] == STATIONS + 1
+    assert count(cn, "station_dim") == STATIONS + 1
+    assert cn.execute("SELECT COUNT(*) FROM station_dim WHERE valid_to IS NULL").fetchone()[0] == STATIONS
+    assert cn.execute("SELECT rack_tot_cnt FROM station_dim WHERE station_id = 'ST-0' AND valid_to IS NULL"
+                      ).fetchone()[0] == 20
+    assert set(r[1] for r in cn.execute("PRAGMA table_info(bike_status_fact)")) == \
+        {"station_id", "ts_utc", "parking_bike_tot_cnt"}
+
+    # 넓은 테이블과 watermark 는 따로
+    d = loader.SqliteDialect()
+    assert d.get_watermark(cn, f"{loader.SOURCE}:fact") == at(65)
+    assert d.get_watermark(cn, loader.SOURCE) is None
+    wide = loader.load(store, cn, since=T0, until=at(120))
+    assert wide["files"] == 4
+    assert count(cn, "bike_status") == 4 * STATIONS
+
+
+def test_split_late_blob_does_not_touch_dim(store, cn):
+    loader.load(store, cn, since=T0, until=at(120), split=True)
+    old = rows_at(15, rack=99)   # 늦게 온 과거 스냅샷의 속성이 달라도 차원 현재 버전은 그대로
+    write_snapshot(store, at(15), old)
+    stats = loader.load(store, cn, until=at(120), split=True)
+    assert stats["late"] == 1
+    assert stats["dim_changes"] == 0
+    assert count(cn, "bike_status_fact") == 5 * STATIONS
+    assert count(cn, "station_dim") == STATIONS
+
+
+def test_rollup_is_saved_with_each_committed_hour(store, cn, tmp_path):
+    from common.rollup import HourlyRollup
+
+    path = tmp_path / "rollup.parquet"
+
+    class Rollup(HourlyRollup):
+        def save(self):
+            super().save(path)
+
+    # 02시 폴더에 깨진 파일 → 01시만 commit 되고 중단
+    bad = f"{at(70):%Y/%m/%d/%H}/bike_snapshot_{at(70):%Y%m%d_%H%M%S}.json"
+    store.write_bytes(bad, b"{broken")
+    with pytest.raises(ValueError):
+        loader.load(store, cn, since=T0, until=at(120), rollup=Rollup())
+    assert count(cn, "bike_status") == 3 * STATIONS
+    saved = HourlyRollup.load(path)
+    assert saved.watermark == at(10)
+    assert saved.acc[0].sum() == 3 * STATIONS
+
+    # 고친 뒤 재실행: 이미 적재된 01시는 건너뛰고 집계도 중복 없음
+    write_snapshot(store, at(70))
+    rollup = Rollup.load(path)
+    stats = loader.load(store, cn, until=at(120), rollup=rollup)
+    assert stats["files"] == 2
+    assert HourlyRollup.load(path).acc[0].sum() == 5 * STATIONS
+
+
+def test_mark_loaded_twice_is_ignored(cn):
+    d = loader.SqliteDialect()
+    d.ensure_schema(cn)
+    d.mark_loaded(cn, loader.SOURCE, [("a.json", at(0))])
+    d.mark_loaded(cn, loader.SOURCE, [("a.json", at(0)), ("b.json", at(5))])
+    assert d.loaded_files(cn, loader.SOURCE, T0) == {"a.json", "b.json"}
@@ -0,0 +1,133 @@
+# tests/test_pagination.py
+"""
+shared_code/pagination - fetch_planned / total 캐시
+
+- bike_fetch.fetch_pages 를 대여소 수가 고정된 가짜 API 로 바꿔서 호출 구간을 기록
+- 캐시 total 이 실제보다 작으면 부족한 구간만 추가 호출, 크면 빈 페이지는 무시
+- total 캐시는 캐시 파일 경로별로 따로 유지
+"""
+import json
+
+import pytest
+
+from shared_code import bike_fetch, pagination
+
+
+class FakeApi:
+    """대여소 n 개짜리 API - 범위 밖 페이지는 row 없음, total 0"""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.calls = []       # fetch_pages 호출마다 받은 ranges
+
+    def fetch_pages(self, base, ranges, **kwargs):
+        self.calls.append(list(ranges))
+        pages = []
+        for s, e in ranges:
+            if s > self.n:
+                pages.append(bike_fetch.PageResult(s, e))
+                continue
+            rows = [{"stationId": f"ST-{i}"} for i in range(s, min(e, self.n) + 1)]
+            pages.append(bike_fetch.PageResult(s, e, rows, total=self.n))
+        return pages
+
+
+@pytest.fixture
+def api(monkeypatch):
+    def make(n):
+        fake = FakeApi(n)
+        monkeypatch.setattr(bike_fetch, "fetch_pages", fake.fetch_pages)
+        return fake
+    monkeypatch.setattr(pagination, "_totals", {})
+    return make
+
+
+def _ids(rows):
+    return [r["stationId"] for r in rows]
+
+
+def _write_total(path, total):
+    path.write_text(json.dumps({"total": total}), encoding="utf-8")
+
+
+def test_plan_ranges_last_page_short():
+    assert pagination.plan_ranges(25, 10) == [(1, 10), (11, 20), (21, 25)]
+    assert pagination.plan_ranges(25, 10, 21) == [(21, 25)]
+    assert pagination.plan_ranges(0, 10) == []
+
+
+def test_no_cache_first_page_then_rest(api, tmp_path):
+    fake = api(25)
+    cache = tmp_path / "total.json"
+
+    rows, pages, total = pagination.fetch_planned("http://x", size=10, cache_path=cache)
+
+    assert fake.calls == [[(1, 10)], [(11, 20), (21, 25)]]
+    assert total == 25
+    assert _ids(rows) == [f"ST-{i}" for i in range(1, 26)]
+    assert json.loads(cache.read_text(encoding="utf-8")) == {"total": 25}
+
+
+def test_cached_total_all_pages_at_once(api, tmp_path):
+    fake = api(25)
+    cache = tmp_path / "total.json"
+    _write_total(cache, 25)
+
+    rows, pages, total = pagination.fetch_planned("http://x", size=10, cache_path=cache)
+
+    assert fake.calls == [[(1, 10), (11, 20), (21, 25)]]
+    assert total == 25 and len(rows) == 25
+
+
+def test_stale_cache_smaller_fetches_missing_ranges(api, tmp_path):
+    # 캐시 이후 대여소가 늘었음 → 마지막 짧은 페이지도 끝까지 채워 받아야 함
+    fake = api(33)
+    cache = tmp_path / "total.json"
+    _write_total(cache, 25)
+
+    rows, pages, total = pagination.fetch_planned("http://x", size=10, cache_path=cache)
+
+    assert fake.calls == [[(1, 10), (11, 20), (21, 25)], [(26, 33)]]
+    assert total == 33
+    assert _ids(rows) == [f"ST-{i}" for i in range(1, 34)]
+    assert json.loads(cache.read_text(encoding="utf-8")) == {"total": 33}
+
+
+def test_stale_cache_larger_ignores_extra_pages(api, tmp_path):
+    # 대여소가 줄었음 → 범위 밖 페이지는 빈 결과, 추가 호출 없음
+    fake = api(12)
+    cache = tmp_path / "total.json"
+    _write_total(cache, 25)
+
+    rows, pages, total = pagination.fetch_planned("http://x", size=10, cache_path=cache)
+
+    assert fake.calls == [[(1, 10), (11, 20), (21, 25)]]
+    assert total == 12
+    assert _ids(rows) == [f"ST-{i}" for i in range(1, 13)]
+    assert [len(p.rows) for p in pages] == [10, 2, 0]
+    assert json.loads(cache.read_text(encoding="utf-8")) == {"total": 12}
+
+
+def test_empty_response_keeps_cache(api, tmp_path):
+    api(0)
+    cache = tmp_path / "total.json"
+    _write_total(cache, 25)
+
+    rows, pages, total = pagination.fetch_planned("http://x", size=10, cache_path=cache)
+
+    assert rows == [] and total == 0
+    assert json.loads(cache.read_text(encoding="utf-8")) == {"total": 25}
+
+
+def test_total_cached_per_path(api, tmp_path):
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    _write_total(a, 10)
+    _write_total(b, 30)
+
+    assert pagination.load_total(a) == 10
+    assert pagination.load_total(b) == 30
+    assert pagination.load_total(tmp_path / "none.json") is None
+
+    pagination.save_total(20, a)
+    assert pagination.load_total(a) == 20
+    assert pagination.load_total(b) == 30
@@ -0,0 +1,131 @@
+# tests/test_quality.py
+"""
+shared_code/quality.check - 저장소의 실제 스냅샷(out_simple/)을 기준으로 fail / warn / ok 판정
+"""
+import copy
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from shared_code import quality
+
+SAMPLE = Path(__file__).resolve().parents[1] / "out_simple" / "bike_snapshot_20251029_083028.json"
+T0 = datetime(2025, 10, 29, 8, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def rows():
+    return json.loads(SAMPLE.read_text(encoding="utf-8"))["rentBikeStatus"]["row"]
+
+
+def tick(rows, k):
+    """k 번째 tick: 대여소 절반의 자전거 수를 바꾼 사본"""
+    out = copy.deepcopy(rows)
+    for i, r in enumerate(out):
+        if i % 2 == k % 2:
+            r["parkingBikeTotCnt"] = str(int(r["parkingBikeTotCnt"]) + k)
+    return out
+
+
+def run(ticks, total=True, **kwargs):
+    """스냅샷 여러 개를 순서대로 검사 (fail 은 상태에 반영하지 않음 = ingest 와 같음)"""
+    state, out = {}, []
+    for k, rs in enumerate(ticks):
+        summary, new_state = quality.check(rs, len(rs) if total else None, state, T0 + timedelta(minutes=5 * k), **kwargs)
+        out.append(summary)
+        if summary["status"] != "fail":
+            state = new_state
+    return out
+
+
+def test_real_snapshot_is_ok(rows):
+    s, state = quality.check(rows, len(rows), None, T0)
+    assert s["status"] == "ok", s
+    assert s["checks"]["over_capacity"]["count"] > 0          # 개수는 남기되 warn 아님
+    assert not s["checks"]["over_capacity"]["warn"]
+    assert len(state["ids"]) == len(rows)
+    assert state["payload_hash"] == quality.payload_hash(rows, len(rows))
+
+
+def test_no_rows_fails():
+    s, _ = quality.check([], 2725, None, T0)
+    assert s["status"] == "fail"
+    assert "no rows" in s["reasons"]
+
+
+def test_row_count_mismatch_fails(rows):
+    s, _ = quality.check(rows[:-100], len(rows), None, T0)
+    assert s["status"] == "fail"
+    assert s["checks"]["row_count"]["diff"] == -100
+    s, _ = quality.check(rows[:-10], len(rows), None, T0)   # 허용 오차 안 → warn
+    assert s["status"] == "warn"
+
+
+def test_bad_rows_fail(rows):
+    for r in rows[::10]:
+        r["parkingBikeTotCnt"] = "N/A"
+    s, _ = quality.check(rows, len(rows), None, T0)
+    assert s["status"] == "fail"
+    assert s["checks"]["bad_bikes"]["count"] == len(rows[::10])
+
+
+def test_duplicate_and_missing_id_warn(rows):
+    rows = rows + [dict(rows[0])]
+    rows[1] = {**rows[1], "stationId": ""}
+    s, state = quality.check(rows, len(rows), None, T0)
+    assert s["status"] == "warn"
+    assert s["checks"]["duplicate_id"]["sample"] == [rows[0]["stationId"]]
+    assert s["checks"]["missing_id"]["count"] == 1
+    assert len(state["ids"]) == len(rows) - 2
+
+
+def test_out_of_bbox_warns(rows):
+    rows[3]["stationLatitude"] = "35.1"       # 부산
+    rows[4]["stationLongitude"] = None
+    s, _ = quality.check(rows, len(rows), None, T0)
+    assert s["status"] == "warn"
+    assert s["checks"]["out_of_bbox"]["sample"] == [rows[3]["stationId"], rows[4]["stationId"]]
+
+
+def test_over_capacity_warns_only_above_station_ratio(rows):
+    over = int(len(rows) * quality.OVER_WARN_RATIO) + 1
+    for r in rows[:over]:
+        r["parkingBikeTotCnt"] = str(int(r["rackTotCnt"]) * 10)
+    s, _ = quality.check(rows, len(rows), None, T0)
+    assert s["status"] == "warn"
+    assert s["checks"]["over_capacity"]["warn"]
+    assert s["checks"]["over_capacity"]["count"] >= over
+
+
+def test_stuck_station_warns(rows):
+    ticks = [tick(rows, k) for k in range(4)]
+    for t in ticks:                           # 0번 대여소만 계속 같은 값
+        t[0]["parkingBikeTotCnt"] = "3"
+    out = run(ticks, stuck_ticks=3)
+    assert [s["status"] for s in out] == ["ok", "ok", "ok", "warn"]
+    assert out[-1]["checks"]["stuck"]["sample"] == [rows[0]["stationId"]]
+
+
+def test_quiet_tick_warns_but_does_not_fail(rows):
+    # 대여소 하나만 바뀌는 조용한 시간대: stale warn 이지만 응답이 다르므로 fail 아님
+    ticks = []
+    for k in range(6):
+        t = copy.deepcopy(rows)
+        t[0]["parkingBikeTotCnt"] = str(k)
+        ticks.append(t)
+    out = run(ticks)
+    assert [s["status"] for s in out] == ["ok"] + ["warn"] * 5
+    assert all(s["checks"]["stale"]["count"] and s["checks"]["stale"]["identical_ticks"] == 0 for s in out[1:])
+
+
+def test_identical_response_fails_after_stale_ticks(rows):
+    out = run([rows] * (quality.STALE_TICKS + 2))
+    assert [s["checks"]["stale"]["identical_ticks"] for s in out] == [0, 1, 2, 3, 3]
+    assert [s["status"] for s in out] == ["ok", "warn", "warn", "fail", "fail"]
+    assert "identical response" in out[3]["reasons"][0]
+
+    # 응답이 바뀌면 다시 정상
+    out = run([rows] * (quality.STALE_TICKS + 1) + [tick(rows, 1)])
+    assert out[-1]["status"] == "ok"
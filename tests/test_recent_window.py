@@ -0,0 +1,95 @@
+# tests/test_recent_window.py
+"""
+common/recent_window.RecentWindow - DB 대신 메모리 테이블로 증분 갱신 확인
+
+- 두 번째 refresh 부터는 watermark - grace 이후만 조회
+- watermark 보다 과거 ts_utc 로 늦게 적재된 행도 반영, 겹쳐 읽은 행은 중복 없이 새 값으로
+"""
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from common import recent_window
+from common.recent_window import RecentWindow
+
+
+class FakeWindow(RecentWindow):
+    """_full / _since 를 메모리 테이블 조회로 대신 (조회 조건은 기록)"""
+
+    def __init__(self, table: pd.DataFrame, **kwargs):
+        super().__init__("bike_status", **kwargs)
+        self.table_df = table
+        self.since_calls = []
+
+    def _full(self, cn, minutes):
+        cutoff = recent_window._utcnow() - dt.timedelta(minutes=minutes)
+        return self.table_df[self.table_df["ts_utc"] >= cutoff].reset_index(drop=True)
+
+    def _since(self, cn, watermark):
+        self.since_calls.append(watermark)
+        return self.table_df[self.table_df["ts_utc"] > watermark].reset_index(drop=True)
+
+
+NOW = recent_window._utcnow().replace(second=0, microsecond=0)
+
+
+def rows(minutes_ago: int, bikes: int, stations=("ST-1", "ST-2")) -> pd.DataFrame:
+    ts = NOW - dt.timedelta(minutes=minutes_ago)
+    return pd.DataFrame({"station_id": list(stations), "ts_utc": [ts] * len(stations),
+                         "parking_bike_tot_cnt": [bikes] * len(stations)})
+
+
+@pytest.fixture
+def win():
+    return FakeWindow(pd.concat([rows(20, 1), rows(15, 2), rows(10, 3)], ignore_index=True), grace_minutes=15)
+
+
+def test_first_refresh_reads_full_window(win):
+    out = win.refresh(None, 60)
+    assert len(out) == 6
+    assert win.watermark == NOW - dt.timedelta(minutes=10)
+    assert win.since_calls == []
+
+
+def test_refresh_overlaps_watermark_by_grace(win):
+    win.refresh(None, 60)
+    win.table_df = pd.concat([win.table_df, rows(5, 4)], ignore_index=True)
+    out = win.refresh(None, 60)
+
+    assert win.since_calls == [NOW - dt.timedelta(minutes=10) - dt.timedelta(minutes=15)]
+    assert len(out) == 8                                   # 겹쳐 읽은 6행은 중복 없이
+    assert not out.duplicated(recent_window.KEYS).any()
+    assert win.watermark == NOW - dt.timedelta(minutes=5)
+    assert win.latest(60)["parking_bike_tot_cnt"].tolist() == [4, 4]
+
+
+def test_late_row_below_watermark_is_picked_up(win):
+    win.refresh(None, 60)
+    # ST-3 의 12분 전 행이 watermark(10분 전) 이후에 적재됨
+    win.table_df = pd.concat([win.table_df, rows(12, 7, stations=("ST-3",))], ignore_index=True)
+    out = win.refresh(None, 60)
+
+    assert len(out) == 7
+    assert win.watermark == NOW - dt.timedelta(minutes=10)
+    latest = win.latest(60).set_index("station_id")
+    assert latest.loc["ST-3", "parking_bike_tot_cnt"] == 7
+    assert latest.loc["ST-1", "parking_bike_tot_cnt"] == 3
+
+
+def test_reloaded_row_takes_new_value(win):
+    win.refresh(None, 60)
+    t = win.table_df
+    t.loc[(t["station_id"] == "ST-1") & (t["ts_utc"] == NOW - dt.timedelta(minutes=10)), "parking_bike_tot_cnt"] = 9
+    out = win.refresh(None, 60)
+
+    assert len(out) == 6
+    assert out.loc[(out["station_id"] == "ST-1") & (out["ts_utc"] == NOW - dt.timedelta(minutes=10)),
+                   "parking_bike_tot_cnt"].tolist() == [9]
+    assert win.latest(60).set_index("station_id").loc["ST-1", "parking_bike_tot_cnt"] == 9
+
+
+def test_rows_outside_window_are_evicted(win):
+    win.refresh(None, 12)
+    assert len(win.window(12)) == 2
+    assert len(win.latest(12)) == 2